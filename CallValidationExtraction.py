@@ -1,39 +1,46 @@
 
 
-import pandas as pd
-
-# File path
-excel_file = 'thisone.xlsx'
-
-# List of columns you want to extract
-columns_to_extract = [
-    'workordernumber',
-    'customername',
-    'customercontact',
-    'customeraddress',
-    'appointmentdate',
-    'team',
-    'delayreason',
-    'facilityname'
-]
-
-# Step 1: Read the Excel file without usecols
-df = pd.read_excel(excel_file)
-
-# Step 2: Clean column names (strip whitespace and lower case for matching)
-df.columns = df.columns.str.strip()
-
-# Step 3: Check for missing columns
-missing_cols = [col for col in columns_to_extract if col not in df.columns]
-if missing_cols:
-    print(f"⚠️ Warning: These columns are missing: {missing_cols}")
-    # Only keep columns that exist to avoid crashing
-    columns_to_extract = [col for col in columns_to_extract if col in df.columns]
-
-# Step 4: Extract available columns
-filtered_df = df[columns_to_extract]
-
-# Step 5: Save to new Excel file
-filtered_df.to_excel('CallValidation.xlsx', index=False)
-
-print("✅ Columns extracted and saved to 'CallValidation.xlsx'")
+import argparse
+
+from reportlib.batch import expand_inputs
+from reportlib.formats import write_report
+from reportlib.workorders import query_workorders
+
+# File path (a list of daily dumps or glob patterns like "workorders_*.xlsx" works too)
+excel_files = ['thisone.xlsx']
+
+# Output file (.csv or .parquet also work)
+output_file = 'CallValidation.xlsx'
+
+# Optional filters: appointment dates (YYYY-MM-DD, inclusive) and teams; None keeps everything
+date_from = None
+date_to = None
+teams = None
+
+# Dumps read at the same time (None: one per CPU)
+max_workers = None
+
+# The extracted columns are listed in reportlib/workorders.py (WORKORDER_COLUMNS):
+# workordernumber, customername, customercontact, customeraddress,
+# appointmentdate, team, delayreason, facilityname
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract the call-validation columns from work-order dumps.")
+    parser.add_argument("files", nargs="*", help="files or glob patterns (default: excel_files above)")
+    parser.add_argument("--from", dest="date_from", default=date_from, help="first appointment date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", default=date_to, help="last appointment date (YYYY-MM-DD)")
+    parser.add_argument("--team", action="append", default=teams, help="team to keep (repeatable)")
+    parser.add_argument("--workers", type=int, default=max_workers)
+    parser.add_argument("--output", default=output_file)
+    args = parser.parse_args()
+
+    # Step 1: Index the dumps (streamed, only the needed columns, in parallel; already indexed dumps are skipped)
+    # Step 2: Read the matching work orders back from the index (in report order; by appointment date with --from/--to)
+    filtered_df = query_workorders(expand_inputs(args.files or excel_files), args.date_from, args.date_to,
+                                   args.team, max_workers=args.workers)
+
+    # Step 3: Save to new Excel file
+    write_report(filtered_df, args.output)
+
+    print(f"✅ {len(filtered_df)} work orders extracted and saved to '{args.output}'")
@@ -1,21 +1,47 @@
-import pandas as pd
+import argparse
+import os
+import sys
 
-# List your Excel files here
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.batch import expand_inputs, iter_batch, report_timing
+from reportlib.formats import FORMAT_EXTENSIONS, read_report, write_report
+
+# List your Excel files here (glob patterns like "Group*.xlsx" work too)
 files = [
     "Davao_North_Only.xlsx",
     "Group2_Jade_Valley_Tigatto_Airport.xlsx",
     "Group3_Cabantian_Mandug_Panacan.xlsx"
 ]
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+max_workers = None  # files processed at the same time (None: one per CPU)
+
+
+def combine_lat_long(df):
+    """Combine latitude and longitude into one column"""
+    coordinates = df["DP/NAP LAT"].astype(str) + "," + df["DP/NAP LONG"].astype(str)
+    return df.assign(**{"DP/NAP COORDINATES": coordinates})
 
-for file in files:
-    # Load the Excel file
-    df = pd.read_excel(file)
 
-    # Combine latitude and longitude into one column
-    df["DP/NAP COORDINATES"] = df["DP/NAP LAT"].astype(str) + "," + df["DP/NAP LONG"].astype(str)
+def combine_file(file):
+    """Worker step: add the coordinates column to one file; returns the output path"""
+    # Load the file (xlsx, csv or parquet)
+    df = read_report(file)
+
+    df = combine_lat_long(df)
 
     # Save back to a new file
-    output_file = file.replace(".xlsx", "_combined.xlsx")
-    df.to_excel(output_file, index=False)
+    output_file = os.path.splitext(file)[0] + "_combined" + FORMAT_EXTENSIONS[output_format]
+    write_report(df, output_file, output_format)
+    return output_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add a DP/NAP COORDINATES column to each file.")
+    parser.add_argument("files", nargs="*", help="files or glob patterns (default: the files list above)")
+    parser.add_argument("--workers", type=int, default=max_workers)
+    args = parser.parse_args()
 
-    print(f"Done! Saved combined file as {output_file}")
+    for result in iter_batch(expand_inputs(args.files or files), combine_file, args.workers):
+        report_timing(result)
+        print(f"Done! Saved combined file as {result.value}")
@@ -1,50 +1,72 @@
 # pip install pandas openpyxl
 
-import pandas as pd
 import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.formats import FORMAT_EXTENSIONS, write_report
+from reportlib.partitions import read_partitions
+from reportlib.schema import probe_columns, read_columns
 
 # --- Configuration ---
 files_folder = "Files"
-input_filename = "Group1_Urban_Core_Bucana.xlsx"  # Change to your actual input file
+input_filename = "Group1_Urban_Core_Bucana.xlsx"  # Change to your actual input file (.xlsx, .csv or .parquet)
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+partition_date = None  # e.g. "2025-07-15" or "latest" to read the DAVAO NORTH partition instead of input_filename
 # --- End Configuration ---
 
-# Ensure the files folder exists
-os.makedirs(files_folder, exist_ok=True)
-
-# Full paths
-input_path = os.path.join(files_folder, input_filename)
-
 # Columns to extract (including CFS Cluster for filtering)
 columns_to_extract = [
     'DPdeniro', 'S_SP', 'S_Total', 'Com Date',
     'DP/NAP LAT', 'DP/NAP LONG', 'BRGY_NAME', 'CFS Cluster', 'Tech', 'Location Type'
 ]
 
-# Step 1: Read the Excel file
-df = pd.read_excel(input_path)
 
-# Step 2: Clean column names
-df.columns = df.columns.str.strip()
+def filter_davao_north(df):
+    """Keep only DAVAO NORTH rows and the columns used by the maps"""
+    # Step 2: Clean column names
+    df = df.set_axis(df.columns.str.strip(), axis=1)
+
+    # Step 3: Check for missing columns
+    available_cols = columns_to_extract
+    missing_cols = [col for col in columns_to_extract if col not in df.columns]
+    if missing_cols:
+        print(f"⚠️ Warning: These columns are missing: {missing_cols}")
+        available_cols = [col for col in columns_to_extract if col in df.columns]
+
+    # Step 4: Filter by only "DAVAO NORTH" (case-insensitive)
+    if 'CFS Cluster' in df.columns:
+        clusters = df['CFS Cluster'].astype(str).str.strip().str.upper()
+        is_davao_north = clusters == "DAVAO NORTH"
+        df_filtered = df[is_davao_north].assign(**{'CFS Cluster': clusters[is_davao_north]})
+    else:
+        print("⚠️ 'CFS Cluster' column not found — no filtering applied.")
+        df_filtered = df
+
+    # Step 5: Extract available columns
+    return df_filtered[available_cols]
+
+
+if __name__ == "__main__":
+    # Ensure the files folder exists
+    os.makedirs(files_folder, exist_ok=True)
 
-# Step 3: Check for missing columns
-missing_cols = [col for col in columns_to_extract if col not in df.columns]
-if missing_cols:
-    print(f"⚠️ Warning: These columns are missing: {missing_cols}")
-    columns_to_extract = [col for col in columns_to_extract if col in df.columns]
+    # Full paths
+    input_path = os.path.join(files_folder, input_filename)
 
-# Step 4: Filter by only "DAVAO NORTH" (case-insensitive)
-if 'CFS Cluster' in df.columns:
-    df['CFS Cluster'] = df['CFS Cluster'].astype(str).str.strip().str.upper()
-    df_filtered = df[df['CFS Cluster'] == "DAVAO NORTH"]
-else:
-    print("⚠️ 'CFS Cluster' column not found — no filtering applied.")
-    df_filtered = df
+    if partition_date:
+        # Step 1: Only the DAVAO NORTH partition is read, straight from Parquet
+        df = read_partitions(["DAVAO NORTH"], partition_date)
+    else:
+        # Step 1: Read only the needed columns, matched against the header first
+        mapping, _, _ = probe_columns(input_path, columns_to_extract, strict=False)
+        df = read_columns(input_path, mapping)
 
-# Step 5: Extract available columns
-filtered_df = df_filtered[columns_to_extract]
+    filtered_df = filter_davao_north(df)
 
-# Step 6: Save the filtered data
-output_path = os.path.join(files_folder, "Davao_North_Only.xlsx")
-filtered_df.to_excel(output_path, index=False)
+    # Step 6: Save the filtered data
+    output_path = os.path.join(files_folder, "Davao_North_Only" + FORMAT_EXTENSIONS[output_format])
+    write_report(filtered_df, output_path, output_format)
 
-print(f"✅ Filtered data saved: {output_path} (Rows: {len(filtered_df)})")
+    print(f"✅ Filtered data saved: {output_path} (Rows: {len(filtered_df)})")
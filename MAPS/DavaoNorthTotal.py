@@ -1,18 +1,44 @@
 import pandas as pd
+import argparse
+import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.batch import FrameConcat, expand_inputs, iter_batch, report_timing
+from reportlib.formats import read_report, write_report
 
 # --- Configuration ---
-input_files = [
+input_files = [  # glob patterns like "*_cleaned.xlsx" work too
     "Davao_North_Only_combined_cleaned.xlsx",
     "Group2_Jade_Valley_Tigatto_Airport_combined_cleaned.xlsx",
     "Group3_Cabantian_Mandug_Panacan_combined_cleaned.xlsx"
 ]
-output_file = "combined.xlsx"
+output_file = "combined.xlsx"  # .csv or .parquet also work
+max_workers = None  # files read at the same time (None: one per CPU)
 # ----------------------
 
-# Read and combine all files
-dfs = [pd.read_excel(f) for f in input_files]
-combined_df = pd.concat(dfs, ignore_index=True)
 
-# Save the combined file
-combined_df.to_excel(output_file, index=False)
-print(f"✅ Combined {len(input_files)} files → {output_file}")
+def combine_frames(*dfs):
+    """Stack the cleaned group files into one table"""
+    return pd.concat(dfs, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stack the cleaned group files into one table.")
+    parser.add_argument("files", nargs="*", help="files or glob patterns (default: input_files above)")
+    parser.add_argument("--workers", type=int, default=max_workers)
+    parser.add_argument("--output", default=output_file)
+    args = parser.parse_args()
+
+    # Read the files in parallel; each is stacked as soon as it (and the ones before it) arrive
+    combined = FrameConcat()
+    paths = expand_inputs(args.files or input_files)
+    for result in iter_batch(paths, read_report, args.workers):
+        combined.add(result.value)
+        report_timing(result, f" ({len(result.value)} rows)")
+    combined_df = combined.result()
+
+    # Save the combined file
+    write_report(combined_df, args.output)
+    print(f"✅ Combined {len(paths)} files → {args.output}")
@@ -1,12 +1,21 @@
-import pandas as pd
+import argparse
+import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.batch import expand_inputs, iter_batch, report_timing
+from reportlib.formats import FORMAT_EXTENSIONS, read_report, write_report
 
 # --- Configuration ---
-input_files = [
+input_files = [  # glob patterns like "*_combined.xlsx" work too
    "Davao_North_Only_combined.xlsx",
     "Group2_Jade_Valley_Tigatto_Airport_combined.xlsx",
     "Group3_Cabantian_Mandug_Panacan_combined.xlsx"
 ]
-output_suffix = "_cleaned.xlsx"
+output_suffix = "_cleaned"
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+max_workers = None  # files cleaned at the same time (None: one per CPU)
 # ----------------------
 
 # Define non-breaking space
@@ -15,10 +24,9 @@ nbsp = "\u00A0"
 # Keywords to remove
 keywords = ["VDSL", "ADSL", "ADSL/VDSL"]
 
-for input_file in input_files:
-    # Load the file
-    df = pd.read_excel(input_file)
 
+def clean_no_value(df):
+    """Blank out "no value" cells, strip DSL keywords and slashes from text columns"""
     # Replace "no value" and blanks with non-breaking space
     df = df.replace("no value", nbsp, regex=False)
     df = df.fillna(nbsp)
@@ -35,8 +43,28 @@ for input_file in input_files:
     # Strip spaces but ensure cells don’t end up empty
     df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
     df = df.replace("", nbsp)
+    return df
+
+
+def clean_file(input_file):
+    """Worker step: clean one file; returns the output path"""
+    # Load the file (xlsx, csv or parquet)
+    df = read_report(input_file)
+
+    df = clean_no_value(df)
 
     # Save cleaned file
-    output_file = input_file.replace(".xlsx", output_suffix)
-    df.to_excel(output_file, index=False)
-    print(f"✅ Cleaned {input_file} → {output_file}")
+    output_file = os.path.splitext(input_file)[0] + output_suffix + FORMAT_EXTENSIONS[output_format]
+    write_report(df, output_file, output_format)
+    return output_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blank out 'no value' cells and strip DSL keywords.")
+    parser.add_argument("files", nargs="*", help="files or glob patterns (default: input_files above)")
+    parser.add_argument("--workers", type=int, default=max_workers)
+    args = parser.parse_args()
+
+    for result in iter_batch(expand_inputs(args.files or input_files), clean_file, args.workers):
+        report_timing(result)
+        print(f"✅ Cleaned {result.path} → {result.value}")
@@ -1,8 +1,13 @@
-import pandas as pd
 import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.formats import FORMAT_EXTENSIONS, read_report, write_report
 
 # --- Configuration ---
-input_filename = "DVN DP Util 20250715_extracted.xlsx" 
+input_filename = "DVN DP Util 20250715_extracted.xlsx"  # .xlsx, .csv or .parquet
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
 # --- End Configuration ---
 
 # Define the groups based on BRGY_NAME
@@ -41,38 +46,48 @@ group3_brgy = [
     'Acacia','Tigatto'
 ]
 
-if not input_filename:
-    print("Error: Please specify the input Excel file name in the 'input_filename' variable.")
-else:
-    try:
-        output_folder = "Files"
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
-
-        print(f"Reading '{input_filename}'...")
-        df = pd.read_excel(input_filename)
-        print("File read successfully.")
-
-        df_group1 = df[df['BRGY_NAME'].isin(group1_brgy)]
-        output_path1 = os.path.join(output_folder, "Group1_Urban_Core_Bucana.xlsx")
-        df_group1.to_excel(output_path1, index=False)
-        print(f"Group 1 saved successfully. Rows: {len(df_group1)}")
-
-        df_group2 = df[df['BRGY_NAME'].isin(group2_brgy)]
-        output_path2 = os.path.join(output_folder, "Group2_Jade_Valley_Tigatto_Airport.xlsx")
-        df_group2.to_excel(output_path2, index=False)
-        print(f"Group 2 saved successfully. Rows: {len(df_group2)}")
-
-        df_group3 = df[df['BRGY_NAME'].isin(group3_brgy)]
-        output_path3 = os.path.join(output_folder, "Group3_Cabantian_Mandug_Panacan.xlsx")
-        df_group3.to_excel(output_path3, index=False)
-        print(f"Group 3 saved successfully. Rows: {len(df_group3)}")
-
-        print("\nScript finished successfully. The files have been saved in the 'Files' directory.")
-
-    except FileNotFoundError:
-        print(f"Error: The file '{input_filename}' was not found. Please make sure the file exists and the name is correct.")
-    except KeyError:
-        print("Error: The 'BRGY_NAME' column was not found in the Excel file. Please check the column name.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+# Output file name for each group
+group_files = {
+    "Group1_Urban_Core_Bucana.xlsx": group1_brgy,
+    "Group2_Jade_Valley_Tigatto_Airport.xlsx": group2_brgy,
+    "Group3_Cabantian_Mandug_Panacan.xlsx": group3_brgy
+}
+
+
+def select_group(df, brgys):
+    """Rows whose BRGY_NAME is in the given group"""
+    return df[df['BRGY_NAME'].isin(brgys)]
+
+
+def divide_by_groups(df):
+    """Split the extracted data by BRGY_NAME group, keyed by output file name"""
+    return {filename: select_group(df, brgys) for filename, brgys in group_files.items()}
+
+
+if __name__ == "__main__":
+    if not input_filename:
+        print("Error: Please specify the input Excel file name in the 'input_filename' variable.")
+    else:
+        try:
+            output_folder = "Files"
+            if not os.path.exists(output_folder):
+                os.makedirs(output_folder)
+
+            print(f"Reading '{input_filename}'...")
+            df = read_report(input_filename)
+            print("File read successfully.")
+
+            for group_number, (filename, df_group) in enumerate(divide_by_groups(df).items(), start=1):
+                output_name = os.path.splitext(filename)[0] + FORMAT_EXTENSIONS[output_format]
+                output_path = os.path.join(output_folder, output_name)
+                write_report(df_group, output_path, output_format)
+                print(f"Group {group_number} saved successfully. Rows: {len(df_group)}")
+
+            print("\nScript finished successfully. The files have been saved in the 'Files' directory.")
+
+        except FileNotFoundError:
+            print(f"Error: The file '{input_filename}' was not found. Please make sure the file exists and the name is correct.")
+        except KeyError:
+            print("Error: The 'BRGY_NAME' column was not found in the Excel file. Please check the column name.")
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
@@ -1,11 +1,23 @@
 # pip install pandas openpyxl
 
-import pandas as pd
 import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.formats import FORMAT_EXTENSIONS, write_report
+from reportlib.partitions import read_partitions
+from reportlib.schema import iter_columns, probe_columns, read_columns
+from reportlib.snapshots import SNAPSHOT_PREFIX, read_snapshot_source
+from reportlib.spill import SpillPartitioner
 
 # --- Configuration ---
 files_folder = "Files"
-input_filename = "GT DP,NAP Utilization Report 20250715.xlsx"  # Change to your actual input file
+input_filename = "GT DP,NAP Utilization Report 20250715.xlsx"  # Change to your actual input file (.xlsx, .csv or .parquet)
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+snapshot_date = None  # e.g. "2025-07-15" to read that date from the snapshot store instead of input_filename
+partition_date = None  # e.g. "2025-07-15" or "latest" to read only the four clusters' partitions instead of input_filename
+memory_limit_mb = None  # e.g. 1024 for whole-PH exports that don't fit in memory: streams the report and spills to disk
 # --- End Configuration ---
 
 # Ensure the files folder exists
@@ -20,31 +32,17 @@ columns_to_extract = [
     'DP/NAP LAT', 'DP/NAP LONG', 'BRGY_NAME', 'CFS Cluster','Tech','Location Type'
 ]
 
-# Step 1: Read the Excel file
-df = pd.read_excel(input_path)
-
-# Step 2: Clean column names
-df.columns = df.columns.str.strip()
-
-# Step 3: Check for missing columns
-missing_cols = [col for col in columns_to_extract if col not in df.columns]
+# Step 1: Probe the header and match columns (whitespace, case and known renames)
+if snapshot_date or partition_date:
+    # Snapshots and partitions are stored under the expected column names
+    mapping, missing_cols = {col: col for col in columns_to_extract}, []
+else:
+    mapping, missing_cols, _ = probe_columns(input_path, columns_to_extract, strict=False)
 if missing_cols:
     print(f"⚠️ Warning: These columns are missing: {missing_cols}")
-    columns_to_extract = [col for col in columns_to_extract if col in df.columns]
-
-# Step 4: Filter by CFS Cluster (case-insensitive)
-if 'CFS Cluster' in df.columns:
-    df['CFS Cluster'] = df['CFS Cluster'].astype(str).str.strip().str.upper()
-    clusters = ["DAVAO NORTH", "DAVAO SOUTH", "TAGUM 1", "TAGUM 2"]
-    df_filtered = df[df['CFS Cluster'].isin(clusters)]
-else:
-    print("⚠️ 'CFS Cluster' column not found — no filtering applied.")
-    df_filtered = df
+    columns_to_extract = [col for col in columns_to_extract if col in mapping]
 
-# Step 5: Extract available columns
-filtered_df = df_filtered[columns_to_extract]
-
-# Step 6: Define barangay groups
+# Barangay groups
 group1_brgy = [
     'Agdao', 'Bago Gallera', 'Baliok', 'Bangkas Heights', 'Barangay 1-A', 
     'Barangay 2-A', 'Barangay 3-A', 'Barangay 4-A', 'Barangay 5-A', 'Barangay 6-A', 
@@ -81,20 +79,59 @@ group3_brgy = [
 
 ]
 
-# Step 7: Save grouped data
-output_path1 = os.path.join(files_folder, "Group1_Urban_Core_Bucana.xlsx")
-output_path2 = os.path.join(files_folder, "Group2_Jade_Valley_Tigatto_Airport.xlsx")
-output_path3 = os.path.join(files_folder, "Group3_Cabantian_Mandug_Panacan.xlsx")
+# Output files, one per group
+extension = FORMAT_EXTENSIONS[output_format]
+group_outputs = {
+    os.path.join(files_folder, "Group1_Urban_Core_Bucana" + extension): group1_brgy,
+    os.path.join(files_folder, "Group2_Jade_Valley_Tigatto_Airport" + extension): group2_brgy,
+    os.path.join(files_folder, "Group3_Cabantian_Mandug_Panacan" + extension): group3_brgy,
+}
+clusters = ["DAVAO NORTH", "DAVAO SOUTH", "TAGUM 1", "TAGUM 2"]
+
+
+def filter_clusters(df):
+    """Step 4: Filter by CFS Cluster (case-insensitive)"""
+    if 'CFS Cluster' not in df.columns:
+        return df
+    df = df.assign(**{'CFS Cluster': df['CFS Cluster'].astype(str).str.strip().str.upper()})
+    return df[df['CFS Cluster'].isin(clusters)]
 
-df_group1 = filtered_df[filtered_df['BRGY_NAME'].isin(group1_brgy)]
-df_group2 = filtered_df[filtered_df['BRGY_NAME'].isin(group2_brgy)]
-df_group3 = filtered_df[filtered_df['BRGY_NAME'].isin(group3_brgy)]
 
-df_group1.to_excel(output_path1, index=False)
-df_group2.to_excel(output_path2, index=False)
-df_group3.to_excel(output_path3, index=False)
+if 'CFS Cluster' not in mapping:
+    print("⚠️ 'CFS Cluster' column not found — no filtering applied.")
+
+if memory_limit_mb and not snapshot_date and not partition_date:
+    # Steps 2-7 in batches: each batch is filtered and split as it is read, and the
+    # group buffers go to temporary files whenever they pass the memory limit
+    with SpillPartitioner(memory_limit_mb) as partitioner:
+        for batch in iter_columns(input_path, mapping):
+            # Step 5: Extract available columns
+            batch = filter_clusters(batch)[columns_to_extract]
+            for output_path, brgys in group_outputs.items():
+                partitioner.add(output_path, batch[batch['BRGY_NAME'].isin(brgys)])
+        print(f"💾 Spilled {partitioner.spill_count} times "
+              f"(peak buffer {partitioner.peak_bytes / 1024 / 1024:.0f} MB of {memory_limit_mb} MB)")
+        # Step 7: Save grouped data from the spilled and buffered rows
+        for number, output_path in enumerate(group_outputs, start=1):
+            rows = partitioner.write(output_path, output_path, output_format)
+            print(f"✅ Group {number} saved: {output_path} (Rows: {rows})")
+else:
+    # Steps 2-3: Read only the matched columns, under their expected names
+    if snapshot_date:
+        df = read_snapshot_source(SNAPSHOT_PREFIX + snapshot_date, clusters=clusters)
+    elif partition_date:
+        # Partition pruning: only the four clusters' files for that date are opened
+        df = read_partitions(clusters, partition_date)
+    else:
+        df = read_columns(input_path, mapping)
+
+    # Step 5: Extract available columns
+    filtered_df = filter_clusters(df)[columns_to_extract]
+
+    # Step 7: Save grouped data
+    for number, (output_path, brgys) in enumerate(group_outputs.items(), start=1):
+        df_group = filtered_df[filtered_df['BRGY_NAME'].isin(brgys)]
+        write_report(df_group, output_path, output_format)
+        print(f"✅ Group {number} saved: {output_path} (Rows: {len(df_group)})")
 
-print(f"✅ Group 1 saved: {output_path1} (Rows: {len(df_group1)})")
-print(f"✅ Group 2 saved: {output_path2} (Rows: {len(df_group2)})")
-print(f"✅ Group 3 saved: {output_path3} (Rows: {len(df_group3)})")
 print("\n🎯 Script finished. Files are in the 'Files' folder.")
@@ -1,9 +1,16 @@
 import pandas as pd
 import os
+import sys
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.formats import FORMAT_EXTENSIONS, read_report, write_report
 
 # --- CONFIGURATION ---
-input_filename = "GT DP,NAP Utilization Report 20250715.xlsx"   # change to your actual file
+input_filename = "GT DP,NAP Utilization Report 20250715.xlsx"   # change to your actual file (.xlsx, .csv or .parquet)
 output_dir = "output_files"
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+extension = FORMAT_EXTENSIONS[output_format]
 os.makedirs(output_dir, exist_ok=True)
 
 # Columns to extract
@@ -51,7 +58,7 @@ group_mapping = {
 }
 
 # --- STEP 1: Load and filter data ---
-df = pd.read_excel(input_filename)
+df = read_report(input_filename)
 df = df[columns_to_extract]
 df = df[df['CFS Cluster'].isin(valid_clusters)]
 
@@ -64,11 +71,11 @@ def save_in_chunks(data, base_name):
         data = data.iloc[max_rows:]
         
         if part == 0:
-            filename = os.path.join(output_dir, f"{base_name}.xlsx")
+            filename = os.path.join(output_dir, f"{base_name}{extension}")
         else:
-            filename = os.path.join(output_dir, f"{base_name}_extended{part}.xlsx")
+            filename = os.path.join(output_dir, f"{base_name}_extended{part}{extension}")
         
-        part_df.to_excel(filename, index=False)
+        write_report(part_df, filename, output_format)
         part += 1
 
 for name, brgys in group_mapping.items():
@@ -80,10 +87,10 @@ for name, brgys in group_mapping.items():
 # Rule: delete rows with VDSL, ADSL, ADSL/VDSL
 #       replace blank (" ") Tech with "GPON"
 for name in group_mapping.keys():
-    files = [f for f in os.listdir(output_dir) if f.startswith(name) and f.endswith(".xlsx")]
+    files = [f for f in os.listdir(output_dir) if f.startswith(name) and f.endswith(extension)]
     for file in files:
         file_path = os.path.join(output_dir, file)
-        data = pd.read_excel(file_path)
+        data = read_report(file_path)
 
         # Replace blank with GPON
         data['Tech'] = data['Tech'].replace(" ", "GPON")
@@ -91,27 +98,27 @@ for name in group_mapping.keys():
         # Remove VDSL/ADSL/ADSL-VDSL
         data = data[~data['Tech'].isin(["VDSL", "ADSL", "ADSL/VDSL"])]
 
-        spare_name = file.replace(".xlsx", " Spare.xlsx")
-        data.to_excel(os.path.join(output_dir, spare_name), index=False)
+        spare_name = file.replace(extension, f" Spare{extension}")
+        write_report(data, os.path.join(output_dir, spare_name), output_format)
 
 # --- STEP 4: Create DSL file ---
 all_data = []
 for name in group_mapping.keys():
-    files = [f for f in os.listdir(output_dir) if f.startswith(name) and f.endswith(".xlsx") and "Spare" not in f]
+    files = [f for f in os.listdir(output_dir) if f.startswith(name) and f.endswith(extension) and "Spare" not in f]
     for file in files:
         file_path = os.path.join(output_dir, file)
-        data = pd.read_excel(file_path)
+        data = read_report(file_path)
         all_data.append(data)
 
 combined = pd.concat(all_data, ignore_index=True)
 dsl_data = combined[combined['Tech'].isin(["VDSL", "ADSL", "ADSL/VDSL"])]
-dsl_data.to_excel(os.path.join(output_dir, "DSL.xlsx"), index=False)
+write_report(dsl_data, os.path.join(output_dir, f"DSL{extension}"), output_format)
 
 # --- STEP 5: Add coordinates column to all files ---
 for file in os.listdir(output_dir):
-    if file.endswith(".xlsx"):
+    if file.endswith(extension):
         file_path = os.path.join(output_dir, file)
-        data = pd.read_excel(file_path)
+        data = read_report(file_path)
         if 'DP/NAP LAT' in data.columns and 'DP/NAP LONG' in data.columns:
             data['coordinates'] = data['DP/NAP LAT'].astype(str) + ", " + data['DP/NAP LONG'].astype(str)
-        data.to_excel(file_path, index=False)
+        write_report(data, file_path, output_format)
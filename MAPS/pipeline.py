@@ -0,0 +1,164 @@
+"""Run the MAPS workflow as one in-memory pipeline.
+
+Chains DividingData → DavaoNorthOnly → CombineLatAndLong →
+DeleteingAndCleaningNoValueFile → DavaoNorthTotal without writing and
+re-reading the intermediate workbooks. Only the final combined.xlsx is written
+unless intermediates are asked for:
+
+    python pipeline.py                                   # combined.xlsx only
+    python pipeline.py --materialize cleaned_group2      # plus one intermediate
+    python pipeline.py --materialize all                 # every stage, like the old scripts
+    python pipeline.py --format parquet                  # write Parquet instead of xlsx
+    python pipeline.py --input snapshot:2025-07-15       # read a date from the snapshot store
+    python pipeline.py --list                            # show the stages
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.config import valid_clusters
+from reportlib.formats import FORMAT_EXTENSIONS, read_report, with_format, write_report
+from reportlib.snapshots import is_snapshot_source, read_snapshot_source
+
+from DividingData import group_files, select_group
+from DavaoNorthOnly import filter_davao_north
+from CombineLatAndLong import combine_lat_long
+from DeleteingAndCleaningNoValueFile import clean_no_value
+from DavaoNorthTotal import combine_frames
+
+# --- Configuration ---
+input_filename = "DVN DP Util 20250715_extracted.xlsx"  # .xlsx, .csv or .parquet
+output_folder = "Files"
+output_format = "xlsx"  # "xlsx", "csv" or "parquet"
+# --- End Configuration ---
+
+
+class Stage:
+    """One step of the pipeline: func(*outputs of inputs) -> DataFrame"""
+
+    def __init__(self, name, func, inputs=(), output_filename=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.output_filename = output_filename
+
+
+class Pipeline:
+    """A DAG of stages whose results are handed over in memory"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name, func, inputs=(), output_filename=None):
+        for input_name in inputs:
+            if input_name not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{input_name}'")
+        self.stages[name] = Stage(name, func, inputs, output_filename)
+
+    def order(self):
+        """Stages in dependency order (stages are added after their inputs)"""
+        return list(self.stages.values())
+
+    def sinks(self):
+        used = {input_name for stage in self.stages.values() for input_name in stage.inputs}
+        return [name for name in self.stages if name not in used]
+
+    def run(self, output_dir, materialize=(), output_format="xlsx", log=print):
+        """Run every stage and write sinks plus any stage named in materialize ("all" for every stage)"""
+        if "all" in materialize:
+            materialize = set(self.stages)
+        unknown = set(materialize) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+        to_write = set(materialize) | set(self.sinks())
+
+        # Drop each result as soon as its last consumer has run
+        remaining_uses = {name: 0 for name in self.stages}
+        for stage in self.stages.values():
+            for input_name in stage.inputs:
+                remaining_uses[input_name] += 1
+
+        results = {}
+        written = {}
+        for stage in self.order():
+            started = time.perf_counter()
+            result = stage.func(*[results[input_name] for input_name in stage.inputs])
+            log(f"  {stage.name}: {len(result)} rows in {time.perf_counter() - started:.2f}s")
+
+            if stage.name in to_write and stage.output_filename:
+                output_path = with_format(os.path.join(output_dir, stage.output_filename), output_format)
+                write_report(result, output_path, output_format)
+                written[stage.name] = output_path
+                log(f"✅ Saved {output_path}")
+
+            results[stage.name] = result
+            for input_name in stage.inputs:
+                remaining_uses[input_name] -= 1
+                if remaining_uses[input_name] == 0:
+                    del results[input_name]
+        return written
+
+
+def build_maps_pipeline(input_path):
+    """The MAPS workflow; output file names match what the individual scripts write"""
+    pipeline = Pipeline()
+    if is_snapshot_source(input_path):
+        # The stored snapshot narrowed to the clusters ExtractDavaoNorthInWholePHData keeps
+        pipeline.add("extracted", lambda: read_snapshot_source(input_path, clusters=valid_clusters))
+    else:
+        pipeline.add("extracted", lambda: read_report(input_path))
+
+    for number, (filename, brgys) in enumerate(group_files.items(), start=1):
+        pipeline.add(f"group{number}", lambda df, brgys=brgys: select_group(df, brgys),
+                     ["extracted"], filename)
+
+    # Group 1 is narrowed to the DAVAO NORTH cluster before the maps
+    pipeline.add("davao_north_only", filter_davao_north, ["group1"], "Davao_North_Only.xlsx")
+
+    map_inputs = [
+        ("davao_north_only", "Davao_North_Only"),
+        ("group2", "Group2_Jade_Valley_Tigatto_Airport"),
+        ("group3", "Group3_Cabantian_Mandug_Panacan"),
+    ]
+    cleaned = []
+    for source, stem in map_inputs:
+        key = "group1" if source == "davao_north_only" else source
+        pipeline.add(f"combined_{key}", combine_lat_long, [source], f"{stem}_combined.xlsx")
+        pipeline.add(f"cleaned_{key}", clean_no_value, [f"combined_{key}"], f"{stem}_combined_cleaned.xlsx")
+        cleaned.append(f"cleaned_{key}")
+
+    pipeline.add("total", combine_frames, cleaned, "combined.xlsx")
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the MAPS workflow in memory.")
+    parser.add_argument("--input", default=input_filename, help="extracted utilization workbook, or snapshot:<date>")
+    parser.add_argument("--output", default=output_folder, help="folder for written workbooks")
+    parser.add_argument("--materialize", default="",
+                        help="comma-separated stages to also write, or 'all'")
+    parser.add_argument("--format", default=output_format, choices=sorted(FORMAT_EXTENSIONS),
+                        help="format of the written files")
+    parser.add_argument("--list", action="store_true", help="list the stages and exit")
+    args = parser.parse_args()
+
+    pipeline = build_maps_pipeline(args.input)
+    if args.list:
+        for stage in pipeline.order():
+            inputs = ", ".join(stage.inputs) or "-"
+            print(f"{stage.name:<22} <- {inputs:<40} {stage.output_filename or ''}")
+        return
+
+    os.makedirs(args.output, exist_ok=True)
+    materialize = {name.strip() for name in args.materialize.split(",") if name.strip()}
+    print(f"Running MAPS pipeline on '{args.input}'...")
+    written = pipeline.run(args.output, materialize, args.format)
+    print(f"\n🎯 Pipeline finished. {len(written)} file(s) written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
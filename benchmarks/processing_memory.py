@@ -0,0 +1,50 @@
+# Memory per stage of run_processing, with the peak RSS of the whole run.
+#
+#   python benchmarks/processing_memory.py                   # synthetic 200k-row report
+#   python benchmarks/processing_memory.py --input "Files/GT DP,NAP Utilization Report 20250715.xlsx" --trace
+#
+# Run it on the same report before and after a change to compare peak RSS.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.memstats import format_bytes, process_memory
+from reportlib.processing import run_processing
+
+from sharded_xlsx import write_synthetic_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage memory of run_processing")
+    parser.add_argument("--input", help="Report to process (default: generate a synthetic one)")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the synthetic report")
+    parser.add_argument("--format", default="csv", choices=["xlsx", "csv", "parquet"], help="Output format")
+    parser.add_argument("--trace", action="store_true", help="Also count allocations with tracemalloc (slower)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    path = args.input
+    if not path:
+        path = os.path.join(work_dir, "synthetic_report.xlsx")
+        write_synthetic_report(path, args.rows)
+        print(f"📝 Generated {args.rows:,} rows: {path}")
+
+    os.makedirs(os.path.join(work_dir, "out"), exist_ok=True)
+    start_rss, _ = process_memory()
+    start = time.perf_counter()
+    output_files = run_processing(path, os.path.join(work_dir, "out"), output_format=args.format,
+                                  debug=lambda message: message.startswith("Memory") and print(message),
+                                  trace_memory=args.trace)
+    seconds = time.perf_counter() - start
+    _, peak_rss = process_memory()
+    print(f"✅ {len(output_files)} files in {seconds:.1f}s; RSS before {format_bytes(start_rss)}, "
+          f"peak {format_bytes(peak_rss)}")
+
+
+if __name__ == "__main__":
+    main()
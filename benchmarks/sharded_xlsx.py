@@ -0,0 +1,147 @@
+# Times the sharded worksheet reader against pandas/openpyxl and across worker counts.
+#
+#   python benchmarks/sharded_xlsx.py                      # synthetic 500k-row report
+#   python benchmarks/sharded_xlsx.py --input "Files/GT DP,NAP Utilization Report 20250715.xlsx"
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.config import columns_to_extract, valid_clusters
+from reportlib.sharded import read_sheet_sharded, worksheet_size
+
+HEADER = ['Region'] + columns_to_extract
+BARANGAYS = ['Agdao', 'Sasa', 'Cabantian', 'Mandug', 'Buhangin', 'Panacan', 'Centro', 'Tibungco']
+TECHS = ['GPON', 'VDSL', 'ADSL', ' ']
+LOCATIONS = ['Urban', 'Rural']
+
+
+def _letters(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def write_synthetic_report(path, rows, seed=0):
+    """A report-shaped workbook with shared strings and a date-styled Com Date column"""
+    rng = random.Random(seed)
+    strings = {}
+
+    def shared(text):
+        return strings.setdefault(text, len(strings))
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    cols = [_letters(i) for i in range(len(HEADER))]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<worksheet {ns}><sheetData>'.encode())
+            cells = "".join(f'<c r="{c}1" t="s"><v>{shared(name)}</v></c>' for c, name in zip(cols, HEADER))
+            f.write(f'<row r="1">{cells}</row>'.encode())
+            for r in range(2, rows + 2):
+                total = rng.choice([8, 16])
+                values = [
+                    ("s", shared("MIN")),
+                    ("s", shared(f"DP{r:07d}")),
+                    ("n", rng.randint(0, total)),
+                    ("n", total),
+                    ("d", rng.randint(43000, 45500)),
+                    ("n", 7 + rng.random()),
+                    ("n", 125 + rng.random()),
+                    ("s", shared(rng.choice(BARANGAYS))),
+                    ("s", shared(rng.choice(valid_clusters))),
+                    ("s", shared(rng.choice(TECHS))),
+                    ("s", shared(rng.choice(LOCATIONS))),
+                ]
+                row = []
+                for c, (kind, value) in zip(cols, values):
+                    if kind == "s":
+                        row.append(f'<c r="{c}{r}" t="s"><v>{value}</v></c>')
+                    elif kind == "d":
+                        row.append(f'<c r="{c}{r}" s="1"><v>{value}</v></c>')
+                    else:
+                        row.append(f'<c r="{c}{r}"><v>{value}</v></c>')
+                f.write(f'<row r="{r}">{"".join(row)}</row>'.encode())
+            f.write(b"</sheetData></worksheet>")
+
+        items = "".join(f"<si><t>{escape(text)}</t></si>" for text in strings)
+        zf.writestr("xl/sharedStrings.xml", f'<sst {ns} count="{len(strings)}">{items}</sst>')
+        zf.writestr("xl/styles.xml",
+                    f'<styleSheet {ns}><cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14"/></cellXfs></styleSheet>')
+        zf.writestr("xl/workbook.xml",
+                    f'<workbook {ns} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                    'Target="worksheets/sheet1.xml"/></Relationships>')
+        zf.writestr("_rels/.rels",
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                    'Target="xl/workbook.xml"/></Relationships>')
+        zf.writestr("[Content_Types].xml",
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                    '<Default Extension="xml" ContentType="application/xml"/>'
+                    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+                    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                    '</Types>')
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sharded worksheet reader")
+    parser.add_argument("--input", help="Workbook to read (default: generate a synthetic one)")
+    parser.add_argument("--rows", type=int, default=500_000, help="Rows in the synthetic workbook")
+    parser.add_argument("--shard-mb", type=int, default=4, help="Uncompressed XML per shard")
+    parser.add_argument("--workers", type=int, nargs="*", help="Worker counts to try (default: 1, 2, 4, ... cpus)")
+    parser.add_argument("--openpyxl", action="store_true", help="Also time pandas.read_excel (slow)")
+    args = parser.parse_args()
+
+    path = args.input
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic_report.xlsx")
+        _, seconds = timed(write_synthetic_report, path, args.rows)
+        print(f"📝 Generated {args.rows:,} rows in {seconds:.1f}s: {path}")
+    print(f"📦 Worksheet XML: {worksheet_size(path) / 1024 / 1024:.0f} MB")
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus} | {cpus})
+    shard_bytes = args.shard_mb * 1024 * 1024
+
+    if args.openpyxl:
+        import pandas as pd
+        expected, seconds = timed(pd.read_excel, path, usecols=columns_to_extract)
+        print(f"openpyxl            {seconds:8.2f}s")
+    else:
+        expected = None
+
+    baseline = None
+    for count in workers:
+        df, seconds = timed(read_sheet_sharded, path, columns=columns_to_extract,
+                            max_workers=count, shard_bytes=shard_bytes)
+        baseline = baseline or seconds
+        print(f"sharded x{count:<3}       {seconds:8.2f}s   speedup {baseline / seconds:4.1f}x "
+              f"(ideal {count}x)   rows {len(df):,}")
+        if expected is not None and not df.equals(expected):
+            print("⚠️ Sharded result differs from pandas.read_excel")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,247 +1,338 @@
 import sys
 import os
+import multiprocessing
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QFileDialog, QProgressBar, QMessageBox,
-                             QListWidget, QSplitter, QTextEdit, QGroupBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                             QListWidget, QSplitter, QTextEdit, QGroupBox, QComboBox, QInputDialog,
+                             QListWidgetItem, QTableView, QLineEdit, QAbstractItemView, QCheckBox,
+                             QDialog)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont
 
+# Shared processing logic lives in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.formats import OPEN_FILTER, OUTPUT_FORMAT_LABELS, read_report, write_report
+from reportlib.jobs import init_worker, job_output_dir, run_job, warm_up
+from reportlib.preview import FrameView
+from reportlib.query import QueryError, ReportIndex, load_report
+from reportlib.sharedframes import frame_from_shared
+from reportlib.snapshots import SNAPSHOT_PREFIX, SnapshotStore
 
-columns_to_extract = [
-    'DPdeniro', 'S_SP', 'S_Total', 'Com Date',
-    'DP/NAP LAT', 'DP/NAP LONG', 'BRGY_NAME',
-    'CFS Cluster', 'Tech', 'Location Type'
-]
-
-valid_clusters = ["DAVAO NORTH", "DAVAO SOUTH", "TAGUM 1", "TAGUM 2"]
-
-group1_brgy = [
-    'Agdao', 'Bago Gallera', 'Baliok', 'Bangkas Heights', 'Barangay 1-A', 
-    'Barangay 2-A', 'Barangay 3-A', 'Barangay 4-A', 'Barangay 5-A', 'Barangay 6-A', 
-    'Barangay 7-A', 'Barangay 8-A', 'Barangay 9-A', 'Barangay 10-A', 'Barangay 11-B', 
-    'Barangay 12-B', 'Barangay 13-B', 'Barangay 14-B', 'Barangay 15-B', 'Barangay 16-B', 
-    'Barangay 17-B', 'Barangay 18-B', 'Barangay 19-B', 'Barangay 20-B', 'Barangay 21-C', 
-    'Barangay 22-C', 'Barangay 23-C', 'Barangay 24-C', 'Barangay 26-C', 'Barangay 27-C', 
-    'Barangay 28-C', 'Barangay 29-C', 'Barangay 30-C', 'Barangay 31-D', 'Barangay 32-D', 
-    'Barangay 33-D', 'Barangay 34-D', 'Barangay 35-D', 'Barangay 36-D', 'Barangay 37-D', 
-    'Barangay 38-D', 'Barangay 39-D', 'Barangay 40-D', 'Bucana', 'Centro', 
-    'Gov. Vicente Duterte', 'Gov. Paciano Bangoy', 'Lapu-lapu', 'Leon Garcia Sr.', 
-    'San Antonio', 'Tres De Mayo', 'Zone 1',
-    'Matina Crossing', 'Kap. Tomas Monteverde Sr.'
-]
-
-group2_brgy = [
-    'Rafael Castillo', 'Sasa', 'Vicente Hizon Sr.', 
-    'Ubalde', 'Wilfredo Aquino', 'Pampanga',
-    'Buhangin', 'Alfonso Angliongto Sr.'
-]
-
-group3_brgy = [
-    'Cabantian', 'Mandug', 'Panacan', 'Bunawan', 'Indangan', 
-    'Alejandra Navarro', 'Tagpore',
-    'Tibungco', 'Communal', 'San Isidro', 'Acacia','Tigatto','Ilang'
-]
-
-group_mapping = {
-    "South": group1_brgy,
-    "Central": group2_brgy,
-    "North": group3_brgy
-}
-
-
-class ExcelProcessor(QThread):
-    """Thread for processing Excel files to prevent UI freezing"""
-    progress_updated = pyqtSignal(int)
-    status_updated = pyqtSignal(str)
-    processing_finished = pyqtSignal(dict)
-    error_occurred = pyqtSignal(str)
-    debug_info = pyqtSignal(str)
-
-    def __init__(self, input_filepath, output_dir):
+# --- Configuration ---
+max_workers = 2  # reports processed at the same time
+share_results = True  # hand each job's output tables back to the window through shared memory
+use_output_cache = True  # reuse earlier outputs when the input, rules and code are unchanged
+preview_jobs = 2  # jobs whose output tables stay in memory for the preview (most recently used)
+# --- End Configuration ---
+
+
+class JobQueue(QThread):
+    """Runs report jobs on a pool of worker processes and relays their progress to the UI"""
+    job_progress = pyqtSignal(int, int)
+    job_status = pyqtSignal(int, str)
+    job_debug = pyqtSignal(int, str)
+    job_finished = pyqtSignal(int, dict, bool)
+    job_frames = pyqtSignal(int, dict)
+    job_failed = pyqtSignal(int, str)
+
+    def __init__(self, workers=max_workers):
         super().__init__()
-        self.input_filepath = input_filepath
-        self.output_dir = output_dir
-
-    def clean_barangay_name(self, name):
-        """Clean barangay name by removing extra text like (POB.) and trimming whitespace"""
-        if pd.isna(name):
-            return name
-        name = str(name).strip()
-        # Remove (POB.) and similar suffixes
-        name = name.split('(')[0].strip()
-        # Remove any trailing special characters
-        name = name.rstrip('.) ')
-        return name
-
-    def match_barangay(self, actual_name, target_names):
-        """Flexible matching of barangay names"""
-        if pd.isna(actual_name):
-            return False
-        
-        actual_clean = self.clean_barangay_name(actual_name)
-        
-        for target_name in target_names:
-            target_clean = self.clean_barangay_name(target_name)
-            # Check if the cleaned names match (case insensitive)
-            if actual_clean.lower() == target_clean.lower():
-                return True
-            # Also check if the target is contained in the actual name
-            if target_clean.lower() in actual_clean.lower():
-                return True
-        return False
+        self.workers = workers
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.stopping = False
+        # On Windows a worker holds its shared frames open until we confirm we copied them
+        self.manager = multiprocessing.Manager() if share_results and os.name == "nt" else None
+        self.receipts = {}
+        # Last status relayed per running job, and the jobs whose result is in
+        self.statuses = {}
+        self.finished = set()
+        self.start_pool()
+
+    def start_pool(self):
+        """Start the workers now so they stay up between jobs, with pandas already imported.
+
+        Progress comes back over a plain pipe-backed queue; each pool gets its
+        own, since a worker killed mid-write can leave a queue unusable.
+        """
+        self.events = multiprocessing.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                        initargs=(self.events,))
+        for _ in range(self.workers):
+            self.pool.submit(warm_up)
+
+    def restart_pool(self, broken):
+        """Replace a pool broken by a dead worker (e.g. killed for running out of memory)"""
+        with self.lock:
+            if self.pool is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.start_pool()
+
+    def submit(self, job_id, input_filepath, output_dir, output_format, bundle=False):
+        args = (run_job, job_id, input_filepath, output_dir, output_format)
+        options = {"share_frames": share_results, "bundle": bundle, "use_cache": use_output_cache}
+        if self.manager is not None:
+            options["receipts"] = self.receipts[job_id] = self.manager.Queue()
+        pool = self.pool
+        try:
+            future = pool.submit(*args, **options)
+        except BrokenProcessPool:
+            # The previous pool lost a worker; its jobs are reported as failed, this one gets a fresh pool
+            self.restart_pool(pool)
+            pool = self.pool
+            future = pool.submit(*args, **options)
+        with self.lock:
+            self.futures[job_id] = (future, pool)
+
+    def pending(self):
+        with self.lock:
+            return len(self.futures)
+
+    def relay(self, job_id, kind, value):
+        if kind == "frames":
+            # Rebuilt here, off the GUI thread
+            self.job_frames.emit(job_id, {filename: frame_from_shared(*block) for filename, block in value.items()})
+            receipt = self.receipts.pop(job_id, None)
+            if receipt is not None:
+                receipt.put(True)
+        elif kind == "debug":
+            self.job_debug.emit(job_id, value)
+        elif job_id not in self.finished:
+            # Progress arriving after the result is stale
+            if kind == "status":
+                self.statuses[job_id] = value
+            {"progress": self.job_progress, "status": self.job_status}[kind].emit(job_id, value)
+
+    def run(self):
+        while not self.stopping:
+            # Events come over their own queue, so some may still be on their way when a job's
+            # result is in; its final status comes with the result instead
+            try:
+                events = self.events
+                self.relay(*events.get(timeout=0.2))
+                while True:
+                    self.relay(*events.get_nowait())
+            except queue.Empty:
+                pass
+
+            with self.lock:
+                done = [(job_id, future, pool) for job_id, (future, pool) in self.futures.items()
+                        if future.done()]
+                for job_id, _, _ in done:
+                    del self.futures[job_id]
+                    self.receipts.pop(job_id, None)
+                    self.finished.add(job_id)
+            for job_id, future, pool in done:
+                relayed = self.statuses.pop(job_id, None)
+                error = future.exception()
+                if isinstance(error, BrokenProcessPool):
+                    # Every job on that pool fails this way; later jobs go to a new pool
+                    self.restart_pool(pool)
+                    self.job_failed.emit(job_id, "A worker process stopped unexpectedly (out of memory?); "
+                                                 "the workers were restarted, try the file again")
+                    continue
+                if error is None:
+                    output_files, from_cache, status = future.result()
+                    if status is not None and status != relayed:
+                        self.job_status.emit(job_id, status)
+                    self.job_finished.emit(job_id, output_files, from_cache)
+                else:
+                    details = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                    self.job_debug.emit(job_id, f"Error details: {details}")
+                    self.job_failed.emit(job_id, str(error))
+
+    def stop(self):
+        self.stopping = True
+        self.wait()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.manager is not None:
+            self.manager.shutdown()
+
+
+class FrameTableModel(QAbstractTableModel):
+    """Table model over a FrameView; cells are formatted only when the view asks for them"""
+
+    def __init__(self, view=None):
+        super().__init__()
+        self.view = view
+
+    def set_view(self, view):
+        self.beginResetModel()
+        self.view = view
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.view is None else len(self.view.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.view is None else len(self.view.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.view.text(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or self.view is None:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.view.columns[section]
+        # Row number in the output file (row 1 is the header)
+        return str(self.view.source_row(section) + 2)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self.view is None:
+            return
+        self.beginResetModel()
+        # Column -1 clears the sort back to file order
+        self.view.sort(column if column >= 0 else None, descending=order == Qt.DescendingOrder)
+        self.endResetModel()
+
+    def filter(self, column, text):
+        if self.view is None:
+            return
+        self.beginResetModel()
+        self.view.filter(column, text)
+        self.endResetModel()
+
+
+class ReportLoader(QThread):
+    """Loads a report and builds its query indexes off the GUI thread"""
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, source):
+        super().__init__()
+        self.source = source
 
     def run(self):
         try:
-            self.status_updated.emit("Loading Excel file...")
-            self.progress_updated.emit(10)
-            
-            # Load the Excel file
-            df = pd.read_excel(self.input_filepath)
-            
-            # DEBUG: Show column names and first few rows
-            self.debug_info.emit(f"Original DataFrame shape: {df.shape}")
-            self.debug_info.emit(f"Columns in file: {list(df.columns)}")
-            
-            self.status_updated.emit("Filtering data...")
-            self.progress_updated.emit(30)
-            
-            # Check if all required columns exist
-            missing_columns = [col for col in columns_to_extract if col not in df.columns]
-            if missing_columns:
-                self.debug_info.emit(f"WARNING: Missing columns: {missing_columns}")
-                # Try to find similar column names
-                for missing_col in missing_columns:
-                    similar_cols = [col for col in df.columns if missing_col.lower() in col.lower()]
-                    if similar_cols:
-                        self.debug_info.emit(f"  Similar columns found for '{missing_col}': {similar_cols}")
-            
-            # Filter columns and clusters
-            df = df[columns_to_extract]
-            
-            # Clean barangay names in the dataframe
-            df['BRGY_NAME_CLEAN'] = df['BRGY_NAME'].apply(self.clean_barangay_name)
-            self.debug_info.emit(f"After column filtering shape: {df.shape}")
-            
-            # Check cluster values
-            cluster_values = df['CFS Cluster'].unique() if 'CFS Cluster' in df.columns else []
-            self.debug_info.emit(f"Unique CFS Cluster values: {cluster_values}")
-            
-            df = df[df['CFS Cluster'].isin(valid_clusters)]
-            self.debug_info.emit(f"After cluster filtering shape: {df.shape}")
-            
-            # Check barangay values
-            barangay_values = df['BRGY_NAME'].unique() if 'BRGY_NAME' in df.columns else []
-            self.debug_info.emit(f"Unique BRGY_NAME values: {barangay_values[:20]}")  # First 20 only
-            
-            # Check cleaned barangay values
-            cleaned_barangay_values = df['BRGY_NAME_CLEAN'].unique() if 'BRGY_NAME_CLEAN' in df.columns else []
-            self.debug_info.emit(f"Unique cleaned BRGY_NAME values: {cleaned_barangay_values[:20]}")
-            
-            # Check tech values
-            tech_values = df['Tech'].unique() if 'Tech' in df.columns else []
-            self.debug_info.emit(f"Unique Tech values: {tech_values}")
-            
-            self.status_updated.emit("Processing barangay groups...")
-            self.progress_updated.emit(50)
-            
-            # Process barangay groups
-            output_files = {}
-            
-            for name, brgys in group_mapping.items():
-                self.debug_info.emit(f"\nProcessing {name} group...")
-                
-                # Filter by barangay using flexible matching
-                filtered = df[df['BRGY_NAME_CLEAN'].apply(lambda x: self.match_barangay(x, brgys))]
-                self.debug_info.emit(f"After barangay filtering: {filtered.shape[0]} rows")
-                
-                # Apply cluster-specific filtering
-                if name == "South":
-                    # For South group, only include Davao North entries
-                    filtered = filtered[filtered['CFS Cluster'] == "DAVAO NORTH"]
-                    self.debug_info.emit(f"After DAVAO NORTH filter: {filtered.shape[0]} rows")
-                elif name in ["Central", "North"]:
-                    # For Central and North, exclude Davao South
-                    filtered = filtered[filtered['CFS Cluster'] != "DAVAO SOUTH"]
-                    self.debug_info.emit(f"After excluding DAVAO SOUTH: {filtered.shape[0]} rows")
-                
-                # Remove the temporary clean column before saving
-                filtered_to_save = filtered.drop(columns=['BRGY_NAME_CLEAN'], errors='ignore')
-                
-                # Create main file even if empty to ensure all files are generated
-                main_filename = f"{name}.xlsx"
-                main_filepath = os.path.join(self.output_dir, main_filename)
-                filtered_to_save.to_excel(main_filepath, index=False)
-                output_files[main_filename] = main_filepath
-                self.debug_info.emit(f"Created {main_filename} with {filtered.shape[0]} rows")
-                
-                # Create spare file
-                spare_data = filtered.copy()
-                spare_data['Tech'] = spare_data['Tech'].fillna("GPON")
-                spare_data['Tech'] = spare_data['Tech'].replace(" ", "GPON")
-                spare_data = spare_data[~spare_data['Tech'].isin(["VDSL", "ADSL", "ADSL/VDSL"])]
-                spare_data = spare_data.drop(columns=['BRGY_NAME_CLEAN'], errors='ignore')
-                
-                spare_filename = f"{name} Spare.xlsx"
-                spare_filepath = os.path.join(self.output_dir, spare_filename)
-                spare_data.to_excel(spare_filepath, index=False)
-                output_files[spare_filename] = spare_filepath
-                self.debug_info.emit(f"Created {spare_filename} with {spare_data.shape[0]} rows")
-            
-            self.status_updated.emit("Creating DSL file...")
-            self.progress_updated.emit(70)
-            
-            # Create DSL file - only from Davao North cluster with DSL technologies
-            dsl_data = df[df['Tech'].isin(["VDSL", 'ADSL', 'ADSL/VDSL'])]
-            self.debug_info.emit(f"DSL technologies found: {dsl_data.shape[0]} rows")
-            
-            # Apply the Davao North constraint
-            dsl_data = dsl_data[dsl_data['CFS Cluster'] == "DAVAO NORTH"]
-            self.debug_info.emit(f"DSL from DAVAO NORTH: {dsl_data.shape[0]} rows")
-            
-            # Remove the temporary clean column before saving
-            dsl_data = dsl_data.drop(columns=['BRGY_NAME_CLEAN'], errors='ignore')
-            
-            # Create DSL file even if empty
-            dsl_filepath = os.path.join(self.output_dir, "DSL.xlsx")
-            dsl_data.to_excel(dsl_filepath, index=False)
-            output_files["DSL.xlsx"] = dsl_filepath
-            self.debug_info.emit(f"Created DSL.xlsx with {dsl_data.shape[0]} rows")
-            
-            self.status_updated.emit("Adding coordinates...")
-            self.progress_updated.emit(90)
-            
-            # Add coordinates to all files
-            for filename in os.listdir(self.output_dir):
-                if filename.endswith(".xlsx"):
-                    filepath = os.path.join(self.output_dir, filename)
-                    data = pd.read_excel(filepath)
-                    if 'DP/NAP LAT' in data.columns and 'DP/NAP LONG' in data.columns:
-                        # Handle NaN values in coordinates
-                        data['DP/NAP LAT'] = data['DP/NAP LAT'].fillna('')
-                        data['DP/NAP LONG'] = data['DP/NAP LONG'].fillna('')
-                        data['coordinates'] = data['DP/NAP LAT'].astype(str) + ", " + data['DP/NAP LONG'].astype(str)
-                    data.to_excel(filepath, index=False)
-            
-            self.progress_updated.emit(100)
-            self.status_updated.emit("Processing complete!")
-            self.debug_info.emit(f"Final output: {len(output_files)} files created")
-            self.processing_finished.emit(output_files)
-            
+            self.loaded.emit(ReportIndex(load_report(self.source)))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class TableLoader(QThread):
+    """Reads an output file for the preview off the GUI thread"""
+    loaded = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+
+    def __init__(self, key, path):
+        super().__init__()
+        self.key = key
+        self.path = path
+
+    def run(self):
+        try:
+            self.loaded.emit(self.key, read_report(self.path))
         except Exception as e:
-            self.error_occurred.emit(str(e))
-            import traceback
-            self.debug_info.emit(f"Error details: {traceback.format_exc()}")
+            self.failed.emit(self.key, str(e))
+
+
+class QueryDialog(QDialog):
+    """Ad-hoc filters over one loaded report, e.g. cluster = "TAGUM 2" and tech = GPON and s_sp >= 1"""
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.index = None
+        self.result = None
+        self.setWindowTitle(f"Query — {os.path.basename(source)}")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+        query_layout = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText('cluster = "TAGUM 2" and tech = GPON and brgy = Panacan and s_sp >= 1')
+        self.query_edit.returnPressed.connect(self.run_query)
+        self.query_edit.setEnabled(False)
+        query_layout.addWidget(self.query_edit, 1)
+        self.run_btn = QPushButton("Run")
+        self.run_btn.clicked.connect(self.run_query)
+        self.run_btn.setEnabled(False)
+        query_layout.addWidget(self.run_btn)
+        self.export_btn = QPushButton("Export Result")
+        self.export_btn.clicked.connect(self.export_result)
+        self.export_btn.setEnabled(False)
+        query_layout.addWidget(self.export_btn)
+        layout.addLayout(query_layout)
+
+        self.result_label = QLabel(f"Loading {source}...")
+        layout.addWidget(self.result_label)
+        self.model = FrameTableModel()
+        table = QTableView()
+        table.setModel(self.model)
+        table.setSortingEnabled(True)
+        table.verticalHeader().setDefaultSectionSize(22)
+        layout.addWidget(table)
+
+        self.loader = ReportLoader(source)
+        self.loader.loaded.connect(self.report_loaded)
+        self.loader.failed.connect(lambda message: self.result_label.setText(f"Error: {message}"))
+        self.loader.start()
+
+    def report_loaded(self, index):
+        self.index = index
+        self.query_edit.setEnabled(True)
+        self.run_btn.setEnabled(True)
+        self.result_label.setText(f"{index.rows:,} rows indexed. Fields: cluster, brgy, tech, location, "
+                                  f"s_sp, s_total; combine with and / or / not, in (...), between")
+        self.run_query()
+
+    def run_query(self):
+        if self.index is None:
+            return
+        start = pd.Timestamp.now()
+        try:
+            self.result = self.index.query(self.query_edit.text())
+        except QueryError as e:
+            self.result_label.setText(f"Error: {e}")
+            return
+        milliseconds = (pd.Timestamp.now() - start).total_seconds() * 1000
+        self.model.set_view(FrameView(self.result))
+        self.export_btn.setEnabled(True)
+        self.result_label.setText(f"{len(self.result):,} of {self.index.rows:,} rows ({milliseconds:.0f} ms)")
+
+    def export_result(self):
+        """Save the current result with the report writers (format from the extension)"""
+        filepath, _ = QFileDialog.getSaveFileName(self, "Export Result", "query_result.xlsx",
+                                                  "Excel (*.xlsx);;CSV (*.csv);;Parquet (*.parquet)")
+        if filepath:
+            write_report(self.result, filepath)
+            self.result_label.setText(f"{len(self.result):,} rows saved to {filepath}")
 
 
 class ExcelProcessorApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.input_filepath = None
+        self.input_filepaths = []
         self.output_dir = os.path.join(os.path.expanduser("~"), "ExcelProcessorOutput")
         os.makedirs(self.output_dir, exist_ok=True)
-        self.processor = None
+        self.jobs = {}
+        self.next_job_id = 1
+        # Output tables by job (least recently used first) and their preview views by (job, file)
+        self.frames = OrderedDict()
+        self.views = {}
+        self.table_loaders = {}
+        self.preview_wanted = None
         self.initUI()
+
+        self.job_queue = JobQueue(max_workers)
+        self.job_queue.job_progress.connect(self.update_progress)
+        self.job_queue.job_status.connect(self.update_status)
+        self.job_queue.job_debug.connect(lambda job_id, message: self.log(f"[{self.jobs[job_id]['name']}] {message}"))
+        self.job_queue.job_finished.connect(self.processing_finished)
+        self.job_queue.job_frames.connect(self.store_frames)
+        self.job_queue.job_failed.connect(self.processing_error)
+        self.job_queue.start()
         
     def initUI(self):
         self.setWindowTitle("Excel File Processor")
@@ -355,11 +446,21 @@ class ExcelProcessorApp(QMainWindow):
         file_layout = QVBoxLayout(file_group)
         
         file_btn_layout = QHBoxLayout()
-        self.select_file_btn = QPushButton("Select Excel File")
+        self.select_file_btn = QPushButton("Select Excel Files")
         self.select_file_btn.setObjectName("browseButton")
         self.select_file_btn.clicked.connect(self.select_file)
         file_btn_layout.addWidget(self.select_file_btn)
         
+        self.snapshot_btn = QPushButton("Use Stored Snapshot")
+        self.snapshot_btn.setObjectName("browseButton")
+        self.snapshot_btn.clicked.connect(self.select_snapshot)
+        file_btn_layout.addWidget(self.snapshot_btn)
+        
+        self.query_btn = QPushButton("Query a Report")
+        self.query_btn.setObjectName("browseButton")
+        self.query_btn.clicked.connect(self.open_query)
+        file_btn_layout.addWidget(self.query_btn)
+        
         self.file_label = QLabel("No file selected")
         self.file_label.setWordWrap(True)
         self.file_label.setStyleSheet("padding: 5px; background-color: #e8f4fd; border-radius: 5px;")
@@ -372,7 +473,17 @@ class ExcelProcessorApp(QMainWindow):
         progress_group = QGroupBox("Processing")
         progress_layout = QVBoxLayout(progress_group)
         
-        self.process_btn = QPushButton("Process File")
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Output format:"))
+        self.format_dropdown = QComboBox()
+        for fmt, label in OUTPUT_FORMAT_LABELS.items():
+            self.format_dropdown.addItem(label, fmt)
+        format_layout.addWidget(self.format_dropdown, 1)
+        self.bundle_check = QCheckBox("Also zip the outputs (with manifest)")
+        format_layout.addWidget(self.bundle_check)
+        progress_layout.addLayout(format_layout)
+        
+        self.process_btn = QPushButton("Process Files")
         self.process_btn.clicked.connect(self.process_file)
         self.process_btn.setEnabled(False)
         progress_layout.addWidget(self.process_btn)
@@ -392,6 +503,8 @@ class ExcelProcessorApp(QMainWindow):
         output_layout = QVBoxLayout(output_group)
         
         self.output_list = QListWidget()
+        self.output_list.itemDoubleClicked.connect(self.open_job_folder)
+        self.output_list.itemClicked.connect(self.show_preview)
         output_layout.addWidget(self.output_list)
         
         open_folder_btn = QPushButton("Open Output Folder")
@@ -401,8 +514,35 @@ class ExcelProcessorApp(QMainWindow):
         
         splitter.addWidget(output_group)
         
+        # Preview group: click an output file to browse it without opening Excel
+        preview_group = QGroupBox("Preview")
+        preview_layout = QVBoxLayout(preview_group)
+        
+        filter_layout = QHBoxLayout()
+        self.preview_label = QLabel("Click an output file to preview it")
+        filter_layout.addWidget(self.preview_label, 1)
+        filter_layout.addWidget(QLabel("Filter:"))
+        self.filter_column = QComboBox()
+        self.filter_column.addItem("All columns", None)
+        filter_layout.addWidget(self.filter_column)
+        self.filter_text = QLineEdit()
+        self.filter_text.setPlaceholderText("Text to find, then Enter")
+        self.filter_text.returnPressed.connect(self.apply_filter)
+        filter_layout.addWidget(self.filter_text, 1)
+        preview_layout.addLayout(filter_layout)
+        
+        self.preview_model = FrameTableModel()
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
+        self.preview_table.setSortingEnabled(True)
+        self.preview_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.preview_table.verticalHeader().setDefaultSectionSize(22)
+        preview_layout.addWidget(self.preview_table)
+        
+        splitter.addWidget(preview_group)
+        
         # Set splitter sizes
-        splitter.setSizes([150, 150, 300])
+        splitter.setSizes([150, 150, 300, 300])
         
         # Log area
         log_group = QGroupBox("Processing Log")
@@ -420,82 +560,249 @@ class ExcelProcessorApp(QMainWindow):
         self.log_text.append(f"{pd.Timestamp.now().strftime('%H:%M:%S')} - {message}")
         
     def select_file(self):
-        """Open a file dialog to select an Excel file"""
-        filepath, _ = QFileDialog.getOpenFileName(
-            self, "Select Excel File", "", "Excel Files (*.xlsx *.xls)"
+        """Open a file dialog to select one or more Excel, CSV or Parquet reports"""
+        filepaths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Excel Files", "", OPEN_FILTER
         )
         
-        if filepath:
-            self.input_filepath = filepath
-            self.file_label.setText(filepath)
+        if filepaths:
+            self.input_filepaths = filepaths
+            self.file_label.setText(filepaths[0] if len(filepaths) == 1 else
+                                    f"{len(filepaths)} files: " + ", ".join(os.path.basename(f) for f in filepaths))
             self.process_btn.setEnabled(True)
-            self.log(f"Selected file: {filepath}")
+            for filepath in filepaths:
+                self.log(f"Selected file: {filepath}")
+            
+    def open_query(self):
+        """Open the filter console on the selected report (or ask for one)"""
+        source = self.input_filepaths[0] if self.input_filepaths else None
+        if source is None:
+            source, _ = QFileDialog.getOpenFileName(self, "Select a Report to Query", "", OPEN_FILTER)
+            if not source:
+                return
+        # Kept on the window so the dialog (and its loader thread) outlives this call
+        self.query_dialog = QueryDialog(source, self)
+        self.query_dialog.show()
+        self.log(f"Opened query console on {source}")
+        
+    def select_snapshot(self):
+        """Pick a report date already ingested into the snapshot store"""
+        with SnapshotStore() as store:
+            dates = store.dates()
+        if not dates:
+            QMessageBox.information(self, "No Snapshots",
+                                    "No reports have been ingested yet.\n"
+                                    "Run: python -m reportlib.snapshots ingest <report files>")
+            return
+        snapshot_date, ok = QInputDialog.getItem(self, "Stored Snapshot", "Report date:",
+                                                 list(reversed(dates)), 0, False)
+        if ok:
+            self.input_filepaths = [SNAPSHOT_PREFIX + snapshot_date]
+            self.file_label.setText(f"Snapshot {snapshot_date} (from the snapshot store)")
+            self.process_btn.setEnabled(True)
+            self.log(f"Selected snapshot: {snapshot_date}")
             
     def process_file(self):
-        """Start processing the selected file"""
-        if not self.input_filepath:
+        """Queue every selected file as a job with its own output folder"""
+        if not self.input_filepaths:
             QMessageBox.warning(self, "Warning", "Please select an Excel file first.")
             return
             
-        # Disable the process button during processing
+        output_format = self.format_dropdown.currentData()
+        bundle = self.bundle_check.isChecked()
+        for input_filepath in self.input_filepaths:
+            job_id = self.next_job_id
+            self.next_job_id += 1
+            name = os.path.basename(input_filepath)
+            job_dir = job_output_dir(self.output_dir, input_filepath, job_id)
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, job_dir)
+            self.output_list.addItem(item)
+            self.jobs[job_id] = {"name": name, "item": item, "dir": job_dir,
+                                 "progress": 0, "status": "Queued", "state": "⏳"}
+            self.refresh_job(job_id)
+            self.job_queue.submit(job_id, input_filepath, job_dir, output_format, bundle)
+            self.log(f"Queued {name} (job {job_id}) -> {job_dir}")
+
+        # Selected files are queued; new files can be picked while they run
+        self.input_filepaths = []
+        self.file_label.setText("No file selected")
         self.process_btn.setEnabled(False)
-        self.select_file_btn.setEnabled(False)
-        self.output_list.clear()
-        self.progress_bar.setValue(0)
-        self.status_label.setText("Processing...")
-        
-        # Create and start the processor thread
-        self.processor = ExcelProcessor(self.input_filepath, self.output_dir)
-        self.processor.progress_updated.connect(self.update_progress)
-        self.processor.status_updated.connect(self.update_status)
-        self.processor.processing_finished.connect(self.processing_finished)
-        self.processor.error_occurred.connect(self.processing_error)
-        self.processor.debug_info.connect(self.log)
-        self.processor.start()
-        
-        self.log("Started processing file")
-        
-    def update_progress(self, value):
-        """Update the progress bar"""
-        self.progress_bar.setValue(value)
-        
-    def update_status(self, status):
-        """Update the status label"""
-        self.status_label.setText(status)
-        self.log(status)
-        
-    def processing_finished(self, output_files):
-        """Handle completion of processing"""
-        self.process_btn.setEnabled(True)
-        self.select_file_btn.setEnabled(True)
-        self.status_label.setText("Processing complete!")
-        
-        # Add output files to the list
-        for filename in output_files:
-            self.output_list.addItem(filename)
+        self.refresh_overall()
+        
+    def refresh_job(self, job_id):
+        job = self.jobs[job_id]
+        job["item"].setText(f"{job['state']} {job['name']} — {job['progress']}% {job['status']}")
+        
+    def refresh_overall(self):
+        """Overall bar and label across the jobs that haven't finished"""
+        active = [job for job in self.jobs.values() if job["state"] in ("⏳", "▶")]
+        if not active:
+            self.progress_bar.setValue(100 if self.jobs else 0)
+            self.status_label.setText("All jobs finished" if self.jobs else "Ready to process")
+            return
+        running = sum(job["state"] == "▶" for job in active)
+        self.progress_bar.setValue(sum(job["progress"] for job in active) // len(active))
+        self.status_label.setText(f"{running} running, {len(active) - running} queued")
+        
+    def update_progress(self, job_id, value):
+        """Update a job's progress"""
+        job = self.jobs[job_id]
+        job["progress"] = value
+        job["state"] = "▶"
+        self.refresh_job(job_id)
+        self.refresh_overall()
+        
+    def update_status(self, job_id, status):
+        """Update a job's status text"""
+        job = self.jobs[job_id]
+        job["status"] = status
+        job["state"] = "▶"
+        self.refresh_job(job_id)
+        self.refresh_overall()
+        self.log(f"[{job['name']}] {status}")
+        
+    def processing_finished(self, job_id, output_files, from_cache):
+        """List a finished job's files under its entry"""
+        job = self.jobs[job_id]
+        origin = " (from cache)" if from_cache else ""
+        job.update(progress=100, state="✅", output_files=output_files,
+                   status=f"{len(output_files)} files in {os.path.basename(job['dir'])}{origin}")
+        self.refresh_job(job_id)
+        
+        # Add output files to the list, right under the job
+        row = self.output_list.row(job["item"])
+        for offset, filename in enumerate(output_files, start=1):
+            item = QListWidgetItem(f"      {filename}{origin}")
+            item.setData(Qt.UserRole, job["dir"])
+            item.setData(Qt.UserRole + 1, (job_id, filename))
+            self.output_list.insertItem(row + offset, item)
             
-        self.log(f"Processing complete. Generated {len(output_files)} files.")
-        QMessageBox.information(self, "Success", 
-                               f"Processing complete! Generated {len(output_files)} files.")
-        
-    def processing_error(self, error_message):
-        """Handle processing errors"""
-        self.process_btn.setEnabled(True)
-        self.select_file_btn.setEnabled(True)
-        self.status_label.setText("Error occurred!")
-        
-        self.log(f"Error: {error_message}")
-        QMessageBox.critical(self, "Error", f"An error occurred during processing:\n{error_message}")
+        if from_cache:
+            self.log(f"[{job['name']}] Unchanged input and rules: {len(output_files)} files restored from cache.")
+        else:
+            self.log(f"[{job['name']}] Processing complete. Generated {len(output_files)} files.")
+        self.refresh_overall()
+        
+    def keep_frames(self, job_id, frames):
+        """Keep a job's output tables for previewing; only the preview_jobs most recently used jobs keep theirs"""
+        self.frames.setdefault(job_id, {}).update(frames)
+        self.frames.move_to_end(job_id)
+        while len(self.frames) > preview_jobs:
+            evicted, _ = self.frames.popitem(last=False)
+            for key in [key for key in self.views if key[0] == evicted]:
+                del self.views[key]
+
+    def store_frames(self, job_id, frames):
+        """Keep a finished job's output tables (from shared memory) for previewing"""
+        self.keep_frames(job_id, frames)
+        rows = sum(len(df) for df in frames.values())
+        self.log(f"[{self.jobs[job_id]['name']}] Received {len(frames)} tables ({rows} rows) from the worker")
+        
+    def show_preview(self, item):
+        """Show a finished job's output table in the preview pane"""
+        key = item.data(Qt.UserRole + 1)
+        if not key:
+            return
+        job_id, filename = key
+        job = self.jobs[job_id]
+        self.preview_wanted = key
+        if filename in self.frames.get(job_id, {}):
+            self.frames.move_to_end(job_id)
+            self.display_preview(key)
+            return
+        if filename.endswith(".zip"):
+            self.preview_label.setText(f"{filename}: no preview for bundles")
+            return
+        # Cached runs (or share_results = False) don't send their tables, and old ones are let go; read the file
+        self.preview_label.setText(f"{job['name']} / {filename}: loading...")
+        if key not in self.table_loaders:
+            loader = self.table_loaders[key] = TableLoader(key, job["output_files"][filename])
+            loader.loaded.connect(self.table_loaded)
+            loader.failed.connect(self.table_failed)
+            loader.finished.connect(lambda: self.table_loaders.pop(key, None))
+            loader.start()
+
+    def table_loaded(self, key, df):
+        job_id, filename = key
+        self.keep_frames(job_id, {filename: df})
+        self.log(f"[{self.jobs[job_id]['name']}] Loaded {filename} from disk for the preview")
+        if key == self.preview_wanted:
+            self.display_preview(key)
+
+    def table_failed(self, key, message):
+        job_id, filename = key
+        self.log(f"[{self.jobs[job_id]['name']}] Couldn't load {filename} for the preview: {message}")
+        if key == self.preview_wanted:
+            self.preview_label.setText(f"{self.jobs[job_id]['name']} / {filename}: {message}")
+
+    def display_preview(self, key):
+        job_id, filename = key
+        if key not in self.views:
+            self.views[key] = FrameView(self.frames[job_id][filename])
+        view = self.views[key]
+        self.filter_column.blockSignals(True)
+        self.filter_column.clear()
+        self.filter_column.addItem("All columns", None)
+        for column, name in enumerate(view.columns):
+            self.filter_column.addItem(name, column)
+        self.filter_column.setCurrentIndex(0 if view.filter_column is None else view.filter_column + 1)
+        self.filter_column.blockSignals(False)
+        self.filter_text.setText(view.filter_text)
+        self.preview_model.set_view(view)
+        self.preview_table.horizontalHeader().setSortIndicator(
+            -1 if view.sort_column is None else view.sort_column,
+            Qt.DescendingOrder if view.descending else Qt.AscendingOrder)
+        self.preview_key = key
+        self.refresh_preview_label()
+        
+    def apply_filter(self):
+        """Filter the previewed table on the chosen column (or all of them)"""
+        if self.preview_model.view is None:
+            return
+        self.preview_model.filter(self.filter_column.currentData(), self.filter_text.text())
+        self.refresh_preview_label()
+        
+    def refresh_preview_label(self):
+        view = self.preview_model.view
+        job_id, filename = self.preview_key
+        shown = f"{len(view.rows):,} of {view.total_rows:,} rows" if view.filter_text else f"{view.total_rows:,} rows"
+        self.preview_label.setText(f"{self.jobs[job_id]['name']} / {filename}: {shown}")
+        
+    def processing_error(self, job_id, error_message):
+        """Mark a failed job; the other jobs keep running"""
+        job = self.jobs[job_id]
+        job.update(state="❌", status=f"Error: {error_message}")
+        self.refresh_job(job_id)
+        self.refresh_overall()
+        
+        self.log(f"[{job['name']}] Error: {error_message}")
+        QMessageBox.critical(self, "Error", f"An error occurred while processing {job['name']}:\n{error_message}")
+        
+    def open_job_folder(self, item):
+        """Double-clicking a job or one of its files opens that job's folder"""
+        job_dir = item.data(Qt.UserRole)
+        if job_dir and os.path.isdir(job_dir):
+            self.open_folder(job_dir)
+            
+    def closeEvent(self, event):
+        self.job_queue.stop()
+        super().closeEvent(event)
         
     def open_output_folder(self):
         """Open the output folder in the system file explorer"""
-        os.startfile(self.output_dir) if os.name == 'nt' else \
-        os.system(f'open "{self.output_dir}"') if os.name == 'posix' and sys.platform == 'darwin' else \
-        os.system(f'xdg-open "{self.output_dir}"')
+        self.open_folder(self.output_dir)
         self.log("Opened output folder")
+        
+    def open_folder(self, folder):
+        os.startfile(folder) if os.name == 'nt' else \
+        os.system(f'open "{folder}"') if os.name == 'posix' and sys.platform == 'darwin' else \
+        os.system(f'xdg-open "{folder}"')
 
 
 if __name__ == "__main__":
+    # Needed by the frozen (PyInstaller) build, which reads multi-sheet reports in worker processes
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     # Set application style
@@ -0,0 +1,235 @@
+"""Local HTTP API around the Excel processing pipeline.
+
+    uvicorn server:app --host 127.0.0.1 --port 8000     (or: python server.py)
+
+POST /jobs?output_format=xlsx   upload a report (xlsx/csv/parquet), returns {"job_id": ...}
+GET  /jobs/{job_id}             job status and the generated file names
+GET  /jobs/{job_id}/files/{name} download one generated file
+GET  /jobs/{job_id}/zip         download every generated file as one zip
+
+Results are cached by a key over the uploaded bytes, the output format, the
+routing rules (barangay fixes included) and the code version, so uploading the
+same report again is answered straight from the cache until a rule or the
+processing code changes. Finished jobs are forgotten (oldest first) beyond
+max_jobs; their results stay cached on disk.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
+
+# Shared processing logic lives in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.barangay import BarangayResolver
+from reportlib.formats import FORMAT_EXTENSIONS, detect_format
+from reportlib.hashing import stream_digest
+from reportlib.outputcache import cache_key
+from reportlib.processing import output_rules, run_processing
+
+# --- Configuration ---
+storage_root = os.path.join(os.path.expanduser("~"), "ExcelProcessorService")
+max_workers = 2
+max_jobs = 1000  # job statuses kept in memory
+# --- End Configuration ---
+
+upload_dir = os.path.join(storage_root, "uploads")
+results_dir = os.path.join(storage_root, "results")
+MANIFEST_FILENAME = "manifest.json"
+BUNDLE_FILENAME = "results.zip"
+
+# job_id -> job dict; digest -> job_id of the job currently producing that result
+jobs = {}
+running_digests = {}
+background_tasks = set()
+pool = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global pool
+    os.makedirs(upload_dir, exist_ok=True)
+    os.makedirs(results_dir, exist_ok=True)
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    yield
+    pool.shutdown(wait=True)
+
+
+app = FastAPI(title="Excel Processor", lifespan=lifespan)
+
+
+def process_upload(upload_path, result_dir, output_format):
+    """Worker entry point: process into a scratch folder, then publish it atomically"""
+    scratch_dir = result_dir + ".partial"
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    os.makedirs(scratch_dir)
+    output_files = run_processing(upload_path, scratch_dir, output_format=output_format)
+    with open(os.path.join(scratch_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(sorted(output_files), f)
+    os.replace(scratch_dir, result_dir)
+    return sorted(output_files)
+
+
+def result_key(upload_path, output_format):
+    """Cache key of a result: upload content, output format, routing rules and code version"""
+    return cache_key(upload_path, output_rules(output_format, BarangayResolver()))
+
+
+def cached_files(digest):
+    """File names of a finished result for this key, or None"""
+    manifest_path = os.path.join(results_dir, digest, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_upload(source, extension):
+    """Copy an upload into upload_dir in chunks, hashing it on the way; the file is named by its content"""
+    tmp_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        digest = stream_digest(source, f)
+    path = os.path.join(upload_dir, f"{digest}{extension}")
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+    return path
+
+
+def build_bundle(digest, filenames):
+    bundle_path = os.path.join(results_dir, digest, BUNDLE_FILENAME)
+    if not os.path.exists(bundle_path):
+        tmp_path = bundle_path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as bundle:
+            for filename in filenames:
+                bundle.write(os.path.join(results_dir, digest, filename), filename)
+        os.replace(tmp_path, bundle_path)
+    return bundle_path
+
+
+def add_job(job):
+    """Track a new job, forgetting the oldest finished ones beyond max_jobs"""
+    jobs[job["job_id"]] = job
+    finished = [job_id for job_id, old in jobs.items() if old["status"] in ("done", "failed")]
+    for job_id in finished[:len(jobs) - max_jobs]:
+        del jobs[job_id]
+
+
+def restart_pool(broken):
+    """Replace a pool broken by a dead worker (e.g. killed for running out of memory)"""
+    global pool
+    if pool is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+
+
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+
+def finished_job(job_id):
+    job = get_job(job_id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job
+
+
+async def run_job(job_id, upload_path):
+    job = jobs[job_id]
+    loop = asyncio.get_running_loop()
+    args = (process_upload, upload_path, os.path.join(results_dir, job["digest"]), job["output_format"])
+    used = pool
+    try:
+        try:
+            result = loop.run_in_executor(used, *args)
+        except BrokenProcessPool:
+            # An earlier job lost a worker; this one gets a fresh pool
+            restart_pool(used)
+            used = pool
+            result = loop.run_in_executor(used, *args)
+        job["files"] = await result
+        job["status"] = "done"
+    except BrokenProcessPool:
+        # Every job on that pool fails this way; later jobs go to a new pool
+        restart_pool(used)
+        job["status"] = "failed"
+        job["error"] = "A worker process stopped unexpectedly (out of memory?); try again"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        running_digests.pop(job["digest"], None)
+
+
+@app.post("/jobs")
+async def create_job(file: UploadFile = File(...),
+                     output_format: str = Query("xlsx", pattern="^(xlsx|csv|parquet)$")):
+    try:
+        input_format = detect_format(file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    upload_path = await asyncio.to_thread(save_upload, file.file, FORMAT_EXTENSIONS[input_format])
+    # Another output format, a rules edit or a code change makes a different result
+    digest = await asyncio.to_thread(result_key, upload_path, output_format)
+
+    # Same content is already being processed for someone else: share that job
+    if digest in running_digests:
+        return {"job_id": running_digests[digest], "cached": False}
+
+    job_id = uuid.uuid4().hex
+    job = {"job_id": job_id, "filename": file.filename, "digest": digest,
+           "output_format": output_format, "status": "queued", "cached": False, "files": [], "error": None}
+    add_job(job)
+    # Claim the digest before awaiting so a concurrent identical upload joins this job
+    running_digests[digest] = job_id
+
+    files = await asyncio.to_thread(cached_files, digest)
+    if files is not None:
+        running_digests.pop(digest, None)
+        job.update(status="done", cached=True, files=files)
+        return {"job_id": job_id, "cached": True}
+
+    job["status"] = "running"
+    task = asyncio.create_task(run_job(job_id, upload_path))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return {"job_id": job_id, "cached": False}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    return get_job(job_id)
+
+
+@app.get("/jobs/{job_id}/files/{filename}")
+def download_file(job_id: str, filename: str):
+    job = finished_job(job_id)
+    if filename not in job["files"]:
+        raise HTTPException(status_code=404, detail="No such output file")
+    return FileResponse(os.path.join(results_dir, job["digest"], filename), filename=filename)
+
+
+@app.get("/jobs/{job_id}/zip")
+async def download_zip(job_id: str):
+    job = finished_job(job_id)
+    bundle_path = await asyncio.to_thread(build_bundle, job["digest"], job["files"])
+    stem = os.path.splitext(job["filename"] or "report")[0]
+    return FileResponse(bundle_path, filename=f"{stem}_results.zip", media_type="application/zip")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=8000)
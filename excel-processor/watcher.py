@@ -0,0 +1,281 @@
+"""Headless watch-folder service for incoming utilization reports.
+
+Polls a drop folder for new or changed reports (*.xlsx, *.csv, *.parquet), waits until each file has
+stopped growing, skips content it has already processed and runs the same
+processing as the GUI's "Process File" on a bounded pool of worker processes.
+
+    python watcher.py --watch "\\\\share\\reports" --workers 3
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Shared processing logic lives in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.hashing import file_digest
+from reportlib.processing import run_processing
+
+# --- Configuration ---
+watch_folder = os.path.join(os.path.expanduser("~"), "ExcelProcessorInbox")
+output_root = os.path.join(os.path.expanduser("~"), "ExcelProcessorOutput")
+max_workers = 2          # reports processed at the same time
+max_queue = 20           # ready reports waiting for a worker
+poll_interval = 5        # seconds between folder scans
+settle_time = 10         # seconds a file must stay unchanged before it is picked up
+output_format = "xlsx"   # "xlsx", "csv" or "parquet"
+# --- End Configuration ---
+
+REPORT_EXTENSIONS = (".xlsx", ".csv", ".parquet")
+STATE_FILENAME = "processed.json"
+METRICS_FILENAME = "metrics.json"
+
+log = logging.getLogger("watcher")
+
+
+def process_job(input_filepath, output_dir, fmt):
+    """Worker entry point: process one report into its own output folder"""
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.time()
+    output_files = run_processing(input_filepath, output_dir, output_format=fmt)
+    return len(output_files), time.time() - started
+
+
+class WatcherMetrics:
+    """Counters for throughput and queue depth, written to metrics.json"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.discovered = 0
+        self.duplicates = 0
+        self.completed = 0
+        self.failed = 0
+        self.processing_seconds = 0.0
+        self.queue_depth = 0
+        self.in_flight = 0
+
+    def snapshot(self):
+        uptime = max(time.time() - self.started_at, 1e-9)
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "discovered": self.discovered,
+            "duplicates": self.duplicates,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "throughput_per_hour": round(self.completed * 3600 / uptime, 2),
+            "avg_job_seconds": round(self.processing_seconds / self.completed, 2) if self.completed else None,
+        }
+
+
+class ReportWatcher:
+    """Detects settled reports, deduplicates them by content hash and feeds the worker pool"""
+
+    def __init__(self, watch_dir, output_dir, workers=max_workers, queue_size=max_queue,
+                 settle_seconds=settle_time, fmt=output_format):
+        self.watch_dir = watch_dir
+        self.output_format = fmt
+        self.output_dir = output_dir
+        self.workers = workers
+        self.queue_size = queue_size
+        self.settle_seconds = settle_seconds
+        self.metrics = WatcherMetrics()
+        self.pending = deque()
+        # future -> (path, digest, output dir, pool it runs on)
+        self.running = {}
+        self.pool = None
+        # path -> (size, mtime, first time this signature was seen)
+        self.candidates = {}
+        # path -> (size, mtime) of the last version that was hashed
+        self.hashed = {}
+        self.state_path = os.path.join(output_dir, STATE_FILENAME)
+        self.processed = self.load_state()
+
+    def load_state(self):
+        """Content hashes already processed, so restarts don't redo old reports"""
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def save_state(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.processed, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def write_metrics(self):
+        self.metrics.queue_depth = len(self.pending)
+        self.metrics.in_flight = len(self.running)
+        tmp_path = os.path.join(self.output_dir, METRICS_FILENAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.metrics.snapshot(), f, indent=2)
+        os.replace(tmp_path, os.path.join(self.output_dir, METRICS_FILENAME))
+
+    def is_queued(self, path):
+        return any(job[0] == path for job in self.pending) or \
+            any(job[0] == path for job in self.running.values())
+
+    def scan(self):
+        """Queue every report whose size and mtime have been stable for settle_seconds"""
+        now = time.time()
+        seen = set()
+        for filename in os.listdir(self.watch_dir):
+            # Skip Excel's "~$" lock files and anything that isn't a report
+            if not filename.lower().endswith(REPORT_EXTENSIONS) or filename.startswith("~$"):
+                continue
+            path = os.path.join(self.watch_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            signature = (stat.st_size, stat.st_mtime)
+            if self.hashed.get(path) == signature or self.is_queued(path):
+                continue
+
+            previous = self.candidates.get(path)
+            if previous is None or previous[:2] != signature:
+                self.candidates[path] = signature + (now,)
+                continue
+            if now - previous[2] < self.settle_seconds:
+                continue
+            if len(self.pending) >= self.queue_size:
+                # Leave it as a candidate (still listed in seen, so its settle time is kept);
+                # it is picked up once the queue drains
+                continue
+            if not self.is_readable(path):
+                continue
+
+            del self.candidates[path]
+            self.hashed[path] = signature
+            self.enqueue(path)
+
+        # Forget files that were moved away before they settled
+        for path in list(self.candidates):
+            if path not in seen:
+                del self.candidates[path]
+
+    def is_readable(self, path):
+        """Files still being copied are usually locked on Windows shares"""
+        try:
+            with open(path, "rb") as f:
+                f.read(1)
+            return True
+        except OSError:
+            return False
+
+    def enqueue(self, path):
+        self.metrics.discovered += 1
+        digest = file_digest(path)
+        if digest in self.processed:
+            self.metrics.duplicates += 1
+            log.info("Skipping %s: same content as %s", os.path.basename(path),
+                     self.processed[digest]["source"])
+            return
+        for job in list(self.pending) + list(self.running.values()):
+            if job[1] == digest:
+                self.metrics.duplicates += 1
+                log.info("Skipping %s: same content as queued %s", os.path.basename(path),
+                         os.path.basename(job[0]))
+                return
+        stem = os.path.splitext(os.path.basename(path))[0]
+        job_output_dir = os.path.join(self.output_dir, f"{stem}_{digest[:8]}")
+        self.pending.append((path, digest, job_output_dir))
+        log.info("Queued %s (queue depth %d)", os.path.basename(path), len(self.pending))
+
+    def start_pool(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def restart_pool(self, broken):
+        """Replace a pool broken by a dead worker (e.g. killed for running out of memory)"""
+        if self.pool is broken:
+            log.warning("A worker process died; starting new workers")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.start_pool()
+
+    def dispatch(self):
+        while self.pending and len(self.running) < self.workers:
+            job = self.pending.popleft()
+            pool = self.pool
+            try:
+                future = pool.submit(process_job, job[0], job[2], self.output_format)
+            except BrokenProcessPool:
+                # Its running jobs are reported by collect(); this one waits for the new pool
+                self.pending.appendleft(job)
+                self.restart_pool(pool)
+                continue
+            self.running[future] = job + (pool,)
+            log.info("Started %s", os.path.basename(job[0]))
+
+    def collect(self):
+        for future in [f for f in self.running if f.done()]:
+            path, digest, job_output_dir, pool = self.running.pop(future)
+            try:
+                file_count, elapsed = future.result()
+            except Exception as e:
+                self.metrics.failed += 1
+                if isinstance(e, BrokenProcessPool):
+                    # Every job running on that pool fails this way
+                    self.restart_pool(pool)
+                    e = "a worker process stopped unexpectedly (out of memory?)"
+                # Its signature stays in hashed: retried only once the file changes again
+                log.error("Failed %s: %s", os.path.basename(path), e)
+                continue
+            self.metrics.completed += 1
+            self.metrics.processing_seconds += elapsed
+            self.processed[digest] = {
+                "source": os.path.basename(path),
+                "output_dir": job_output_dir,
+                "processed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self.save_state()
+            log.info("Finished %s: %d files in %.1fs -> %s", os.path.basename(path),
+                     file_count, elapsed, job_output_dir)
+
+    def serve_forever(self, interval=poll_interval):
+        os.makedirs(self.watch_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+        log.info("Watching %s with %d worker(s)", self.watch_dir, self.workers)
+        self.start_pool()
+        try:
+            while True:
+                self.collect()
+                self.scan()
+                self.dispatch()
+                self.write_metrics()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            log.info("Stopping; waiting for %d running job(s)", len(self.running))
+        finally:
+            self.pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process utilization reports dropped into a folder.")
+    parser.add_argument("--watch", default=watch_folder, help="folder to watch for xlsx/csv/parquet reports")
+    parser.add_argument("--output", default=output_root, help="root folder for per-report outputs")
+    parser.add_argument("--workers", type=int, default=max_workers, help="reports processed concurrently")
+    parser.add_argument("--queue", type=int, default=max_queue, help="maximum reports waiting for a worker")
+    parser.add_argument("--interval", type=float, default=poll_interval, help="seconds between scans")
+    parser.add_argument("--settle", type=float, default=settle_time,
+                        help="seconds a file must be unchanged before processing")
+    parser.add_argument("--format", default=output_format, choices=["xlsx", "csv", "parquet"],
+                        help="format of the generated files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s", datefmt="%H:%M:%S")
+    watcher = ReportWatcher(args.watch, args.output, workers=args.workers,
+                            queue_size=args.queue, settle_seconds=args.settle, fmt=args.format)
+    watcher.serve_forever(interval=args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,45 @@
 # pip install pandas openpyxl
 
 import pandas as pd
+import argparse
 import os
 
+from reportlib.batch import FrameConcat, expand_inputs, iter_batch, report_timing
+
 # Folder where the Excel files are stored
 files_folder = "Files"
 
 # Ensure the folder exists
 os.makedirs(files_folder, exist_ok=True)
 
-# List of Excel files to merge (located inside the files folder)
+# List of Excel files to merge (located inside the files folder; glob patterns work too)
 excel_files = [
     os.path.join(files_folder, "file1.xlsx"), # Replace with actual file names
     os.path.join(files_folder, "file2.xlsx")  # Replace with actual file names
 ]
 
-# Read and concatenate all files
-df_list = [pd.read_excel(f) for f in excel_files]
-merged_df = pd.concat(df_list, ignore_index=True)
+# Files read at the same time (None: one per CPU)
+max_workers = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge Excel files and remove duplicate rows.")
+    parser.add_argument("files", nargs="*", help="files or glob patterns (default: excel_files above)")
+    parser.add_argument("--workers", type=int, default=max_workers)
+    args = parser.parse_args()
 
-# Remove duplicate rows (keep the first occurrence)
-merged_df = merged_df.drop_duplicates()
+    # Read the files in parallel; duplicates are dropped once all are in
+    # (keeping the first occurrence, in file order)
+    merged = FrameConcat(dedup=True)
+    for result in iter_batch(expand_inputs(args.files or excel_files), pd.read_excel, args.workers):
+        merged.add(result.value)
+        report_timing(result, f" ({len(result.value)} rows)")
+    merged_df = merged.result()
 
-# Output file path
-output_path = os.path.join(files_folder, "merged_no_duplicates.xlsx")
+    # Output file path
+    output_path = os.path.join(files_folder, "merged_no_duplicates.xlsx")
 
-# Save the merged, deduplicated data
-merged_df.to_excel(output_path, index=False)
+    # Save the merged, deduplicated data
+    merged_df.to_excel(output_path, index=False)
 
-print(f"✅ Files merged and duplicates removed. Output: '{output_path}'")
+    print(f"✅ Files merged and {merged.duplicates} duplicates removed. Output: '{output_path}'")
@@ -0,0 +1 @@
+"""Shared helpers for the utilization report tools (GUIs, MAPS scripts, services)."""
@@ -0,0 +1,253 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+from reportlib.config import data_dir, group_mapping
+
+RESOLUTIONS_FILENAME = "barangay_resolutions.json"
+REVIEW_FILENAME = "barangay_review.csv"
+
+# Abbreviations spelled out before comparing names
+ABBREVIATIONS = {
+    "sta": "santa",
+    "sto": "santo",
+    "gov": "governor",
+    "kap": "kapitan",
+    "gen": "general",
+    "pres": "president",
+}
+# Leading words that aren't part of the name ("Brgy. Sasa", "Barangay 1-A")
+PREFIXES = {"brgy", "bgy", "brg", "barangay"}
+# Trailing words that only mark the poblacion ("Centro Pob.")
+SUFFIXES = {"pob", "poblacion"}
+
+
+def clean_barangay_name(name):
+    """Clean barangay name by removing extra text like (POB.) and trimming whitespace"""
+    if pd.isna(name):
+        return name
+    name = str(name).strip()
+    # Remove (POB.) and similar suffixes
+    name = name.split('(')[0].strip()
+    # Remove any trailing special characters
+    name = name.rstrip('.) ')
+    return name
+
+
+def normalize_barangay(name):
+    """Comparison key: lower case words, abbreviations expanded, Brgy./Pob. markers dropped"""
+    if pd.isna(name):
+        return ""
+    words = re.findall(r"[a-z0-9ñ]+", clean_barangay_name(name).lower())
+    words = [ABBREVIATIONS.get(word, word) for word in words]
+    while words and words[0] in PREFIXES:
+        words = words[1:]
+    while words and words[-1] in SUFFIXES:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def edit_distance(a, b):
+    """Levenshtein distance"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree: finds every key within an edit distance without scanning all keys"""
+
+    def __init__(self, keys=()):
+        self.root = None
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if self.root is None:
+            self.root = (key, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(key, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (key, {})
+                return
+            node = child
+
+    def search(self, key, max_distance):
+        """(distance, key) pairs within max_distance, closest first"""
+        matches = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_key, children = stack.pop()
+            distance = edit_distance(key, node_key)
+            if distance <= max_distance:
+                matches.append((distance, node_key))
+            # Triangle inequality: only children in [d - max, d + max] can match
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(matches)
+
+
+class BarangayResolver:
+    """Maps raw BRGY_NAME values to the canonical names in group_mapping.
+
+    Exact matches on the normalized name win; otherwise the closest canonical
+    name within the edit-distance threshold is used, provided it is unique and
+    carries the same numbers ("Barangay 2-A" never resolves to "Barangay 3-A").
+    Every distinct raw name is resolved once and remembered in
+    barangay_resolutions.json; names that can't be resolved are listed in
+    barangay_review.csv, where filling in the "canonical" column teaches the
+    resolver on the next run.
+    """
+
+    def __init__(self, groups=None, state_dir=None, max_ratio=0.2, max_distance=3):
+        self.groups = group_mapping if groups is None else groups
+        self.state_dir = state_dir or data_dir
+        self.max_ratio = max_ratio
+        self.max_distance = max_distance
+
+        self.canonical_group = {}
+        self.by_key = {}
+        for group, brgys in self.groups.items():
+            for brgy in brgys:
+                self.canonical_group[brgy] = group
+                self.by_key.setdefault(normalize_barangay(brgy), []).append(brgy)
+        self.index = BKTree(self.by_key)
+        self.fingerprint = hashlib.sha256(
+            json.dumps(self.groups, sort_keys=True).encode("utf-8")).hexdigest()
+
+        self.resolutions = {}
+        self.row_counts = {}
+        self.dirty = False
+        self.load()
+
+    @property
+    def resolutions_path(self):
+        return os.path.join(self.state_dir, RESOLUTIONS_FILENAME)
+
+    @property
+    def review_path(self):
+        return os.path.join(self.state_dir, REVIEW_FILENAME)
+
+    def load(self):
+        """Read the memoized table and any names an operator fixed in the review list"""
+        if os.path.exists(self.resolutions_path):
+            with open(self.resolutions_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            for raw, entry in stored.get("resolutions", {}).items():
+                # Automatic resolutions are only valid for the barangay lists they were made against
+                if entry["method"] == "manual" or stored.get("fingerprint") == self.fingerprint:
+                    self.resolutions[raw] = entry
+        if os.path.exists(self.review_path):
+            with open(self.review_path, "r", encoding="utf-8-sig", newline="") as f:
+                for row in csv.DictReader(f):
+                    canonical = (row.get("canonical") or "").strip()
+                    if canonical in self.canonical_group:
+                        self.resolutions[row["raw_name"]] = {
+                            "canonical": canonical, "method": "manual", "distance": None}
+                        self.dirty = True
+
+    def save(self):
+        """Merge with the table on disk (other workers may have added names) and write it back"""
+        if not self.dirty:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        merged = {}
+        if os.path.exists(self.resolutions_path):
+            with open(self.resolutions_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("fingerprint") == self.fingerprint:
+                merged.update(stored.get("resolutions", {}))
+        merged.update(self.resolutions)
+        tmp_path = self.resolutions_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "resolutions": merged}, f, indent=1,
+                      ensure_ascii=False)
+        os.replace(tmp_path, self.resolutions_path)
+        self.write_review()
+        self.dirty = False
+
+    def write_review(self):
+        """List every unresolved name with its closest candidates for an operator to fix"""
+        rows = []
+        for raw, entry in sorted(self.resolutions.items()):
+            if entry["canonical"] is None:
+                rows.append({
+                    "raw_name": raw,
+                    "rows_last_run": self.row_counts.get(raw, ""),
+                    "suggestions": "; ".join(entry.get("suggestions", [])),
+                    "canonical": "",
+                })
+        tmp_path = self.review_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["raw_name", "rows_last_run", "suggestions", "canonical"])
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, self.review_path)
+
+    def match(self, raw):
+        """Resolve one name against the index (no memo)"""
+        key = normalize_barangay(raw)
+        if not key:
+            return {"canonical": None, "method": "unresolved", "distance": None, "suggestions": []}
+        exact = self.by_key.get(key)
+        if exact and len(exact) == 1:
+            return {"canonical": exact[0], "method": "exact", "distance": 0}
+
+        threshold = min(self.max_distance, max(1, int(len(key) * self.max_ratio)))
+        digits = re.findall(r"\d+", key)
+        candidates = [(distance, candidate) for distance, candidate in self.index.search(key, threshold)
+                      if re.findall(r"\d+", candidate) == digits]
+        suggestions = [name for _, candidate in self.index.search(key, threshold + 2)[:3]
+                       for name in self.by_key[candidate]]
+        if candidates:
+            best_distance = candidates[0][0]
+            best = [candidate for distance, candidate in candidates if distance == best_distance]
+            if len(best) == 1 and len(self.by_key[best[0]]) == 1:
+                return {"canonical": self.by_key[best[0]][0], "method": "fuzzy", "distance": best_distance}
+        return {"canonical": None, "method": "unresolved", "distance": None, "suggestions": suggestions}
+
+    def resolve(self, raw):
+        """Canonical barangay name for a raw value, or None"""
+        if pd.isna(raw):
+            return None
+        raw = str(raw)
+        entry = self.resolutions.get(raw)
+        if entry is None:
+            entry = self.match(raw)
+            entry["resolved_at"] = time.strftime("%Y-%m-%d")
+            self.resolutions[raw] = entry
+            self.dirty = True
+        return entry["canonical"]
+
+    def resolve_series(self, names):
+        """Canonical names for a column, resolving each distinct value once"""
+        counts = names.value_counts()
+        self.row_counts.update({str(raw): int(count) for raw, count in counts.items()})
+        lookup = {raw: self.resolve(raw) for raw in counts.index}
+        return names.map(lookup)
+
+    def group_series(self, names):
+        """Group name ("South", ...) for every row, NaN when unresolved"""
+        return self.resolve_series(names).map(self.canonical_group)
+
+    def unresolved(self):
+        return sorted(raw for raw, entry in self.resolutions.items()
+                      if entry["canonical"] is None and raw in self.row_counts)
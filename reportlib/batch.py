@@ -0,0 +1,107 @@
+"""Run a per-file step over many report files on a process pool.
+
+Results come back in input order as soon as each one (and every file before
+it) is done, so the first files are handled while later ones are still being
+read. Each result carries the time the worker spent on that file.
+"""
+
+import glob
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+
+def expand_inputs(patterns):
+    """Files for a list of paths and glob patterns, in order and without repeats"""
+    paths = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+class BatchResult:
+    """One file's result and how long the worker took over it"""
+
+    def __init__(self, path, value, seconds):
+        self.path = path
+        self.value = value
+        self.seconds = seconds
+
+
+def _timed(task, path):
+    start = time.perf_counter()
+    value = task(path)
+    return value, time.perf_counter() - start
+
+
+def iter_batch(paths, task, max_workers=None):
+    """Yield a BatchResult for task(path) over every path, in input order.
+
+    task must be a module-level function (it is pickled to the workers). At
+    most 2 x workers files are in flight, so results that pile up behind a slow
+    file stay bounded.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    if workers == 1:
+        # A one-process pool would only add pickling
+        for path in paths:
+            yield BatchResult(path, *_timed(task, path))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        remaining = iter(paths)
+
+        def submit_next():
+            path = next(remaining, None)
+            if path is not None:
+                pending.append((path, pool.submit(_timed, task, path)))
+
+        for _ in range(2 * workers):
+            submit_next()
+        while pending:
+            path, future = pending.popleft()
+            value, seconds = future.result()
+            # Keep the workers busy while the caller reduces this result
+            submit_next()
+            yield BatchResult(path, value, seconds)
+
+
+class FrameConcat:
+    """Collects DataFrames as they arrive and stacks them once at the end.
+
+    result() is pd.concat(frames, ignore_index=True), followed by
+    drop_duplicates() (keep first) when dedup is set, so duplicates are
+    exactly the ones pandas finds.
+    """
+
+    def __init__(self, dedup=False):
+        self.dedup = dedup
+        self.frames = []
+        self.rows_in = 0
+        self.duplicates = 0
+
+    def add(self, df):
+        self.rows_in += len(df)
+        self.frames.append(df)
+
+    def result(self):
+        if not self.frames:
+            return pd.DataFrame()
+        df = pd.concat(self.frames, ignore_index=True)
+        if self.dedup:
+            df = df.drop_duplicates()
+            self.duplicates = self.rows_in - len(df)
+        return df
+
+
+def report_timing(result, label=""):
+    """One progress line per finished file"""
+    print(f"⏱️ {os.path.basename(result.path)}: {result.seconds:.2f}s{label}")
@@ -0,0 +1,222 @@
+"""Zip bundle of a run's output files, for emailing or uploading in one go.
+
+Members are deflated in parallel worker threads (zlib releases the GIL), each
+into a spool file next to the bundle, reading the output in fixed-size blocks;
+the CRC-32 and SHA-256 are taken in the same pass. The bundle is then written
+in input order by copying the spooled streams into zip records written here
+(zipfile only stores data it compresses itself), so no output is ever held
+in memory whole. Outputs that don't shrink (xlsx is already a zip) are stored.
+A manifest.json with each member's rows, bytes and SHA-256 goes in last.
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+import pandas as pd
+import pyarrow.parquet as pq
+
+from reportlib.formats import detect_format
+
+MANIFEST_NAME = "manifest.json"
+# Read/copy block size
+BLOCK_BYTES = 1024 * 1024
+COMPRESS_LEVEL = 6
+# Sizes and offsets from here on need Zip64 records
+ZIP64_LIMIT = 0xFFFFFFFF
+DEFAULT_WORKERS = 4
+
+
+def count_rows(path):
+    """Data rows in an output file (header excluded)"""
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == "csv":
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=100_000))
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return max(sum(1 for _ in wb.worksheets[0].iter_rows(values_only=True)) - 1, 0)
+    finally:
+        wb.close()
+
+
+def _compress_member(path, spool_dir, level):
+    """Deflate one file into a spool file; returns its sizes, CRC and SHA-256"""
+    crc, size = 0, 0
+    sha = hashlib.sha256()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    fd, spool = tempfile.mkstemp(dir=spool_dir, suffix=".deflate")
+    with open(path, "rb") as src, os.fdopen(fd, "wb") as out:
+        while True:
+            block = src.read(BLOCK_BYTES)
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            sha.update(block)
+            size += len(block)
+            out.write(compressor.compress(block))
+        out.write(compressor.flush())
+    compressed = os.path.getsize(spool)
+    if compressed >= size:
+        # Already compressed (xlsx, snappy Parquet): store the original bytes instead
+        os.remove(spool)
+        spool, compressed = None, size
+    return {"size": size, "compressed": compressed, "crc": crc, "sha256": sha.hexdigest(), "spool": spool}
+
+
+class _ZipWriter:
+    """Writes a zip of members whose data is already deflated (or stored).
+
+    zipfile can only compress members itself, so the records are written
+    here: a local header and the data per member, then the central directory
+    (with Zip64 records once a size, offset or count outgrows the classic ones).
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.entries = []
+
+    def add(self, name, mtime, src, size, compressed, crc, deflated):
+        """Append one member, copying its data (raw deflate when deflated) from the binary stream src"""
+        name = name.encode("utf-8")
+        method = 8 if deflated else 0
+        flags = 0 if name.isascii() else 0x800
+        year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+        dos_date = max(year - 1980, 0) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | second // 2
+        offset = self.f.tell()
+        local64 = max(size, compressed) >= ZIP64_LIMIT
+        extra = struct.pack("<HHQQ", 1, 16, size, compressed) if local64 else b""
+        self.f.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 45 if local64 else 20, flags, method, dos_time,
+                                 dos_date, crc, *([0xFFFFFFFF] * 2 if local64 else [compressed, size]),
+                                 len(name), len(extra)))
+        self.f.write(name + extra)
+        shutil.copyfileobj(src, self.f, BLOCK_BYTES)
+        self.entries.append((name, flags, method, dos_time, dos_date, crc, size, compressed, offset))
+
+    def close(self):
+        """Write the central directory"""
+        start = self.f.tell()
+        for name, flags, method, dos_time, dos_date, crc, size, compressed, offset in self.entries:
+            # Fields that don't fit move to the Zip64 extra field, in this order
+            big = [value for value in (size, compressed, offset) if value >= ZIP64_LIMIT]
+            fields = [0xFFFFFFFF if value >= ZIP64_LIMIT else value for value in (compressed, size, offset)]
+            extra = struct.pack(f"<HH{len(big)}Q", 1, 8 * len(big), *big) if big else b""
+            version = 45 if big else 20
+            self.f.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 3 << 8 | version, version, flags, method,
+                                     dos_time, dos_date, crc, fields[0], fields[1], len(name), len(extra), 0, 0, 0,
+                                     0o644 << 16, fields[2]))
+            self.f.write(name + extra)
+        end = self.f.tell()
+        count, size = len(self.entries), end - start
+        if count >= 0xFFFF or size >= ZIP64_LIMIT or start >= ZIP64_LIMIT:
+            self.f.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, size, start))
+            self.f.write(struct.pack("<IIQI", 0x07064B50, 0, end, 1))
+            count, size, start = min(count, 0xFFFF), min(size, 0xFFFFFFFF), min(start, 0xFFFFFFFF)
+        self.f.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, size, start, 0))
+
+
+def write_bundle(files, bundle_path, rows=None, workers=DEFAULT_WORKERS, level=COMPRESS_LEVEL, status=None):
+    """Zip `files` into bundle_path with a manifest; returns the manifest dict.
+
+    rows maps a file's basename to its row count when the caller already knows
+    it; other files are counted from disk.
+    """
+    rows = rows or {}
+    names = [os.path.basename(path) for path in files]
+    if len(set(names)) != len(names):
+        raise ValueError("Bundle members must have distinct file names")
+    bundle_dir = os.path.dirname(os.path.abspath(bundle_path))
+    tmp_path = bundle_path + f".{os.getpid()}.tmp"
+    spool_dir = tempfile.mkdtemp(prefix="bundle_spool_", dir=bundle_dir)
+    manifest = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "files": []}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool, open(tmp_path, "wb") as f:
+            writer = _ZipWriter(f)
+            futures = [pool.submit(_compress_member, path, spool_dir, level) for path in files]
+            # Written in input order as each member's compression finishes
+            for i, (path, name, future) in enumerate(zip(files, names, futures), start=1):
+                member = future.result()
+                with open(member["spool"] or path, "rb") as src:
+                    writer.add(name, os.path.getmtime(path), src, member["size"], member["compressed"],
+                               member["crc"], member["spool"] is not None)
+                if member["spool"]:
+                    os.remove(member["spool"])
+                manifest["files"].append({
+                    "name": name,
+                    "rows": rows[name] if name in rows else count_rows(path),
+                    "bytes": member["size"],
+                    "compressed_bytes": member["compressed"],
+                    "sha256": member["sha256"],
+                })
+                if status:
+                    status(f"Bundled {i}/{len(files)}: {name}")
+            data = json.dumps(manifest, indent=2).encode()
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            deflated = compressor.compress(data) + compressor.flush()
+            writer.add(MANIFEST_NAME, time.time(), io.BytesIO(deflated), len(data), len(deflated),
+                       zlib.crc32(data), True)
+            writer.close()
+        os.replace(tmp_path, bundle_path)
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return manifest
+
+
+def verify_bundle(bundle_path):
+    """Re-hash every member against the manifest; returns the names that don't match"""
+    with zipfile.ZipFile(bundle_path) as zf:
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+        bad = []
+        for entry in manifest["files"]:
+            sha = hashlib.sha256()
+            with zf.open(entry["name"]) as member:
+                for block in iter(lambda: member.read(BLOCK_BYTES), b""):
+                    sha.update(block)
+            if sha.hexdigest() != entry["sha256"]:
+                bad.append(entry["name"])
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zip report outputs with a manifest of rows and checksums.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="bundle output files")
+    create.add_argument("bundle", help="zip file to write")
+    create.add_argument("files", nargs="+", help="output files or glob patterns")
+    create.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="compression threads")
+
+    verify = commands.add_parser("verify", help="check a bundle against its manifest")
+    verify.add_argument("bundle")
+
+    args = parser.parse_args()
+    if args.command == "create":
+        files = [path for pattern in args.files for path in sorted(glob.glob(pattern)) or [pattern]]
+        manifest = write_bundle(files, args.bundle, workers=args.workers, status=print)
+        total_rows = sum(entry["rows"] for entry in manifest["files"])
+        print(f"✅ {len(files)} files ({total_rows} rows) bundled into {args.bundle}")
+    else:
+        bad = verify_bundle(args.bundle)
+        if bad:
+            print(f"❌ Checksum mismatch: {', '.join(bad)}")
+            raise SystemExit(1)
+        print(f"✅ {args.bundle} matches its manifest")
+
+
+if __name__ == "__main__":
+    main()
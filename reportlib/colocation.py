@@ -0,0 +1,201 @@
+"""Suspected duplicate DPs: rows standing within a few meters of each other.
+
+Coordinates are projected to meters (equirectangular, with longitudes scaled
+for the report's latitude furthest from the equator, where a degree of
+longitude is shortest) and bucketed into grid cells at least one radius wide
+everywhere, so two points within the radius always share a cell or sit in
+adjacent ones. Candidates are
+paired by looking each point's cell and four of its eight neighbours (the
+other four give the same pairs mirrored) up in one sorted array of cell keys,
+distances are checked with the haversine formula and close pairs are merged
+into groups. Rows with identical coordinates are collapsed to one point first,
+so a pile of pins on the same spot costs one point instead of all its pairs.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from reportlib.config import colocation_radius_m
+from reportlib.formats import write_report
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = EARTH_RADIUS_M * np.pi / 180
+# (dx, dy) cell offsets joined to each cell; the mirrored four are covered by these
+NEIGHBOURS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+# Kept for each suspected duplicate (when present in the report)
+RECORD_COLUMNS = ['DPdeniro', 'S_SP', 'S_Total', 'BRGY_NAME', 'CFS Cluster', 'Tech', 'Location Type',
+                  'DP/NAP LAT', 'DP/NAP LONG']
+
+
+def haversine_m(lat1, long1, lat2, long2):
+    """Great-circle distance in meters (arrays or scalars, degrees)"""
+    lat1, long1, lat2, long2 = (np.radians(value) for value in (lat1, long1, lat2, long2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((long2 - long1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _components(count, left, right):
+    """Group label per point from the edges (min-label propagation with pointer jumping)"""
+    labels = np.arange(count)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        merged = labels.copy()
+        np.minimum.at(merged, left, low)
+        np.minimum.at(merged, right, low)
+        merged = merged[merged]
+        if np.array_equal(merged, labels):
+            return labels
+        labels = merged
+
+
+def close_pairs(lat, long, radius_m):
+    """(i, j, meters) for every pair of distinct points at most radius_m apart, i < j"""
+    if not len(lat):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    # Scaled for the widest latitude: cells only get wider (never narrower than radius_m) towards the equator
+    scale = np.cos(np.radians(np.max(np.abs(lat))))
+    cx = np.floor(long * METERS_PER_DEGREE * scale / radius_m).astype(np.int64)
+    cy = np.floor(lat * METERS_PER_DEGREE / radius_m).astype(np.int64)
+    # One sortable key per cell; the margin keeps a neighbour's key from wrapping into the next column
+    width = cy.max() - cy.min() + 3
+    keys = (cx - cx.min() + 1) * width + (cy - cy.min() + 1)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    # Occupied cells as blocks of the sorted points
+    cell_start = np.concatenate([[0], np.flatnonzero(np.diff(sorted_keys)) + 1])
+    cell_keys = sorted_keys[cell_start]
+    cell_count = np.diff(np.append(cell_start, len(keys)))
+    cell_of_point = np.repeat(np.arange(len(cell_keys)), cell_count)
+
+    left, right = [], []
+    for dx, dy in NEIGHBOURS:
+        # Each occupied cell's neighbour block (the lookups arrive sorted, which keeps them cheap)
+        target = cell_keys + dx * width + dy
+        found = np.minimum(np.searchsorted(cell_keys, target), len(cell_keys) - 1)
+        hit = cell_keys[found] == target
+        lo = np.where(hit, cell_start[found], 0)[cell_of_point]
+        counts = np.where(hit, cell_count[found], 0)[cell_of_point]
+        i = np.repeat(np.arange(len(keys)), counts)
+        j = np.repeat(lo, counts) + np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+        if (dx, dy) == (0, 0):
+            keep = i < j
+            i, j = i[keep], j[keep]
+        i, j = order[i], order[j]
+        left.append(np.minimum(i, j))
+        right.append(np.maximum(i, j))
+    left, right = np.concatenate(left), np.concatenate(right)
+    # The projection is only used for bucketing; the cut uses the true distance
+    meters = haversine_m(lat[left], long[left], lat[right], long[right])
+    close = meters <= radius_m
+    return left[close], right[close], meters[close]
+
+
+def find_colocated(df, radius_m=None, mask=None):
+    """Rows of df (those in mask, when given) with another row within radius_m meters.
+
+    One row per suspect: its duplicate group (numbered in report order), the
+    group's size and distinct DPdeniro count, its nearest other member and the
+    distance to it, followed by the DP's own columns. Rows with blank, zero or
+    impossible coordinates are left out.
+    """
+    radius_m = colocation_radius_m if radius_m is None else radius_m
+    lat = pd.to_numeric(df['DP/NAP LAT'], errors="coerce").to_numpy(dtype=float)
+    long = pd.to_numeric(df['DP/NAP LONG'], errors="coerce").to_numpy(dtype=float)
+    usable = ~np.isnan(lat) & ~np.isnan(long) & (lat != 0) & (long != 0)
+    usable &= (np.abs(lat) <= 90) & (np.abs(long) <= 180)
+    if mask is not None:
+        usable &= mask
+    rows = np.flatnonzero(usable)
+
+    # One point per distinct coordinate pair; its rows are duplicates at 0 m
+    point_of_row, point_keys = pd.factorize(lat[rows] + 1j * long[rows])
+    point_lat, point_long = point_keys.real, point_keys.imag
+    points = len(point_lat)
+    multiplicity = np.bincount(point_of_row, minlength=points)
+    left, right, meters = close_pairs(point_lat, point_long, radius_m)
+
+    group_of_point = _components(points, left, right)
+    group_rows = np.bincount(group_of_point, weights=multiplicity, minlength=points).astype(np.int64)
+    suspect = group_rows[group_of_point[point_of_row]] > 1
+    rows, point_of_row = rows[suspect], point_of_row[suspect]
+
+    # Nearest other member: a row on the same spot, else the closest neighbouring point
+    order = np.argsort(point_of_row, kind="stable")
+    starts = np.searchsorted(point_of_row[order], np.arange(points))
+    first_row = np.full(points, -1)
+    second_row = np.full(points, -1)
+    present = np.flatnonzero(np.bincount(point_of_row, minlength=points))
+    first_row[present] = rows[order[starts[present]]]
+    repeated = present[multiplicity[present] > 1]
+    second_row[repeated] = rows[order[starts[repeated] + 1]]
+    edges = pd.DataFrame({"point": np.concatenate([left, right]), "other": np.concatenate([right, left]),
+                          "meters": np.concatenate([meters, meters])})
+    nearest = edges.sort_values(["point", "meters", "other"], kind="stable").drop_duplicates("point")
+    nearest_point = np.full(points, -1)
+    nearest_meters = np.full(points, np.nan)
+    nearest_point[nearest["point"].to_numpy()] = nearest["other"].to_numpy()
+    nearest_meters[nearest["point"].to_numpy()] = nearest["meters"].to_numpy()
+
+    on_same_spot = multiplicity[point_of_row] > 1
+    spot_first, spot_second = first_row[point_of_row], second_row[point_of_row]
+    nearest_row = np.where(on_same_spot, np.where(spot_first == rows, spot_second, spot_first),
+                           first_row[np.maximum(nearest_point[point_of_row], 0)])
+    distance = np.where(on_same_spot, 0.0, nearest_meters[point_of_row])
+
+    dps = df['DPdeniro'].to_numpy()
+    group_labels = group_of_point[point_of_row]
+    group_ids, group_index = np.unique(group_labels, return_inverse=True)
+    # Number groups by their first row so the file reads in report order
+    first_seen = np.full(len(group_ids), len(df))
+    np.minimum.at(first_seen, group_index, rows)
+    renumber = np.empty(len(group_ids), dtype=np.int64)
+    renumber[np.argsort(first_seen, kind="stable")] = np.arange(1, len(group_ids) + 1)
+    distinct_dps = pd.Series(dps[rows]).groupby(group_index).nunique().to_numpy() if len(rows) else np.empty(0)
+
+    columns = [column for column in RECORD_COLUMNS if column in df.columns]
+    result = df.take(rows)[columns]
+    result.index = pd.RangeIndex(len(result))
+    result.insert(0, 'Duplicate Group', renumber[group_index])
+    result.insert(1, 'Group Size', group_rows[group_labels])
+    result.insert(2, 'Distinct DPs', distinct_dps[group_index])
+    result.insert(3, 'Nearest DP', dps[nearest_row])
+    result.insert(4, 'Distance (m)', np.round(distance, 2))
+    return result.sort_values(['Duplicate Group'], kind="stable", ignore_index=True)
+
+
+def summarize(colocated):
+    """Log line: groups, rows, and spare ports counted more than once"""
+    if colocated.empty:
+        return "No co-located DPs found"
+    groups = colocated['Duplicate Group'].nunique()
+    extra = colocated.duplicated('Duplicate Group')
+    spare = pd.to_numeric(colocated.loc[extra, 'S_SP'], errors="coerce").sum() if 'S_SP' in colocated else 0
+    return (f"{groups:,} groups of co-located DPs ({len(colocated):,} rows, each within "
+            f"{colocated['Distance (m)'].max():.1f} m of another); {int(spare):,} spare ports counted more than once")
+
+
+def main():
+    from reportlib.query import load_report
+
+    parser = argparse.ArgumentParser(description="List DPs standing within a few meters of another DP")
+    parser.add_argument("report", help="report file (.xlsx, .csv, .parquet) or snapshot:<date>")
+    parser.add_argument("--radius", type=float, default=colocation_radius_m, help="meters (default: %(default)s)")
+    parser.add_argument("--output", help="write the suspected duplicates to this file")
+    args = parser.parse_args()
+
+    df = load_report(args.report)
+    start = time.perf_counter()
+    colocated = find_colocated(df, args.radius)
+    print(f"📍 {summarize(colocated)} ({time.perf_counter() - start:.2f}s over {len(df):,} rows)")
+    if args.output:
+        write_report(colocated, args.output)
+        print(f"✅ Saved to {args.output}")
+    else:
+        print(colocated.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+
+# Routing rules shared by the Excel processor GUI and its headless tools
+
+columns_to_extract = [
+    'DPdeniro', 'S_SP', 'S_Total', 'Com Date',
+    'DP/NAP LAT', 'DP/NAP LONG', 'BRGY_NAME',
+    'CFS Cluster', 'Tech', 'Location Type'
+]
+
+valid_clusters = ["DAVAO NORTH", "DAVAO SOUTH", "TAGUM 1", "TAGUM 2"]
+
+dsl_techs = ["VDSL", "ADSL", "ADSL/VDSL"]
+
+# DPs listed per group and cluster in the "Top DPs" ranking (most and least utilized)
+top_k = 20
+
+# Data-quality checks run on every report (see reportlib/validation.py); remove a name to skip it.
+# Rows breaking a rule are listed in the "Rejects" file but still routed as before.
+validation_rules = [
+    "missing_coordinates", "zero_coordinates", "swapped_coordinates", "coordinates_out_of_range",
+    "invalid_ports", "spare_exceeds_total", "duplicate_dp", "blank_tech", "unknown_cluster"
+]
+
+# Coordinates outside this box (Mindanao) are out of range; (min, max) in degrees
+coordinate_bounds = {"lat": (4.0, 10.5), "long": (119.0, 127.5)}
+
+# Every CFS Cluster a report may carry; anything else is an unknown cluster
+known_clusters = [
+    "AGUSAN", "BUKIDNON", "CAGAYAN EAST", "CAGAYAN WEST",
+    "COTABATO", "DAVAO NORTH", "DAVAO SOUTH", "DIGOS", "GENSAN",
+    "KORONADAL", "LANAO", "MARAWI", "OZAMIS", "SURIGAO",
+    "TAGUM 1", "TAGUM 2", "ZAMBOANGA CITY", "ZAMBOANGA DEL NORTE",
+    "ZAMBOANGA DEL SUR", "ZAMBOANGA SIBUGAY"
+]
+
+# DPs closer than this many meters to another DP are listed as suspected duplicates
+colocation_radius_m = 5.0
+
+group1_brgy = [
+    'Agdao', 'Bago Gallera', 'Baliok', 'Bangkas Heights', 'Barangay 1-A', 
+    'Barangay 2-A', 'Barangay 3-A', 'Barangay 4-A', 'Barangay 5-A', 'Barangay 6-A', 
+    'Barangay 7-A', 'Barangay 8-A', 'Barangay 9-A', 'Barangay 10-A', 'Barangay 11-B', 
+    'Barangay 12-B', 'Barangay 13-B', 'Barangay 14-B', 'Barangay 15-B', 'Barangay 16-B', 
+    'Barangay 17-B', 'Barangay 18-B', 'Barangay 19-B', 'Barangay 20-B', 'Barangay 21-C', 
+    'Barangay 22-C', 'Barangay 23-C', 'Barangay 24-C', 'Barangay 26-C', 'Barangay 27-C', 
+    'Barangay 28-C', 'Barangay 29-C', 'Barangay 30-C', 'Barangay 31-D', 'Barangay 32-D', 
+    'Barangay 33-D', 'Barangay 34-D', 'Barangay 35-D', 'Barangay 36-D', 'Barangay 37-D', 
+    'Barangay 38-D', 'Barangay 39-D', 'Barangay 40-D', 'Bucana', 'Centro', 
+    'Gov. Vicente Duterte', 'Gov. Paciano Bangoy', 'Lapu-lapu', 'Leon Garcia Sr.', 
+    'San Antonio', 'Tres De Mayo', 'Zone 1',
+    'Matina Crossing', 'Kap. Tomas Monteverde Sr.'
+]
+
+group2_brgy = [
+    'Rafael Castillo', 'Sasa', 'Vicente Hizon Sr.', 
+    'Ubalde', 'Wilfredo Aquino', 'Pampanga',
+    'Buhangin', 'Alfonso Angliongto Sr.'
+]
+
+group3_brgy = [
+    'Cabantian', 'Mandug', 'Panacan', 'Bunawan', 'Indangan', 
+    'Alejandra Navarro', 'Tagpore',
+    'Tibungco', 'Communal', 'San Isidro', 'Acacia','Tigatto','Ilang'
+]
+
+group_mapping = {
+    "South": group1_brgy,
+    "Central": group2_brgy,
+    "North": group3_brgy
+}
+
+# Persisted lookup tables and caches shared by every run and tool
+data_dir = os.path.join(os.path.expanduser("~"), "ExcelProcessorData")
@@ -0,0 +1,261 @@
+import os
+import pandas as pd
+
+from reportlib.sharded import SHARDED_MIN_BYTES, iter_sheet_batches, read_sheet_sharded, worksheet_size
+
+# Extension for each supported format; "xlsx" stays the default everywhere
+FORMAT_EXTENSIONS = {
+    "xlsx": ".xlsx",
+    "csv": ".csv",
+    "parquet": ".parquet",
+}
+
+# QFileDialog filters
+OPEN_FILTER = ("Reports (*.xlsx *.xls *.csv *.parquet);;Excel Files (*.xlsx *.xls);;"
+               "CSV Files (*.csv);;Parquet Files (*.parquet)")
+OUTPUT_FORMAT_LABELS = {
+    "xlsx": "Excel (.xlsx)",
+    "csv": "CSV (.csv)",
+    "parquet": "Parquet (.parquet)",
+}
+
+# Rows per chunk when reading large CSV exports
+CSV_CHUNK_ROWS = 100_000
+# Rows per Parquet row group; each group carries its own min/max statistics
+PARQUET_ROW_GROUP_ROWS = 50_000
+
+
+def detect_format(path, fmt=None):
+    """Format name from an explicit flag, otherwise from the file extension"""
+    if fmt:
+        fmt = fmt.lower().lstrip(".")
+        if fmt == "xls":
+            fmt = "xlsx"
+        if fmt not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMAT_EXTENSIONS)}")
+        return fmt
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension in (".xlsx", ".xls", ".xlsm"):
+        return "xlsx"
+    if extension == ".csv":
+        return "csv"
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Can't tell the format of '{path}' from its extension")
+
+
+def with_format(path, fmt):
+    """Swap the extension of an output path for the chosen format"""
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[detect_format(path, fmt)]
+
+
+def iter_report(path, fmt=None, columns=None, chunksize=CSV_CHUNK_ROWS, sheet_name=0):
+    """Yield the report as DataFrame chunks without loading it all.
+
+    CSV and Parquet come in chunks of `chunksize` rows; .xlsx sheets in shards
+    of SHARD_BYTES of XML. Legacy .xls workbooks can only be read whole.
+    """
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        # Strip header whitespace before projecting, like the scripts do after loading
+        usecols = None
+        if columns is not None:
+            wanted = {str(col).strip() for col in columns}
+            usecols = lambda col: col.strip() in wanted
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, low_memory=False):
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif str(path).lower().endswith(".xls"):
+        yield read_report(path, fmt, columns, sheet_name)
+    else:
+        yield from iter_sheet_batches(path, sheet_name, columns)
+
+
+def use_sharded_reader(path, sheet_name=0, engine=None):
+    """Whether a workbook sheet should go through the parallel sharded reader"""
+    if engine in ("sharded", "openpyxl"):
+        return engine == "sharded"
+    if engine not in (None, "auto"):
+        raise ValueError(f"Unknown Excel engine '{engine}'. Use 'auto', 'sharded' or 'openpyxl'")
+    if str(path).lower().endswith(".xls"):
+        return False
+    return worksheet_size(path, sheet_name) >= SHARDED_MIN_BYTES
+
+
+def read_report(path, fmt=None, columns=None, sheet_name=0, engine=None):
+    """Read a report as one DataFrame, optionally projected to the given columns.
+
+    sheet_name and engine only apply to workbooks. engine="auto" (the default)
+    parses very large worksheets with the sharded reader and the rest with
+    openpyxl; "sharded" or "openpyxl" forces one of them.
+    """
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        chunks = list(iter_report(path, fmt, columns))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if use_sharded_reader(path, sheet_name, engine):
+        return read_sheet_sharded(path, sheet_name, columns)
+    return pd.read_excel(path, sheet_name=sheet_name, usecols=columns)
+
+
+def _parquet_safe(df):
+    """Parquet needs one type per column; mixed object columns (e.g. DPdeniro) become text"""
+    mixed = []
+    for col in df.columns:
+        if df[col].dtype == "object":
+            types = df[col].dropna().map(type).unique()
+            if len(types) > 1:
+                mixed.append(col)
+    if not mixed:
+        return df
+    return df.assign(**{col: df[col].where(df[col].isna(), df[col].astype(str)) for col in mixed})
+
+
+def _common_type(a, b):
+    """Arrow type both a and b convert to without losing values, like pd.concat followed by _parquet_safe"""
+    import pyarrow as pa
+    if a == b or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if pa.types.is_integer(a) and pa.types.is_integer(b):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (a, b)):
+        return pa.float64()
+    if pa.types.is_timestamp(a) and pa.types.is_timestamp(b) and a.tz == b.tz:
+        return pa.timestamp("ns", a.tz)
+    # Mixed values (e.g. DPdeniro numbers in one batch, text in another) become text
+    return pa.string()
+
+
+def _cast_column(column, to_type):
+    import pyarrow as pa
+    if pa.types.is_string(to_type) and not pa.types.is_string(column.type):
+        # str() of each value, as _parquet_safe does for mixed columns (Arrow writes 5.0 as "5")
+        return pa.array([None if value is None else str(value) for value in column.to_pylist()], pa.string())
+    return column.cast(to_type)
+
+
+class ParquetBatchWriter:
+    """Writes DataFrame batches to one Parquet file, one or more row groups each.
+
+    Column types are unified across batches: when a later batch needs a wider
+    type (ints then floats, numbers then text, blanks then values) the row
+    groups written so far are rewritten one at a time with it, so the file
+    reads back as the concatenated batches would have been written.
+    """
+
+    def __init__(self, path, row_group_size=None):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.writer = None
+        self.schema = None
+
+    def _cast(self, table, schema):
+        import pyarrow as pa
+        columns = [_cast_column(table.column(field.name), field.type) for field in schema]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def _promote(self, schema):
+        """Rewrite what was written so far with the wider schema"""
+        import pyarrow.parquet as pq
+        self.writer.close()
+        old_path = self.path + ".old"
+        os.replace(self.path, old_path)
+        self.writer = pq.ParquetWriter(self.path, schema, write_statistics=True)
+        old = pq.ParquetFile(old_path)
+        for i in range(old.num_row_groups):
+            self.writer.write_table(self._cast(old.read_row_group(i), schema))
+        old.close()
+        os.remove(old_path)
+        self.schema = schema
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(_parquet_safe(df), preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = pq.ParquetWriter(self.path, self.schema, write_statistics=True)
+        else:
+            fields = [field.with_type(_common_type(field.type, table.schema.field(field.name).type))
+                      for field in self.schema]
+            schema = pa.schema(fields, metadata=self.schema.metadata)
+            if not schema.equals(self.schema):
+                self._promote(schema)
+        self.writer.write_table(self._cast(table, self.schema), row_group_size=self.row_group_size)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def detach_output(path):
+    """Remove an output that is a hard link (e.g. restored from the output cache) before rewriting it.
+
+    The writers below write in place; through a link they would also change the cached copy.
+    """
+    if os.path.exists(path) and os.stat(path).st_nlink > 1:
+        os.remove(path)
+
+
+def write_report(df, path, fmt=None):
+    """Write a DataFrame in the format chosen by flag or extension"""
+    fmt = detect_format(path, fmt)
+    detach_output(path)
+    if fmt == "csv":
+        # utf-8-sig so Excel opens barangay names with accents correctly
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    elif fmt == "parquet":
+        _parquet_safe(df).to_parquet(path, index=False, engine="pyarrow", write_statistics=True,
+                                     row_group_size=PARQUET_ROW_GROUP_ROWS)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+def write_batches(batches, path, fmt=None):
+    """Write DataFrame batches to one file without holding them all in memory.
+
+    Returns the number of rows written. For Parquet every batch becomes a row
+    group; column types are unified across batches (see ParquetBatchWriter).
+    """
+    fmt = detect_format(path, fmt)
+    detach_output(path)
+    rows = 0
+    if fmt == "csv":
+        for batch in batches:
+            # Only the first batch carries the header (and the BOM)
+            first = rows == 0
+            batch.to_csv(path, index=False, mode="w" if first else "a", header=first,
+                         encoding="utf-8-sig" if first else "utf-8")
+            rows += len(batch)
+    elif fmt == "parquet":
+        writer = ParquetBatchWriter(path, PARQUET_ROW_GROUP_ROWS)
+        try:
+            for batch in batches:
+                writer.write(batch)
+                rows += len(batch)
+        finally:
+            writer.close()
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        header = False
+        for batch in batches:
+            if not header:
+                sheet.append([str(col) for col in batch.columns])
+                header = True
+            for row in batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None):
+                sheet.append(row)
+            rows += len(batch)
+        workbook.save(path)
+    return rows
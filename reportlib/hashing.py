@@ -0,0 +1,24 @@
+import hashlib
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, read in chunks so big reports don't sit in memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bytes_digest(data):
+    """SHA-256 of an in-memory payload (e.g. a JSON cache key)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def stream_digest(source, sink, chunk_size=1024 * 1024):
+    """SHA-256 of a binary stream's content, copied to sink in chunks on the way"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: source.read(chunk_size), b""):
+        digest.update(block)
+        sink.write(block)
+    return digest.hexdigest()
@@ -0,0 +1,112 @@
+"""Report jobs for warm worker processes, with progress sent back through a queue.
+
+The GUIs keep their Qt objects in the main process. Workers are started once
+with init_worker, which keeps the events queue and imports pandas and the
+Excel/Arrow engines up front so a job never pays for them. Every
+run_processing callback becomes a (job_id, kind, value) tuple on the queue,
+and output frames come back through shared memory (announced by a "frames"
+event). Runs whose input, rules
+and code match an earlier run are restored from the output cache.
+"""
+
+import os
+import queue
+import re
+import time
+
+from reportlib.barangay import BarangayResolver
+from reportlib.bundle import write_bundle
+from reportlib.outputcache import OutputCache, cache_key
+from reportlib.processing import output_rules, run_processing
+from reportlib.sharedframes import HOLD_SECONDS, frame_to_shared, release_shared
+from reportlib.snapshots import SNAPSHOT_PREFIX, is_snapshot_source
+
+# Set in each worker by init_worker
+_events = None
+
+
+def job_output_dir(output_root, input_filepath, job_id):
+    """Folder of its own for every job, e.g. "DVN DP Util 20250715_20251019-142501_3\""""
+    if input_filepath.startswith(SNAPSHOT_PREFIX):
+        stem = "snapshot_" + (input_filepath[len(SNAPSHOT_PREFIX):] or "latest")
+    else:
+        stem = os.path.splitext(os.path.basename(input_filepath))[0]
+    stem = re.sub(r'[<>:"/\\|?*]', "_", stem)
+    return os.path.join(output_root, f"{stem}_{time.strftime('%Y%m%d-%H%M%S')}_{job_id}")
+
+
+def init_worker(events):
+    """Pool initializer: keep the events queue and import the heavy modules once"""
+    global _events
+    _events = events
+    import openpyxl  # noqa: F401
+    import pyarrow.parquet  # noqa: F401
+
+
+def warm_up():
+    """No-op task that makes the pool start a worker before the first real job"""
+    return os.getpid()
+
+
+def run_job(job_id, input_filepath, output_dir, output_format, events=None, share_frames=False, bundle=False,
+            use_cache=True, receipts=None):
+    """Worker entry point: run_processing with its callbacks forwarded as events.
+
+    Returns (output files, from cache, last status sent); events travel on
+    their own queue and may arrive after the result. With share_frames set the output
+    DataFrames are sent first as a "frames" event mapping each output filename
+    to the (block name, size) of its shared-memory block (none for cached runs,
+    which never load the frames). When receipts is given (a queue; needed on
+    Windows) the blocks stay open until the receiver puts an item on it. With
+    bundle set the outputs are also zipped into <job folder>.zip, which is
+    listed last in the output files.
+    """
+    events = events or _events
+    os.makedirs(output_dir, exist_ok=True)
+
+    statuses = []
+
+    def send(kind):
+        def forward(value):
+            if kind == "status":
+                statuses.append(value)
+            events.put((job_id, kind, value))
+        return forward
+
+    frames = {}
+    resolver, key, cache = None, None, OutputCache()
+    output_files = None
+    if use_cache and not is_snapshot_source(input_filepath):
+        send("status")("Checking the output cache...")
+        resolver = BarangayResolver()
+        key = cache_key(input_filepath, output_rules(output_format, resolver))
+        output_files = cache.restore(key, output_dir)
+    from_cache = output_files is not None
+    if from_cache:
+        send("debug")(f"Same input, rules and code as an earlier run: {len(output_files)} files from cache")
+        send("progress")(100)
+        send("status")("Restored from cache")
+        rows = cache.rows(key)
+    else:
+        output_files = run_processing(input_filepath, output_dir, progress=send("progress"),
+                                      status=send("status"), debug=send("debug"),
+                                      output_format=output_format, resolver=resolver, frames=frames)
+        rows = {filename: len(df) for filename, df in frames.items()}
+        if key:
+            cache.store(key, output_files, rows)
+    if bundle:
+        send("status")("Bundling outputs...")
+        bundle_filename = os.path.basename(os.path.normpath(output_dir)) + ".zip"
+        bundle_path = os.path.join(output_dir, bundle_filename)
+        write_bundle(list(output_files.values()), bundle_path, rows=rows, status=send("debug"))
+        output_files[bundle_filename] = bundle_path
+    if share_frames and frames:
+        shared = {filename: frame_to_shared(df) for filename, df in frames.items()}
+        send("frames")(shared)
+        if receipts is not None:
+            try:
+                receipts.get(timeout=HOLD_SECONDS)
+            except queue.Empty:
+                pass
+        release_shared(name for name, _ in shared.values())
+    return output_files, from_cache, statuses[-1] if statuses else None
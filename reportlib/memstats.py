@@ -0,0 +1,106 @@
+"""Per-stage memory accounting for a processing run.
+
+Every checkpoint records the process's resident memory and its peak so far
+(the peak comes from the OS, so it covers pandas/NumPy buffers too). With
+trace=True, tracemalloc also reports the bytes each stage allocated and its
+own peak; NumPy registers its buffers with tracemalloc, so DataFrame copies
+show up there. Tracing slows pure-Python code down, so it is opt-in.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+
+def _windows_memory():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def process_memory():
+    """(resident bytes, peak resident bytes) of this process; None where the OS doesn't say"""
+    if os.name == "nt":
+        return _windows_memory()
+    if os.path.exists("/proc/self/status"):
+        values = {}
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, amount, _ = line.split()
+                    values[key] = int(amount) * 1024
+        return values.get("VmRSS:"), values.get("VmHWM:")
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return None, peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(count):
+    if count is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB"):
+        if abs(count) < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.2f} GB"
+
+
+class MemoryTracker:
+    """Checkpoints memory after each stage of a run"""
+
+    def __init__(self, trace=False):
+        # Don't stop a trace someone else (e.g. a benchmark) started
+        self.trace = trace
+        self.owns_trace = trace and not tracemalloc.is_tracing()
+        if self.owns_trace:
+            tracemalloc.start()
+        self.stages = []
+        self.last_time = time.perf_counter()
+        self.last_traced = tracemalloc.get_traced_memory()[0] if trace else 0
+        if trace:
+            tracemalloc.reset_peak()
+
+    def checkpoint(self, stage):
+        """Record the stage that just finished"""
+        now = time.perf_counter()
+        rss, peak_rss = process_memory()
+        entry = {"stage": stage, "seconds": now - self.last_time, "rss": rss, "peak_rss": peak_rss}
+        if self.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            entry["allocated"] = current - self.last_traced
+            entry["stage_peak"] = peak - self.last_traced
+            self.last_traced = current
+            tracemalloc.reset_peak()
+        self.stages.append(entry)
+        self.last_time = time.perf_counter()
+        return entry
+
+    def report(self):
+        """One line per stage"""
+        lines = []
+        for entry in self.stages:
+            line = f"Memory after {entry['stage']}: RSS {format_bytes(entry['rss'])}, " \
+                   f"peak RSS {format_bytes(entry['peak_rss'])}, {entry['seconds']:.2f}s"
+            if "allocated" in entry:
+                line += f", allocated {format_bytes(entry['allocated'])} " \
+                        f"(stage peak {format_bytes(entry['stage_peak'])})"
+            lines.append(line)
+        return lines
+
+    def stop(self):
+        if self.owns_trace:
+            tracemalloc.stop()
@@ -0,0 +1,141 @@
+"""Content-addressed cache of generated output files.
+
+A run's key is a SHA-256 over the input file's content, the routing rules that
+shape the outputs and the code version (a digest of the reportlib sources plus
+the calling script). When an entry exists for the key its files are
+hard-linked (or copied, across drives) into the new output folder instead of
+re-reading the report. Entries live under ~/ExcelProcessorData/output_cache and
+the oldest are pruned past MAX_ENTRIES.
+"""
+
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+from reportlib.config import data_dir
+from reportlib.hashing import bytes_digest, file_digest
+
+CACHE_DIRNAME = "output_cache"
+META_FILENAME = "cache.json"
+MAX_ENTRIES = 50
+
+_code_versions = {}
+
+
+def code_version(extra_files=()):
+    """Digest of the code that produces the outputs, so any change invalidates the cache"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = sorted(glob.glob(os.path.join(package_dir, "*.py"))) + [os.path.abspath(f) for f in extra_files]
+    if getattr(sys, "frozen", False):
+        # PyInstaller build: the bundled executable stands in for the sources
+        sources = [sys.executable]
+    key = tuple(sources)
+    if key not in _code_versions:
+        _code_versions[key] = bytes_digest("".join(file_digest(path) for path in sources
+                                                   if os.path.exists(path)).encode())
+    return _code_versions[key]
+
+
+def cache_key(input_filepath, rules, extra_files=()):
+    """Key for one run: input content + rules (any JSON-able dict) + code version"""
+    payload = {
+        "input": file_digest(input_filepath),
+        "rules": rules,
+        "code": code_version(extra_files),
+    }
+    return bytes_digest(json.dumps(payload, sort_keys=True, default=str).encode())
+
+
+def _link_or_copy(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class OutputCache:
+    """Output files stored by run key"""
+
+    def __init__(self, root=None, max_entries=MAX_ENTRIES):
+        self.root = root or os.path.join(data_dir, CACHE_DIRNAME)
+        self.max_entries = max_entries
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def lookup(self, key):
+        """The entry's metadata, or None when missing or when a cached file was changed since"""
+        meta_path = os.path.join(self.entry_dir(key), META_FILENAME)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        for filename, entry in meta["files"].items():
+            path = os.path.join(self.entry_dir(key), filename)
+            # Outputs are hard links to the cached files; edited in place, they no longer match
+            if not os.path.exists(path) or os.path.getsize(path) != entry["bytes"] \
+                    or os.stat(path).st_mtime_ns != entry["mtime_ns"]:
+                self.evict(key)
+                return None
+        return meta
+
+    def restore(self, key, output_dir):
+        """Link the cached files into output_dir; returns {filename: path} or None on a miss"""
+        meta = self.lookup(key)
+        if meta is None:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        output_files = {}
+        for filename in meta["files"]:
+            output_files[filename] = os.path.join(output_dir, filename)
+            _link_or_copy(os.path.join(self.entry_dir(key), filename), output_files[filename])
+        # Touch the entry so pruning keeps recently used runs
+        os.utime(os.path.join(self.entry_dir(key), META_FILENAME))
+        return output_files
+
+    def rows(self, key):
+        meta = self.lookup(key)
+        return {filename: entry["rows"] for filename, entry in meta["files"].items()} if meta else {}
+
+    def store(self, key, output_files, rows=None):
+        """Add a finished run's files (a list of paths or {filename: path}) under key"""
+        paths = list(output_files.values()) if isinstance(output_files, dict) else list(output_files)
+        rows = rows or {}
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = self.entry_dir(key) + f".{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        files = {}
+        for path in paths:
+            filename = os.path.basename(path)
+            cached = os.path.join(tmp_dir, filename)
+            _link_or_copy(path, cached)
+            files[filename] = {"bytes": os.path.getsize(cached), "mtime_ns": os.stat(cached).st_mtime_ns,
+                               "rows": rows.get(filename)}
+        with open(os.path.join(tmp_dir, META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "files": files}, f, indent=1)
+        self.evict(key)
+        try:
+            os.replace(tmp_dir, self.entry_dir(key))
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.prune()
+
+    def evict(self, key):
+        shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def prune(self):
+        """Drop the least recently used entries beyond max_entries"""
+        entries = []
+        for name in os.listdir(self.root):
+            meta_path = os.path.join(self.root, name, META_FILENAME)
+            if os.path.exists(meta_path):
+                entries.append((os.path.getmtime(meta_path), name))
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            self.evict(name)
@@ -0,0 +1,243 @@
+"""Whole-PH reports split once into a Hive-style partitioned Parquet dataset.
+
+    ~/ExcelProcessorData/partitions/cluster=DAVAO NORTH/date=2025-07-15/part-0.parquet
+
+`partition` streams a report once and appends every batch's rows to its
+cluster's file, so a nationwide export never has to fit in memory. Tools then
+ask for a cluster and a date: the folder names alone pick the files to open
+(partition pruning), so one cluster is read straight from Parquet with no
+Excel parse and no pass over the other clusters' rows. A date's partitions
+are written to a staging folder and swapped in only when complete.
+
+    python -m reportlib.partitions partition "Files/GT DP,NAP Utilization Report 20250715.xlsx"
+    python -m reportlib.partitions list
+    python -m reportlib.partitions export --cluster "DAVAO NORTH" --output dvn.xlsx
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import time
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from reportlib.config import columns_to_extract, data_dir
+from reportlib.formats import ParquetBatchWriter, write_report
+from reportlib.hashing import file_digest
+from reportlib.schema import iter_columns
+from reportlib.sheets import probe_sheets
+from reportlib.snapshots import snapshot_date_from_filename
+
+DATASET_DIRNAME = "partitions"
+# Sources written as "dataset:2025-07-15" (or "dataset:latest") are read from the partitions
+DATASET_PREFIX = "dataset:"
+PARTITION_COLUMN = 'CFS Cluster'
+# Position in the source report, so rows read from several partitions come back in report order
+ROW_COLUMN = "_report_row"
+# Hive's name for rows whose partition value is blank
+BLANK_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+SOURCES_DIRNAME = "_sources"
+PART_FILENAME = "part-0.parquet"
+
+
+def dataset_root(root=None):
+    return root or os.path.join(data_dir, DATASET_DIRNAME)
+
+
+def is_dataset_source(source):
+    return isinstance(source, str) and source.startswith(DATASET_PREFIX)
+
+
+def partition_value(cluster):
+    """Cluster name as stored in the folder name: trimmed and upper case"""
+    if pd.isna(cluster) or not str(cluster).strip():
+        return BLANK_PARTITION
+    return str(cluster).strip().upper()
+
+
+def _partition_dir(root, cluster, date):
+    # Only characters a folder name can't hold are escaped; readers unquote
+    return os.path.join(root, f"cluster={quote(cluster, safe=' ')}", f"date={date}")
+
+
+def _partition_files(root=None):
+    """(cluster, date, path) for every partition file, from the folder names alone"""
+    root = dataset_root(root)
+    for path in sorted(glob.glob(os.path.join(root, "cluster=*", "date=*", "*.parquet"))):
+        date_dir = os.path.dirname(path)
+        cluster = unquote(os.path.basename(os.path.dirname(date_dir))[len("cluster="):])
+        yield cluster, os.path.basename(date_dir)[len("date="):], path
+
+
+def list_partitions(root=None):
+    """DataFrame of cluster, date, rows and path for every partition on disk"""
+    import pyarrow.parquet as pq
+    rows = [(cluster, date, pq.ParquetFile(path).metadata.num_rows, path)
+            for cluster, date, path in _partition_files(root)]
+    return pd.DataFrame(rows, columns=['cluster', 'date', 'rows', 'path'])
+
+
+def partition_dates(root=None):
+    return sorted({date for _, date, _ in _partition_files(root)})
+
+
+class _PartitionWriters:
+    """One open Parquet writer per cluster; each batch becomes a row group, column types unified across batches"""
+
+    def __init__(self, staging, date):
+        self.staging = staging
+        self.date = date
+        self.writers = {}
+        self.rows = {}
+
+    def add(self, cluster, df):
+        writer = self.writers.get(cluster)
+        if writer is None:
+            path = _partition_dir(self.staging, cluster, self.date)
+            os.makedirs(path, exist_ok=True)
+            writer = self.writers[cluster] = ParquetBatchWriter(os.path.join(path, PART_FILENAME))
+        writer.write(df)
+        self.rows[cluster] = self.rows.get(cluster, 0) + len(df)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+def partition_report(path, date=None, root=None, replace=False, log=print):
+    """Split a report into cluster=…/date=… partitions in one pass; returns {cluster: rows}.
+
+    The date comes from the filename unless given. Partitioning the same file
+    again is a no-op; a different file for a date already partitioned raises
+    ValueError unless replace=True.
+    """
+    root = dataset_root(root)
+    date = date or snapshot_date_from_filename(path)
+    if not date:
+        raise ValueError(f"Can't tell the report date of '{path}'; pass it explicitly")
+    digest = file_digest(path)
+    source_path = os.path.join(root, SOURCES_DIRNAME, f"{date}.json")
+    if os.path.exists(source_path):
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = json.load(f)
+        if source["digest"] == digest:
+            log(f"⏭️ {date} already partitioned from this file ({sum(source['rows'].values())} rows)")
+            return source["rows"]
+        if not replace:
+            raise ValueError(f"A different report is already partitioned for {date}; use replace=True")
+
+    start = time.perf_counter()
+    staging = os.path.join(root, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    writers = _PartitionWriters(staging, date)
+    try:
+        # Stream the report so whole-PH files never load whole
+        seen = 0
+        for sheet, mapping in probe_sheets(path, columns_to_extract):
+            for batch in iter_columns(path, mapping, sheet=sheet):
+                clusters = batch[PARTITION_COLUMN].map(partition_value)
+                data = batch.drop(columns=[PARTITION_COLUMN])
+                data[ROW_COLUMN] = np.arange(seen, seen + len(batch), dtype=np.int64)
+                seen += len(batch)
+                for cluster, rows in clusters.groupby(clusters, sort=False).indices.items():
+                    writers.add(cluster, data.take(rows))
+        writers.close()
+
+        # Swap the finished date in: every cluster's old partition for the date goes
+        for old in glob.glob(os.path.join(root, "cluster=*", f"date={date}")):
+            shutil.rmtree(old)
+        for cluster in writers.rows:
+            target = _partition_dir(root, cluster, date)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(_partition_dir(staging, cluster, date), target)
+    finally:
+        writers.close()
+        shutil.rmtree(staging, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(source_path), exist_ok=True)
+    with open(source_path, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.basename(path), "digest": digest, "rows": writers.rows,
+                   "partitioned_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=1)
+    log(f"✅ {date}: {sum(writers.rows.values())} rows from {os.path.basename(path)} into "
+        f"{len(writers.rows)} cluster partitions in {time.perf_counter() - start:.1f}s")
+    return writers.rows
+
+
+def read_partitions(clusters=None, date=None, root=None, columns=None):
+    """Rows of some clusters (all when None) for a date ("latest" or None: the newest date they have).
+
+    Only the matching partition files are opened. The cluster column comes
+    back as 'CFS Cluster' (trimmed, upper case); rows are in report order and
+    columns in their usual order.
+    """
+    partitions = list(_partition_files(root))
+    if clusters is not None:
+        wanted_clusters = {partition_value(cluster) for cluster in clusters}
+        partitions = [partition for partition in partitions if partition[0] in wanted_clusters]
+    if date in (None, "latest"):
+        if not partitions:
+            raise KeyError(f"No partitions for {clusters or 'any cluster'} in {dataset_root(root)}")
+        date = max(partition[1] for partition in partitions)
+    partitions = [partition for partition in partitions if partition[1] == date]
+    order = list(columns or columns_to_extract)
+    wanted = [column for column in order if column != PARTITION_COLUMN] + [ROW_COLUMN]
+    frames = []
+    for cluster, _, path in partitions:
+        df = pd.read_parquet(path, columns=wanted)
+        df[PARTITION_COLUMN] = None if cluster == BLANK_PARTITION else cluster
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=order)
+    df = pd.concat(frames, ignore_index=True)
+    if len(frames) > 1:
+        df = df.sort_values(ROW_COLUMN, kind="stable", ignore_index=True)
+    return df[order]
+
+
+def read_dataset_source(source, clusters=None, root=None):
+    """DataFrame for a "dataset:<date>" source, optionally limited to some clusters"""
+    return read_partitions(clusters, source[len(DATASET_PREFIX):] or None, root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split whole-PH reports into per-cluster, per-date Parquet "
+                                                 "partitions and read them back.")
+    parser.add_argument("--root", help=f"dataset folder (default: {dataset_root()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    partition = commands.add_parser("partition", help="split report files into partitions")
+    partition.add_argument("files", nargs="+", help="report files or glob patterns")
+    partition.add_argument("--date", help="report date (YYYY-MM-DD) when the filename has none")
+    partition.add_argument("--replace", action="store_true", help="replace a different report partitioned "
+                                                                  "for the same date")
+
+    commands.add_parser("list", help="show the partitions on disk")
+
+    export = commands.add_parser("export", help="write some clusters' rows for one date to a file")
+    export.add_argument("--date", default="latest", help="report date (default: latest)")
+    export.add_argument("--cluster", action="append", help="CFS Cluster to read (repeatable; default: all)")
+    export.add_argument("--output", required=True, help="output file (.xlsx, .csv or .parquet)")
+    args = parser.parse_args()
+
+    if args.command == "partition":
+        paths = [path for pattern in args.files for path in (sorted(glob.glob(pattern)) or [pattern])]
+        for path in paths:
+            partition_report(path, args.date, args.root, args.replace)
+    elif args.command == "list":
+        partitions = list_partitions(args.root)
+        print(partitions[['cluster', 'date', 'rows']].to_string(index=False) if len(partitions)
+              else "No partitions yet")
+    else:
+        start = time.perf_counter()
+        df = read_partitions(args.cluster, args.date, args.root)
+        write_report(df, args.output)
+        print(f"✅ {len(df)} rows saved to {args.output} (read in {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Sorted and filtered views over an output DataFrame for the preview pane.
+
+The frame itself is never copied or reordered: a view is an array of row
+positions. Each column is factorized once (sorted codes plus the unique values),
+so sorting is a cached stable argsort of the codes and a text filter only tests
+the unique values, then maps the hits back through the codes. Cells are
+formatted one at a time, only for the rows the table asks for.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def format_cell(value):
+    """Display text for one cell"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        value = pd.Timestamp(value)
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.10g}"
+    return str(value)
+
+
+class FrameView:
+    """Row order over a DataFrame; sort and filter change positions, not the frame"""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = [str(column) for column in df.columns]
+        self.values = [df.iloc[:, i].to_numpy(copy=False) for i in range(len(df.columns))]
+        self._codes = {}
+        self._orders = {}
+        self._labels = {}
+        self.sort_column = None
+        self.descending = False
+        self.filter_column = None
+        self.filter_text = ""
+        self.rows = np.arange(len(df))
+
+    @property
+    def total_rows(self):
+        return len(self.df)
+
+    def codes(self, column):
+        """(codes, uniques) for a column, sorted so code order is value order; NaN is -1"""
+        if column not in self._codes:
+            series = self.df.iloc[:, column]
+            try:
+                codes, uniques = pd.factorize(series, sort=True)
+            except TypeError:
+                # Mixed types (numbers and text in one column) sort as text
+                codes, uniques = pd.factorize(series.where(series.isna(), series.astype(str)), sort=True)
+            self._codes[column] = (codes, uniques)
+        return self._codes[column]
+
+    def order(self, column):
+        """Row positions in ascending column order, blanks last"""
+        if column not in self._orders:
+            codes, uniques = self.codes(column)
+            keys = np.where(codes < 0, len(uniques), codes)
+            self._orders[column] = np.argsort(keys, kind="stable")
+        return self._orders[column]
+
+    def matches(self, column, text):
+        """Boolean mask of rows whose cell text contains `text` (case-insensitive)"""
+        codes, uniques = self.codes(column)
+        if column not in self._labels:
+            if uniques.dtype == object:
+                labels = pd.Series(uniques, dtype=object).astype(str)
+            else:
+                labels = pd.Series([format_cell(value) for value in uniques], dtype=object)
+            self._labels[column] = labels.str.lower()
+        hit = np.zeros(len(uniques) + 1, dtype=bool)
+        hit[:-1] = self._labels[column].str.contains(text.lower(), regex=False).to_numpy()
+        # Code -1 (blank) indexes the trailing False
+        return hit[codes]
+
+    def sort(self, column, descending=False):
+        self.sort_column, self.descending = column, descending
+        self.refresh()
+
+    def filter(self, column, text):
+        """Keep rows containing `text` in `column`, or in any column when column is None"""
+        self.filter_column, self.filter_text = column, text.strip()
+        self.refresh()
+
+    def refresh(self):
+        if self.sort_column is None:
+            rows = np.arange(len(self.df))
+        else:
+            rows = self.order(self.sort_column)
+            if self.descending:
+                codes, uniques = self.codes(self.sort_column)
+                # Reverse the non-blank part only, so blanks stay at the bottom
+                filled = int((codes >= 0).sum())
+                rows = np.concatenate([rows[:filled][::-1], rows[filled:]])
+        if self.filter_text:
+            columns = range(len(self.columns)) if self.filter_column is None else [self.filter_column]
+            mask = np.zeros(len(self.df), dtype=bool)
+            for column in columns:
+                mask |= self.matches(column, self.filter_text)
+            rows = rows[mask[rows]]
+        self.rows = rows
+
+    def source_row(self, row):
+        return int(self.rows[row])
+
+    def text(self, row, column):
+        return format_cell(self.values[column][self.rows[row]])
@@ -0,0 +1,406 @@
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from reportlib.barangay import BarangayResolver
+from reportlib.colocation import find_colocated, summarize
+from reportlib.config import (columns_to_extract, valid_clusters, dsl_techs, group_mapping, top_k,
+                              validation_rules, coordinate_bounds, known_clusters, colocation_radius_m)
+from reportlib.formats import FORMAT_EXTENSIONS, detect_format, write_report
+from reportlib.memstats import MemoryTracker
+from reportlib.partitions import is_dataset_source, read_dataset_source
+from reportlib.schema import HeaderResolver, select_columns
+from reportlib.sheets import probe_sheets, read_sheets
+from reportlib.snapshots import is_snapshot_source, read_snapshot_source
+from reportlib.topk import GroupTopK
+from reportlib.validation import ReportValidator
+
+
+def _ignore(*args):
+    pass
+
+
+def output_rules(output_format, resolver):
+    """Everything besides the input and the code that decides run_processing's outputs.
+
+    Used as the rules part of the output cache key. Automatic barangay matches
+    follow from group_mapping; only an operator's manual fixes are listed.
+    """
+    return {
+        "columns_to_extract": columns_to_extract,
+        "valid_clusters": valid_clusters,
+        "dsl_techs": dsl_techs,
+        "top_k": top_k,
+        "validation_rules": validation_rules,
+        "coordinate_bounds": coordinate_bounds,
+        "known_clusters": known_clusters,
+        "colocation_radius_m": colocation_radius_m,
+        "group_mapping": group_mapping,
+        "output_format": output_format,
+        "manual_barangays": {raw: entry["canonical"] for raw, entry in sorted(resolver.resolutions.items())
+                             if entry["method"] == "manual"},
+    }
+
+
+def load_report_frame(source, status=_ignore, progress=_ignore, debug=_ignore, header_resolver=None, fmt=None):
+    """The report's required columns from a path, "snapshot:"/"dataset:" source, file object or DataFrame.
+
+    Paths have their headers probed before the full parse; file objects and
+    DataFrames are loaded whole and their renamed columns matched the same way.
+    """
+    if isinstance(source, pd.DataFrame):
+        return select_columns(source, columns_to_extract, header_resolver)
+    if is_snapshot_source(source):
+        # Already parsed into the snapshot store: an indexed query replaces the Excel read
+        status("Loading snapshot...")
+        progress(10)
+        return read_snapshot_source(source, clusters=valid_clusters)
+    if is_dataset_source(source):
+        # Only the valid clusters' partitions are opened
+        status("Loading partitioned dataset...")
+        progress(10)
+        return read_dataset_source(source, clusters=valid_clusters)
+    if hasattr(source, "read"):
+        status("Loading input file...")
+        progress(10)
+        fmt = detect_format(getattr(source, "name", ""), fmt)
+        if fmt == "csv":
+            df = pd.read_csv(source, low_memory=False)
+            df.columns = df.columns.str.strip()
+        elif fmt == "parquet":
+            df = pd.read_parquet(source)
+        else:
+            df = pd.read_excel(source)
+        return select_columns(df, columns_to_extract, header_resolver)
+
+    status("Checking columns...")
+    progress(5)
+
+    # Probe the headers first so a bad file is rejected before the full parse;
+    # every sheet with the expected header is part of the report
+    sheets = probe_sheets(source, columns_to_extract, resolver=header_resolver)
+    if len(sheets) > 1:
+        debug(f"Report sheets: {[sheet for sheet, _ in sheets]}")
+    for sheet, mapping in sheets:
+        renamed = {column: actual for column, actual in mapping.items() if column != actual}
+        if renamed:
+            debug(f"Matched renamed columns in sheet {sheet}: {renamed}")
+
+    status("Loading input file...")
+    progress(10)
+
+    # Load only the required columns (xlsx, csv or parquet), sheets in parallel
+    return read_sheets(source, sheets)
+
+
+class ReportRouting:
+    """Which rows of a loaded report go to each output, as boolean masks over it.
+
+    Nothing is copied here; frame() builds one output from its rows when asked.
+    """
+
+    def __init__(self, df, resolver=None, debug=_ignore, save_resolver=True):
+        self.df = df
+
+        # Check cluster values
+        cluster = df['CFS Cluster']
+        debug(f"Unique CFS Cluster values: {cluster.unique()}")
+        self.in_cluster = in_cluster = cluster.isin(valid_clusters).to_numpy()
+        debug(f"After cluster filtering shape: {(int(in_cluster.sum()), df.shape[1])}")
+
+        # Check barangay values
+        brgy_names = df['BRGY_NAME'][in_cluster]
+        debug(f"Unique BRGY_NAME values: {brgy_names.unique()[:20]}")  # First 20 only
+
+        # Resolve each distinct barangay name to its group (memoized across runs)
+        if resolver is None:
+            resolver = BarangayResolver()
+        self.resolver = resolver
+        brgy_group = np.full(len(df), None, dtype=object)
+        brgy_group[in_cluster] = resolver.group_series(brgy_names).to_numpy()
+        del brgy_names
+        if save_resolver:
+            resolver.save()
+        unresolved = resolver.unresolved()
+        debug(f"Resolved {len(resolver.row_counts) - len(unresolved)} of {len(resolver.row_counts)} "
+              f"distinct BRGY_NAME values")
+        if unresolved:
+            debug(f"WARNING: {len(unresolved)} unresolved BRGY_NAME values (see {resolver.review_path}): "
+                  f"{unresolved[:20]}")
+
+        # Check tech values
+        tech = df['Tech']
+        debug(f"Unique Tech values: {tech[in_cluster].unique()}")
+
+        # Spare files treat a blank Tech as GPON before dropping DSL rows
+        spare_tech = tech.fillna("GPON").replace(" ", "GPON")
+        is_davao_north = (cluster == "DAVAO NORTH").to_numpy()
+        is_davao_south = (cluster == "DAVAO SOUTH").to_numpy()
+
+        # output name -> (row mask, replacement Tech column or None), in the order the files are written
+        self.masks = {}
+        self.group_labels = np.full(len(df), None, dtype=object)
+        for name in group_mapping:
+            debug(f"\nProcessing {name} group...")
+
+            # Filter by resolved barangay group
+            mask = in_cluster & (brgy_group == name)
+            debug(f"After barangay filtering: {int(mask.sum())} rows")
+
+            # Apply cluster-specific filtering
+            if name == "South":
+                # For South group, only include Davao North entries
+                mask &= is_davao_north
+                debug(f"After DAVAO NORTH filter: {int(mask.sum())} rows")
+            elif name in ["Central", "North"]:
+                # For Central and North, exclude Davao South
+                mask &= ~is_davao_south
+                debug(f"After excluding DAVAO SOUTH: {int(mask.sum())} rows")
+
+            self.masks[name] = (mask, None)
+            self.group_labels[mask] = name
+            self.masks[f"{name} Spare"] = (mask & ~spare_tech.isin(dsl_techs).to_numpy(), spare_tech)
+
+        # DSL file - only from Davao North cluster with DSL technologies
+        dsl_mask = in_cluster & tech.isin(dsl_techs).to_numpy()
+        debug(f"DSL technologies found: {int(dsl_mask.sum())} rows")
+        dsl_mask &= is_davao_north
+        debug(f"DSL from DAVAO NORTH: {int(dsl_mask.sum())} rows")
+        self.masks["DSL"] = (dsl_mask, None)
+
+    def rows(self, name):
+        return int(self.masks[name][0].sum())
+
+    def frame(self, name):
+        """Build one output from its rows (the only copy) and add coordinates"""
+        mask, tech_values = self.masks[name]
+        rows = np.flatnonzero(mask)
+        data = self.df.take(rows)
+        data.index = pd.RangeIndex(len(data))
+        if tech_values is not None:
+            data['Tech'] = tech_values.to_numpy()[rows]
+        if 'DP/NAP LAT' in data.columns and 'DP/NAP LONG' in data.columns:
+            # Handle NaN values in coordinates (blank cells stay blank in the lat/long columns)
+            lat = data['DP/NAP LAT'].fillna('')
+            long = data['DP/NAP LONG'].fillna('')
+            data['coordinates'] = lat.astype(str) + ", " + long.astype(str)
+        return data
+
+    def cluster_frame(self, cluster):
+        """Every row of one CFS Cluster (trimmed, any case)"""
+        wanted = str(cluster).strip().upper()
+        rows = np.flatnonzero((self.df['CFS Cluster'].astype(str).str.strip().str.upper() == wanted).to_numpy())
+        data = self.df.take(rows)
+        data.index = pd.RangeIndex(len(data))
+        return data
+
+    def ranking(self):
+        """Most and least utilized DPs per barangay group (rows of the group files) and per cluster"""
+        top = GroupTopK(top_k)
+        cluster = self.df['CFS Cluster'].to_numpy()
+        top.add(self.df, {"Barangay group": self.group_labels, "Cluster": np.where(self.in_cluster, cluster, None)})
+        return top.result()
+
+    def colocated(self):
+        """DPs of the valid clusters standing within a few meters of another one"""
+        return find_colocated(self.df, colocation_radius_m, mask=self.in_cluster)
+
+
+def run_processing(input_filepath, output_dir, progress=_ignore, status=_ignore, debug=_ignore,
+                   output_format="xlsx", resolver=None, frames=None, trace_memory=False):
+    """Split a utilization report into the South/Central/North/Spare/DSL files.
+
+    progress, status and debug are callbacks (the GUI passes its signal emitters,
+    headless tools pass loggers). The input format follows its extension (xlsx,
+    csv or parquet), or "snapshot:<date>" / "dataset:<date>" reads that date
+    from the snapshot store or the partitioned dataset; output_format picks the
+    format of the generated files.
+    Barangay names are matched through a BarangayResolver (the persisted one by
+    default). Returns a dict of output filename -> path; when a dict is passed
+    as frames it also receives each output's final DataFrame by filename.
+
+    After loading, rows are selected with boolean masks over the loaded frame
+    and each output is built once, right before it is written. Memory per
+    stage goes to debug (with tracemalloc allocations when trace_memory is set).
+    Rows breaking the data-quality rules are written to "Rejects" with the
+    rules they broke; the per-rule counts go to debug. DPs within
+    colocation_radius_m of another DP are listed in "Co-located DPs".
+    """
+    extension = FORMAT_EXTENSIONS[output_format]
+    memory = MemoryTracker(trace=trace_memory)
+
+    df = load_report_frame(input_filepath, status, progress, debug)
+    debug(f"After column filtering shape: {df.shape}")
+    memory.checkpoint("load")
+
+    status("Validating data...")
+    progress(20)
+
+    # Data-quality rules over every loaded row; offenders are listed in Rejects, not dropped
+    validator = ReportValidator()
+    rejects = validator.rejects(df)
+    for line in validator.report():
+        debug(line)
+    memory.checkpoint("validation")
+
+    status("Filtering data...")
+    progress(30)
+
+    # From here on rows are picked with masks over df; nothing is copied until an output is written
+    routing = ReportRouting(df, resolver, debug)
+    memory.checkpoint("filter")
+
+    output_files = {}
+
+    def write_output(name, data):
+        filename = f"{name}{extension}"
+        filepath = os.path.join(output_dir, filename)
+        write_report(data, filepath, output_format)
+        output_files[filename] = filepath
+        if frames is not None:
+            frames[filename] = data
+        return filename
+
+    status("Processing barangay groups...")
+    progress(50)
+
+    # Create group files even if empty to ensure all files are generated
+    for name in group_mapping:
+        for output in (name, f"{name} Spare"):
+            filename = write_output(output, routing.frame(output))
+            debug(f"Created {filename} with {routing.rows(output)} rows")
+        memory.checkpoint(f"{name} files")
+
+    status("Creating DSL file...")
+    progress(70)
+
+    filename = write_output("DSL", routing.frame("DSL"))
+    debug(f"Created {filename} with {routing.rows('DSL')} rows")
+    memory.checkpoint("DSL file")
+
+    status("Ranking DPs...")
+    progress(85)
+
+    ranking = routing.ranking()
+    filename = write_output("Top DPs", ranking)
+    groups = ranking[['Level', 'Group']].drop_duplicates().shape[0]
+    debug(f"Created {filename} with the top {top_k} DPs of {groups} groups")
+    memory.checkpoint("ranking")
+
+    status("Finding co-located DPs...")
+    progress(90)
+
+    colocated = routing.colocated()
+    write_output("Co-located DPs", colocated)
+    debug(summarize(colocated))
+    memory.checkpoint("co-location")
+
+    filename = write_output("Rejects", rejects)
+    debug(f"Created {filename} with {len(rejects)} rows")
+
+    for line in memory.report():
+        debug(line)
+    memory.stop()
+
+    progress(100)
+    status("Processing complete!")
+    debug(f"Final output: {len(output_files)} files created")
+    return output_files
+
+
+class ProcessingResult(Mapping):
+    """run_processing's outputs as a read-only mapping of name -> DataFrame, built on first access.
+
+    Names are the output filenames without extension ("South", "South Spare",
+    ..., "DSL", "Top DPs", "Co-located DPs", "Rejects"). Routing is decided up
+    front with masks over the loaded report; an output's rows are only copied
+    (and ranking, co-location or validation only run) when it is read, and the
+    result is kept for later reads. Nothing touches the disk until save().
+    """
+
+    def __init__(self, df, routing):
+        self.df = df
+        self.routing = routing
+        self.validator = None
+        self.frames = {}
+        self.builders = {name: (lambda name=name: routing.frame(name)) for name in routing.masks}
+        self.builders["Top DPs"] = routing.ranking
+        self.builders["Co-located DPs"] = routing.colocated
+        self.builders["Rejects"] = self._rejects
+        self.cluster_frames = {}
+
+    def _rejects(self):
+        self.validator = ReportValidator()
+        return self.validator.rejects(self.df)
+
+    def __getitem__(self, name):
+        if name not in self.frames:
+            self.frames[name] = self.builders[name]()
+        return self.frames[name]
+
+    def __iter__(self):
+        return iter(self.builders)
+
+    def __len__(self):
+        return len(self.builders)
+
+    def is_materialized(self, name):
+        return name in self.frames
+
+    def rows(self, name):
+        """Row count of a routed output without building it"""
+        if name in self.routing.masks:
+            return self.routing.rows(name)
+        return len(self[name])
+
+    @property
+    def clusters(self):
+        return sorted(self.df['CFS Cluster'].dropna().astype(str).str.strip().str.upper().unique())
+
+    def cluster(self, name):
+        """Every loaded row of one CFS Cluster, built on first access"""
+        key = str(name).strip().upper()
+        if key not in self.cluster_frames:
+            self.cluster_frames[key] = self.routing.cluster_frame(key)
+        return self.cluster_frames[key]
+
+    def validation_summary(self):
+        """Per-rule violation counts (runs the validation if Rejects wasn't read yet)"""
+        self["Rejects"]
+        return self.validator.summary()
+
+    def save(self, output_dir, output_format="xlsx", names=None, frames=None):
+        """Write the outputs (all, or the given names) like run_processing; returns filename -> path.
+
+        Outputs not read yet are built for the write and dropped again.
+        """
+        extension = FORMAT_EXTENSIONS[output_format]
+        os.makedirs(output_dir, exist_ok=True)
+        output_files = {}
+        for name in names or self:
+            data = self.frames[name] if name in self.frames else self.builders[name]()
+            filename = f"{name}{extension}"
+            output_files[filename] = write_report(data, os.path.join(output_dir, filename), output_format)
+            if frames is not None:
+                frames[filename] = data
+        return output_files
+
+
+def process_report(source, fmt=None, resolver=None, debug=_ignore):
+    """Route a report in memory and return its outputs as a lazily built ProcessingResult.
+
+    source is a path, "snapshot:<date>" or "dataset:<date>", an open file (fmt
+    or its name gives the format) or a DataFrame with the report's columns.
+    Header and barangay lookups read the persisted tables but new matches are
+    kept in memory; nothing is written unless the result is saved.
+
+        from reportlib.processing import process_report
+        result = process_report("Files/report.xlsx")
+        south = result["South"]                # only South is copied out of the report
+        result.save("Outputs", "csv", names=["South", "DSL"])
+    """
+    df = load_report_frame(source, debug=debug, header_resolver=HeaderResolver(persist=False), fmt=fmt)
+    debug(f"After column filtering shape: {df.shape}")
+    return ProcessingResult(df, ReportRouting(df, resolver, debug, save_resolver=False))
@@ -0,0 +1,348 @@
+"""Ad-hoc filters over a loaded report, answered from indexes built once.
+
+    cluster = "TAGUM 2" and tech = GPON and brgy = Panacan and s_sp >= 1
+    (brgy in (Sasa, Panacan) or location = Rural) and not tech in (VDSL, ADSL)
+    s_sp between 2 and 4
+
+CFS Cluster, BRGY_NAME, Tech and Location Type get an inverted index (row
+positions grouped by value; matching is case-insensitive); values of the
+low-cardinality columns are also kept as packed bitmaps. S_SP is sorted once
+so a range is two binary searches. A query is evaluated as bitmap AND/OR/NOT
+and only the matching rows are taken from the report.
+"""
+
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from reportlib.config import columns_to_extract
+from reportlib.formats import write_report
+from reportlib.schema import probe_columns, read_columns
+from reportlib.snapshots import is_snapshot_source, read_snapshot_source
+
+INDEXED_COLUMNS = ['CFS Cluster', 'BRGY_NAME', 'Tech', 'Location Type']
+RANGE_COLUMNS = ['S_SP', 'S_Total']
+# Names accepted in queries (lower case)
+FIELD_ALIASES = {
+    "cluster": "CFS Cluster", "cfs cluster": "CFS Cluster",
+    "brgy": "BRGY_NAME", "barangay": "BRGY_NAME", "brgy_name": "BRGY_NAME",
+    "tech": "Tech",
+    "location": "Location Type", "location type": "Location Type", "location_type": "Location Type",
+    "s_sp": "S_SP", "spare": "S_SP",
+    "s_total": "S_Total", "total": "S_Total",
+}
+# Columns with at most this many distinct values keep a bitmap per value
+BITMAP_MAX_VALUES = 64
+KEYWORDS = {"and", "or", "not", "in", "between"}
+
+_TOKEN = re.compile(r'\s*(?:"([^"]*)"|\'([^\']*)\'|(<=|>=|!=|<>|==|[=<>(),])|([^\s"\'(),=<>!]+))')
+
+
+class QueryError(ValueError):
+    """The query can't be parsed or names an unknown column"""
+
+
+def _key(value):
+    return str(value).strip().casefold()
+
+
+class ReportIndex:
+    """Inverted, bitmap and sorted indexes over one report DataFrame"""
+
+    def __init__(self, df):
+        self.df = df
+        self.rows = len(df)
+        self.inverted = {}
+        self.bitmaps = {}
+        self.sorted = {}
+        for column in INDEXED_COLUMNS:
+            if column in df.columns:
+                self._index_labels(column)
+        for column in RANGE_COLUMNS:
+            if column in df.columns:
+                values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+                order = np.argsort(values, kind="stable")
+                filled = int((~np.isnan(values)).sum())
+                # NaN sorts last; keep only the numbers
+                self.sorted[column] = (values[order[:filled]], order[:filled])
+
+    def _index_labels(self, column):
+        keys = self.df[column].map(_key, na_action="ignore")
+        codes, uniques = pd.factorize(keys)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with a blank cell (code -1) sort first; skip them
+        start = int((codes < 0).sum())
+        offsets = start + np.concatenate([[0], np.cumsum(counts)])
+        self.inverted[column] = {key: order[offsets[i]:offsets[i + 1]] for i, key in enumerate(uniques)}
+        if len(uniques) <= BITMAP_MAX_VALUES:
+            self.bitmaps[column] = {key: self._from_positions(positions)
+                                    for key, positions in self.inverted[column].items()}
+
+    def _from_positions(self, positions):
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def none(self):
+        return np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+
+    def invert(self, bitmap):
+        result = ~bitmap
+        # Clear the padding bits past the last row
+        if self.rows % 8:
+            result[-1] &= np.uint8(0xFF << (8 - self.rows % 8) & 0xFF)
+        return result
+
+    def values(self, column):
+        """Distinct values of an indexed column as they appear in the report"""
+        return sorted(str(value) for value in self.df[column].dropna().unique())
+
+    def equals(self, column, values):
+        """Bitmap of rows whose column is any of values"""
+        if column not in self.inverted:
+            raise QueryError(f"Column '{column}' is not indexed")
+        result = self.none()
+        for value in values:
+            key = _key(value)
+            if column in self.bitmaps:
+                bitmap = self.bitmaps[column].get(key)
+                if bitmap is not None:
+                    result |= bitmap
+            elif key in self.inverted[column]:
+                result |= self._from_positions(self.inverted[column][key])
+        return result
+
+    def between(self, column, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        """Bitmap of rows whose numeric column lies in the range (None: unbounded)"""
+        if column not in self.sorted:
+            raise QueryError(f"Column '{column}' has no range index")
+        values, order = self.sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side="left" if low_inclusive else "right")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right" if high_inclusive else "left")
+        return self._from_positions(order[start:max(start, stop)])
+
+    def select(self, bitmap):
+        """Matching rows in report order"""
+        rows = np.flatnonzero(np.unpackbits(bitmap, count=self.rows))
+        result = self.df.take(rows)
+        result.index = pd.RangeIndex(len(result))
+        return result
+
+    def query(self, text):
+        return self.select(_Parser(text, self).parse())
+
+
+class _Parser:
+    """Recursive descent over: or-terms of and-factors of [not] predicates"""
+
+    def __init__(self, text, index):
+        self.tokens = self.tokenize(text)
+        self.pos = 0
+        self.index = index
+
+    @staticmethod
+    def tokenize(text):
+        tokens = []
+        pos = 0
+        text = text.strip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise QueryError(f"Unexpected character at: {text[pos:]!r}")
+            pos = match.end()
+            double, single, symbol, word = match.groups()
+            if double is not None or single is not None:
+                tokens.append(("value", double if double is not None else single))
+            elif symbol is not None:
+                tokens.append(("symbol", symbol))
+            elif word.lower() in KEYWORDS:
+                tokens.append(("keyword", word.lower()))
+            else:
+                tokens.append(("word", word))
+        return tokens
+
+    def peek(self, kind=None, text=None):
+        if self.pos >= len(self.tokens):
+            return None
+        token = self.tokens[self.pos]
+        if (kind and token[0] != kind) or (text and token[1] != text):
+            return None
+        return token
+
+    def take(self, kind=None, text=None):
+        token = self.peek(kind, text)
+        if token is None:
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else "end of query"
+            raise QueryError(f"Expected {text or kind}, found {found!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return self.index.invert(self.index.none())
+        result = self.expression()
+        if self.pos < len(self.tokens):
+            raise QueryError(f"Unexpected {self.tokens[self.pos][1]!r}")
+        return result
+
+    def expression(self):
+        result = self.term()
+        while self.peek("keyword", "or"):
+            self.take()
+            result = result | self.term()
+        return result
+
+    def term(self):
+        result = self.factor()
+        while self.peek("keyword", "and"):
+            self.take()
+            result = result & self.factor()
+        return result
+
+    def factor(self):
+        if self.peek("keyword", "not"):
+            self.take()
+            return self.index.invert(self.factor())
+        if self.peek("symbol", "("):
+            self.take()
+            result = self.expression()
+            self.take("symbol", ")")
+            return result
+        return self.predicate()
+
+    def words(self):
+        """A value: one quoted string, or bare words up to the next keyword/symbol"""
+        if self.peek("value"):
+            return self.take()[1]
+        words = [self.take("word")[1]]
+        while self.peek("word"):
+            words.append(self.take()[1])
+        return " ".join(words)
+
+    def number(self):
+        value = self.words()
+        try:
+            return float(value)
+        except ValueError:
+            raise QueryError(f"Expected a number, found {value!r}")
+
+    def predicate(self):
+        name = self.words()
+        column = FIELD_ALIASES.get(name.lower(), name)
+        if column not in INDEXED_COLUMNS + RANGE_COLUMNS:
+            raise QueryError(f"Unknown field {name!r} (use cluster, brgy, tech, location, s_sp or s_total)")
+        if self.peek("keyword", "in"):
+            self.take()
+            self.take("symbol", "(")
+            # Range columns take numbers, the others words
+            read = self.number if column in RANGE_COLUMNS else self.words
+            values = [read()]
+            while self.peek("symbol", ","):
+                self.take()
+                values.append(read())
+            self.take("symbol", ")")
+            if column in RANGE_COLUMNS:
+                result = self.index.none()
+                for value in values:
+                    result |= self.index.between(column, value, value)
+                return result
+            return self.index.equals(column, values)
+        if self.peek("keyword", "between"):
+            self.take()
+            low = self.number()
+            self.take("keyword", "and")
+            return self.index.between(column, low, self.number())
+
+        op = self.take("symbol")[1]
+        if column in RANGE_COLUMNS:
+            value = self.number()
+            ranges = {
+                "=": (value, value, True, True), "==": (value, value, True, True),
+                "<": (None, value, True, False), "<=": (None, value, True, True),
+                ">": (value, None, False, True), ">=": (value, None, True, True),
+            }
+            if op in ("!=", "<>"):
+                return self.index.invert(self.index.between(column, value, value))
+            if op not in ranges:
+                raise QueryError(f"Unexpected {op!r}")
+            return self.index.between(column, *ranges[op])
+        value = self.words()
+        if op in ("=", "=="):
+            return self.index.equals(column, [value])
+        if op in ("!=", "<>"):
+            return self.index.invert(self.index.equals(column, [value]))
+        raise QueryError(f"{op!r} only works on s_sp and s_total")
+
+
+def load_report(source):
+    """The report's required columns (renamed headers matched), or a stored snapshot"""
+    if is_snapshot_source(source):
+        return read_snapshot_source(source)
+    mapping, _, _ = probe_columns(source, columns_to_extract)
+    return read_columns(source, mapping)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filter a report interactively, e.g. "
+                                                 "cluster = \"TAGUM 2\" and tech = GPON and s_sp >= 1")
+    parser.add_argument("report", help="report file (.xlsx, .csv, .parquet) or snapshot:<date>")
+    parser.add_argument("--query", help="run one query and exit")
+    parser.add_argument("--output", help="write the --query result to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_report(args.report)
+    loaded = time.perf_counter()
+    index = ReportIndex(df)
+    print(f"📂 {len(df):,} rows loaded in {loaded - start:.1f}s, indexed in {time.perf_counter() - loaded:.2f}s")
+
+    def run(text):
+        start = time.perf_counter()
+        result = index.query(text)
+        print(f"🔎 {len(result):,} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return result
+
+    if args.query:
+        result = run(args.query)
+        if args.output:
+            write_report(result, args.output)
+            print(f"✅ Saved to {args.output}")
+        else:
+            print(result.head(20).to_string(index=False))
+        return
+
+    print("Type a query, 'values <field>', 'export <file>' for the last result, or 'quit'.")
+    result = None
+    while True:
+        try:
+            line = input("query> ").strip()
+        except EOFError:
+            break
+        if not line:
+            continue
+        if line.lower() in ("quit", "exit"):
+            break
+        try:
+            if line.lower().startswith("values "):
+                column = FIELD_ALIASES.get(line[7:].strip().lower(), line[7:].strip())
+                print(", ".join(index.values(column)))
+            elif line.lower().startswith("export "):
+                if result is None:
+                    print("❌ Run a query first")
+                    continue
+                path = line[7:].strip().strip('"')
+                write_report(result, path)
+                print(f"✅ {len(result):,} rows saved to {path}")
+            else:
+                result = run(line)
+                print(result.head(20).to_string(index=False))
+        except (QueryError, KeyError) as e:
+            print(f"❌ {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Utilization trends over the daily reports.
+
+Every ingested report adds one day to running per-key series (per DP, per
+barangay and per cluster) held in preallocated float32 arrays that double in
+size when full, so a new day costs O(rows in that report) and earlier reports
+are never re-read. Daily, weekly and monthly aggregates, growth rates and the
+fastest-filling DPs are computed from the arrays:
+
+    python -m reportlib.rollups ingest "Files/DVN DP Util *.xlsx"
+    python -m reportlib.rollups ingest --from-store
+    python -m reportlib.rollups export --level cluster --freq W --output cluster_weekly.xlsx
+    python -m reportlib.rollups fastest --days 30 --top 50 --output filling_fastest.xlsx
+"""
+
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from reportlib.config import data_dir
+from reportlib.formats import write_report
+from reportlib.schema import probe_columns, read_columns
+from reportlib.snapshots import SnapshotStore, snapshot_date_from_filename
+
+ROLLUP_DIRNAME = "rollups"
+ROLLUP_COLUMNS = ['DPdeniro', 'S_SP', 'S_Total', 'BRGY_NAME', 'CFS Cluster']
+LEVELS = ("dp", "barangay", "cluster")
+# Values kept per key and day; DPs is the number of DPs summed into a barangay/cluster
+FIELDS = ("S_SP", "S_Total", "DPs")
+FREQUENCIES = {"D": "D", "W": "W-SUN", "M": "MS"}
+
+
+class RunningSeries:
+    """Per-key daily values in a (field, key, day) float32 array; missing days are NaN"""
+
+    def __init__(self, keys=(), data=None, days=0):
+        self.keys = list(keys)
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        self.days = days
+        if data is None:
+            data = np.full((len(FIELDS), 64, 32), np.nan, dtype=np.float32)
+        self.data = data
+
+    def _grow(self, keys, days):
+        fields, key_capacity, day_capacity = self.data.shape
+        if keys <= key_capacity and days <= day_capacity:
+            return
+        while key_capacity < keys:
+            key_capacity *= 2
+        while day_capacity < days:
+            day_capacity *= 2
+        grown = np.full((fields, key_capacity, day_capacity), np.nan, dtype=np.float32)
+        grown[:, :self.data.shape[1], :self.data.shape[2]] = self.data
+        self.data = grown
+
+    def rows_for(self, keys):
+        """Row of each key, adding keys not seen before"""
+        for key in keys:
+            if key not in self.index:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+        return np.fromiter((self.index[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def add_day(self, keys, values):
+        """Append one day; values is a (field, key) array aligned with keys"""
+        rows = self.rows_for(keys)
+        self._grow(len(self.keys), self.days + 1)
+        self.data[:, rows, self.days] = values
+        self.days += 1
+
+    def frame(self, field, dates):
+        """keys x dates DataFrame of one field"""
+        values = self.data[FIELDS.index(field), :len(self.keys), :self.days]
+        return pd.DataFrame(values, index=pd.Index(self.keys, tupleize_cols=False), columns=pd.DatetimeIndex(dates))
+
+    def trimmed(self):
+        return self.data[:, :len(self.keys), :self.days]
+
+
+class UtilizationRollup:
+    """Running S_SP/S_Total series per DP, barangay and cluster, persisted in the data folder"""
+
+    def __init__(self, state_dir=None):
+        self.state_dir = state_dir or os.path.join(data_dir, ROLLUP_DIRNAME)
+        self.dates = []
+        self.sources = []
+        self.dp_info = {}
+        self.series = {level: RunningSeries() for level in LEVELS}
+        self.load()
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.state_dir, "rollup.json")
+
+    @property
+    def arrays_path(self):
+        return os.path.join(self.state_dir, "rollup.npz")
+
+    def load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dates = meta["dates"]
+        self.sources = meta["sources"]
+        self.dp_info = meta["dp_info"]
+        with np.load(self.arrays_path) as arrays:
+            for level in LEVELS:
+                keys = meta["keys"][level]
+                if level == "barangay":
+                    keys = [tuple(key) for key in keys]
+                data = arrays[level]
+                series = RunningSeries(keys, days=data.shape[2])
+                series._grow(max(len(keys), 1), max(data.shape[2], 1))
+                series.data[:, :data.shape[1], :data.shape[2]] = data
+                self.series[level] = series
+
+    def save(self):
+        """Write the trimmed arrays and key lists (tmp files, then replace)"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        meta = {
+            "dates": self.dates,
+            "sources": self.sources,
+            "dp_info": self.dp_info,
+            "keys": {level: [list(key) if isinstance(key, tuple) else key for key in series.keys]
+                     for level, series in self.series.items()},
+        }
+        tmp_arrays = self.arrays_path + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_arrays, **{level: series.trimmed() for level, series in self.series.items()})
+        tmp_meta = self.meta_path + f".{os.getpid()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_arrays, self.arrays_path)
+        os.replace(tmp_meta, self.meta_path)
+
+    def add_day(self, snapshot_date, df, source=""):
+        """Append one day's report rows; days must arrive in date order.
+
+        Returns False (and changes nothing) when the date is already in the rollup.
+        """
+        if snapshot_date in self.dates:
+            return False
+        if self.dates and snapshot_date < self.dates[-1]:
+            raise ValueError(f"{snapshot_date} is older than the last rolled-up day ({self.dates[-1]}); "
+                             f"ingest reports in date order")
+
+        df = df.dropna(subset=['DPdeniro']).copy()
+        df['DPdeniro'] = df['DPdeniro'].astype(str).str.strip()
+        df['BRGY_NAME'] = df['BRGY_NAME'].fillna("").astype(str).str.strip()
+        df['CFS Cluster'] = df['CFS Cluster'].fillna("").astype(str).str.strip().str.upper()
+        df['S_SP'] = pd.to_numeric(df['S_SP'], errors="coerce")
+        df['S_Total'] = pd.to_numeric(df['S_Total'], errors="coerce")
+        # A DP listed twice counts once, with its last row
+        df = df.drop_duplicates(subset=['DPdeniro'], keep="last")
+        df['DPs'] = 1.0
+
+        dps = df['DPdeniro'].tolist()
+        self.series["dp"].add_day(dps, df[list(FIELDS)].to_numpy(dtype=np.float32).T)
+        for dp, cluster, brgy in zip(dps, df['CFS Cluster'], df['BRGY_NAME']):
+            self.dp_info[dp] = [cluster, brgy]
+
+        barangays = df.groupby(['CFS Cluster', 'BRGY_NAME'])[list(FIELDS)].sum(min_count=1)
+        self.series["barangay"].add_day(list(barangays.index), barangays.to_numpy(dtype=np.float32).T)
+        clusters = df.groupby('CFS Cluster')[list(FIELDS)].sum(min_count=1)
+        self.series["cluster"].add_day(list(clusters.index), clusters.to_numpy(dtype=np.float32).T)
+
+        self.dates.append(snapshot_date)
+        self.sources.append(source)
+        return True
+
+    def ingest(self, path, snapshot_date=None, log=print):
+        """Add one dated report file (date from the filename unless given)"""
+        snapshot_date = snapshot_date or snapshot_date_from_filename(path)
+        if not snapshot_date:
+            raise ValueError(f"Can't tell the report date of '{path}'; pass it explicitly")
+        if snapshot_date in self.dates:
+            log(f"⏭️ {snapshot_date} already rolled up")
+            return False
+        mapping, _, _ = probe_columns(path, ROLLUP_COLUMNS)
+        self.add_day(snapshot_date, read_columns(path, mapping), os.path.basename(path))
+        log(f"✅ {snapshot_date} rolled up from {os.path.basename(path)}")
+        return True
+
+    def _key_columns(self, level, keys):
+        if level == "dp":
+            info = [self.dp_info.get(key, ["", ""]) for key in keys]
+            return pd.DataFrame({'DPdeniro': keys, 'CFS Cluster': [i[0] for i in info],
+                                 'BRGY_NAME': [i[1] for i in info]})
+        if level == "barangay":
+            return pd.DataFrame({'CFS Cluster': [key[0] for key in keys], 'BRGY_NAME': [key[1] for key in keys]})
+        return pd.DataFrame({'CFS Cluster': keys})
+
+    def aggregate(self, level="cluster", freq="D"):
+        """Long table of S_SP, S_Total, utilization and growth per key and period.
+
+        freq is "D", "W" (weeks ending Sunday) or "M" (labelled by the first of
+        the month); a period takes the last
+        day reported in it. utilization is the share of ports in use
+        (1 - S_SP/S_Total); growth columns compare with the key's previous period.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level '{level}'. Use one of: {', '.join(LEVELS)}")
+        series = self.series[level]
+        frames = {}
+        for field in FIELDS:
+            wide = series.frame(field, self.dates).T
+            if freq != "D":
+                wide = wide.resample(FREQUENCIES[freq]).last()
+            frames[field] = wide
+
+        spare, total = frames["S_SP"], frames["S_Total"]
+        used = total - spare
+        utilization = (used / total.where(total > 0)).round(4)
+        result = pd.concat({
+            "S_SP": spare, "S_Total": total, "Used Ports": used, "DPs": frames["DPs"],
+            "Utilization": utilization,
+            "Used Ports Growth": used.diff(),
+            "Utilization Change": utilization.diff().round(4),
+        }, axis=1)
+        long = result.stack(level=1, future_stack=True).dropna(subset=["S_Total"])
+        long.index = long.index.set_names(["Period", "key"])
+        long = long.reset_index()
+        keys = self._key_columns(level, list(long["key"]))
+        out = pd.concat([long[["Period"]], keys, long.drop(columns=["Period", "key"])], axis=1)
+        if level == "dp":
+            out = out.drop(columns=["DPs"])
+        return out.sort_values(list(keys.columns) + ["Period"], ignore_index=True)
+
+    def fastest_filling(self, days=30, top=20):
+        """DPs whose used ports grew fastest over the last `days` days of reports.
+
+        Compares each DP's first and last report inside the window; Days To Full
+        extrapolates the current spare ports at that rate.
+        """
+        if not self.dates:
+            return pd.DataFrame()
+        dates = pd.DatetimeIndex(self.dates)
+        window = np.asarray(dates >= dates[-1] - pd.Timedelta(days=days))
+        series = self.series["dp"]
+        spare = series.trimmed()[FIELDS.index("S_SP")][:, window]
+        total = series.trimmed()[FIELDS.index("S_Total")][:, window]
+        day_numbers = ((dates[window] - dates[0]).days).to_numpy()
+
+        seen = ~np.isnan(total)
+        has_two = seen.sum(axis=1) >= 2
+        first = np.argmax(seen, axis=1)
+        last = seen.shape[1] - 1 - np.argmax(seen[:, ::-1], axis=1)
+        rows = np.arange(len(series.keys))
+        used_first = total[rows, first] - spare[rows, first]
+        used_last = total[rows, last] - spare[rows, last]
+        elapsed = (day_numbers[last] - day_numbers[first]).astype(np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_day = np.where(elapsed > 0, (used_last - used_first) / elapsed, np.nan)
+            days_to_full = np.where(per_day > 0, spare[rows, last] / per_day, np.nan)
+            utilization = 1 - spare[rows, last] / np.where(total[rows, last] > 0, total[rows, last], np.nan)
+
+        out = self._key_columns("dp", series.keys)
+        out["S_SP"] = spare[rows, last]
+        out["S_Total"] = total[rows, last]
+        out["Utilization"] = np.round(utilization, 4)
+        out["Used Ports Added"] = used_last - used_first
+        out["Used Ports Per Day"] = np.round(per_day, 3)
+        out["Days To Full"] = np.round(days_to_full, 1)
+        out["From"] = dates[window][first].strftime("%Y-%m-%d")
+        out["To"] = dates[window][last].strftime("%Y-%m-%d")
+        out = out[has_two & (per_day > 0)]
+        return out.sort_values(["Used Ports Per Day", "Utilization"], ascending=False).head(top).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilization trends over the dated daily reports.")
+    parser.add_argument("--state", help=f"rollup folder (default: {os.path.join(data_dir, ROLLUP_DIRNAME)})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="add dated reports, oldest first")
+    ingest.add_argument("files", nargs="*", help="report files or glob patterns")
+    ingest.add_argument("--from-store", action="store_true", help="add every newer date from the snapshot store")
+
+    export = commands.add_parser("export", help="write daily/weekly/monthly aggregates with growth")
+    export.add_argument("--level", default="cluster", choices=LEVELS)
+    export.add_argument("--freq", default="D", choices=sorted(FREQUENCIES))
+    export.add_argument("--output", required=True, help="output file (.xlsx, .csv or .parquet)")
+
+    fastest = commands.add_parser("fastest", help="rank the DPs filling up fastest")
+    fastest.add_argument("--days", type=int, default=30, help="window of recent days")
+    fastest.add_argument("--top", type=int, default=20)
+    fastest.add_argument("--output", help="also write the ranking to a file")
+    args = parser.parse_args()
+
+    rollup = UtilizationRollup(args.state)
+    if args.command == "ingest":
+        if args.from_store:
+            with SnapshotStore() as store:
+                for snapshot_date in store.dates():
+                    if not rollup.dates or snapshot_date > rollup.dates[-1]:
+                        rollup.add_day(snapshot_date, store.query(snapshot_date), "snapshot store")
+                        print(f"✅ {snapshot_date} rolled up from the snapshot store")
+        dated = []
+        for path in [path for pattern in args.files for path in (glob.glob(pattern) or [pattern])]:
+            snapshot_date = snapshot_date_from_filename(path)
+            if snapshot_date:
+                dated.append((snapshot_date, path))
+            else:
+                print(f"⚠️ Skipped {path}: no report date in the file name (e.g. 20250715)")
+        # Oldest first, whatever order the shell listed them in
+        for snapshot_date, path in sorted(dated):
+            rollup.ingest(path, snapshot_date)
+        rollup.save()
+    elif args.command == "export":
+        df = rollup.aggregate(args.level, args.freq)
+        write_report(df, args.output)
+        print(f"✅ {len(df)} rows saved to {args.output}")
+    else:
+        df = rollup.fastest_filling(args.days, args.top)
+        print(df.to_string(index=False))
+        if args.output:
+            write_report(df, args.output)
+
+
+if __name__ == "__main__":
+    main()
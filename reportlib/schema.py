@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from reportlib.config import data_dir
+from reportlib.formats import CSV_CHUNK_ROWS, detect_format, iter_report, read_report
+from reportlib.xlsx import read_header_row
+
+ALIASES_FILENAME = "column_aliases.json"
+MAPPINGS_FILENAME = "header_mappings.json"
+
+# Known renamed headers; column_aliases.json in the data folder extends this list
+DEFAULT_ALIASES = {
+    'DPdeniro': ['DP Deniro', 'DP_DENIRO', 'DP Name', 'DP/NAP Name'],
+    'S_SP': ['S SP', 'Spare Ports', 'Spare'],
+    'S_Total': ['S Total', 'Total Ports'],
+    'Com Date': ['COM_DATE', 'Commission Date', 'Commissioned Date'],
+    'DP/NAP LAT': ['DP NAP LAT', 'DP LAT', 'NAP LAT', 'Latitude'],
+    'DP/NAP LONG': ['DP NAP LONG', 'DP LONG', 'NAP LONG', 'Longitude'],
+    'BRGY_NAME': ['BRGY NAME', 'Barangay', 'Barangay Name'],
+    'CFS Cluster': ['CFS_CLUSTER', 'CFS CLUSTER NAME', 'Cluster'],
+    'Tech': ['Technology', 'TECH TYPE'],
+    'Location Type': ['LOCATION_TYPE', 'Loc Type'],
+}
+
+
+class SchemaError(ValueError):
+    """The report is missing required columns"""
+
+
+def header_key(name):
+    """Comparison key for headers: case, surrounding and repeated whitespace, underscores"""
+    return re.sub(r"[\s_]+", " ", str(name)).strip().lower()
+
+
+def load_aliases(state_dir=None):
+    """Built-in aliases merged with the operator-editable column_aliases.json"""
+    aliases = {column: list(names) for column, names in DEFAULT_ALIASES.items()}
+    path = os.path.join(state_dir or data_dir, ALIASES_FILENAME)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for column, names in json.load(f).items():
+                aliases.setdefault(column, [])
+                aliases[column] += [name for name in names if name not in aliases[column]]
+    return aliases
+
+
+def probe_header(path, fmt=None, sheet=0):
+    """Header names only, without loading the data rows"""
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    if str(path).lower().endswith(".xls"):
+        # Legacy binary workbooks can't be probed through the zip
+        return list(pd.read_excel(path, sheet_name=sheet, nrows=0).columns)
+    return [name for name in read_header_row(path, sheet) if name is not None]
+
+
+def resolve_columns(header, required, aliases=None):
+    """Map each required column to the header it appears under.
+
+    Returns (mapping, missing) where mapping is {required column: actual header}.
+    """
+    aliases = DEFAULT_ALIASES if aliases is None else aliases
+    by_key = {}
+    for name in header:
+        by_key.setdefault(header_key(name), name)
+    mapping = {}
+    missing = []
+    for column in required:
+        for candidate in [column] + aliases.get(column, []):
+            actual = by_key.get(header_key(candidate))
+            if actual is not None:
+                mapping[column] = actual
+                break
+        else:
+            missing.append(column)
+    return mapping, missing
+
+
+class HeaderResolver:
+    """Resolves required columns against a report's header, caching by header fingerprint"""
+
+    def __init__(self, state_dir=None, persist=True):
+        self.state_dir = state_dir or data_dir
+        # persist=False keeps new mappings in memory only (nothing is written to the data folder)
+        self.persist = persist
+        self.aliases = load_aliases(self.state_dir)
+        self.aliases_version = hashlib.sha256(
+            json.dumps(self.aliases, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(self.state_dir, MAPPINGS_FILENAME)
+        self.cache = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+
+    def fingerprint(self, header, required):
+        payload = json.dumps([[str(name) for name in header], list(required), self.aliases_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def resolve(self, header, required):
+        """(mapping, missing, cached) for this header"""
+        key = self.fingerprint(header, required)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry["mapping"], entry["missing"], True
+        mapping, missing = resolve_columns(header, required, self.aliases)
+        self.cache[key] = {"mapping": mapping, "missing": missing}
+        self.save()
+        return mapping, missing, False
+
+    def save(self):
+        if not self.persist:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = self.path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def similar_headers(header, column):
+    """Headers that look like a missing column, for error messages"""
+    key = header_key(column)
+    return [name for name in header if key in header_key(name) or header_key(name) in key]
+
+
+def probe_columns(path, required, fmt=None, strict=True, resolver=None, sheet=0):
+    """Probe the header and map required columns to it.
+
+    With strict=True a SchemaError is raised straight away when any column is
+    missing; otherwise the missing ones are just left out of the mapping.
+    Returns (mapping, missing, header).
+    """
+    header = probe_header(path, fmt, sheet)
+    resolver = resolver or HeaderResolver()
+    mapping, missing, _ = resolver.resolve(header, required)
+    if missing and strict:
+        raise missing_columns_error(header, missing, resolver)
+    return mapping, missing, header
+
+
+def missing_columns_error(header, missing, resolver):
+    hints = []
+    for column in missing:
+        similar = similar_headers(header, column)
+        hints.append(f"'{column}'" + (f" (similar: {similar})" if similar else ""))
+    return SchemaError(f"Missing required columns: {', '.join(hints)}. "
+                       f"Add the new header name to {os.path.join(resolver.state_dir, ALIASES_FILENAME)} "
+                       f"if it was renamed.")
+
+
+def select_columns(df, required, resolver=None):
+    """The required columns of an already loaded DataFrame, matched and renamed like read_columns"""
+    resolver = resolver or HeaderResolver()
+    header = list(df.columns)
+    mapping, missing, _ = resolver.resolve(header, required)
+    if missing:
+        raise missing_columns_error(header, missing, resolver)
+    return df[list(mapping.values())].set_axis(list(mapping), axis=1)
+
+
+def read_columns(path, mapping, fmt=None, sheet=0, engine=None):
+    """Read only the mapped columns and rename them to their canonical names"""
+    df = read_report(path, fmt, columns=list(mapping.values()), sheet_name=sheet, engine=engine)
+    # CSV headers come back stripped, so rename by both spellings
+    renames = {actual: column for column, actual in mapping.items()}
+    renames.update({str(actual).strip(): column for column, actual in mapping.items()})
+    df = df.rename(columns=renames)
+    return df[list(mapping)]
+
+
+def iter_columns(path, mapping, fmt=None, sheet=0, chunksize=CSV_CHUNK_ROWS):
+    """read_columns in batches, for reports too large to load at once"""
+    renames = {actual: column for column, actual in mapping.items()}
+    renames.update({str(actual).strip(): column for column, actual in mapping.items()})
+    for batch in iter_report(path, fmt, columns=list(mapping.values()), chunksize=chunksize, sheet_name=sheet):
+        yield batch.rename(columns=renames)[list(mapping)]
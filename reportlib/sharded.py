@@ -0,0 +1,320 @@
+"""Parallel reader for a single very large worksheet.
+
+The worksheet XML is decompressed once and cut into shards on </row>
+boundaries; each shard is parsed in its own process with iterparse and only
+the wanted columns are kept. Shared strings and cell styles are read once and
+handed to every worker when it starts, and the shards come back in order so
+the columns can simply be stitched together. Each column is then typed the way
+pandas.read_excel types it, so both engines give the same DataFrame.
+"""
+
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from xml.etree.ElementTree import iterparse, fromstring
+
+import numpy as np
+import pandas as pd
+
+from reportlib.xlsx import NS, read_header_row, read_shared_strings, sheet_paths
+
+# Uncompressed worksheet size above which the sharded reader is used by default
+SHARDED_MIN_BYTES = 64 * 1024 * 1024
+# Uncompressed XML per shard; big enough to keep per-task overhead negligible
+SHARD_BYTES = 16 * 1024 * 1024
+READ_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Built-in number formats that display dates/times
+DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+
+_SHEET_DATA = re.compile(rb"<(\w+:)?sheetData[\s>/]")
+_NAMESPACE_DECL = re.compile(rb"""xmlns(?::\w+)?=(?:"[^"]*"|'[^']*')""")
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+_DIGITS = "0123456789"
+# Text pandas.read_excel reads as missing, kept identical so both engines agree
+NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+# Text pandas.read_excel reads as booleans (in a column of only booleans and blanks)
+TRUE_STRINGS = frozenset(["True", "TRUE", "true"])
+FALSE_STRINGS = frozenset(["False", "FALSE", "false"])
+
+# Per-worker state, set once by _init_worker
+_shared_strings = []
+_date_styles = frozenset()
+_epoch = datetime(1899, 12, 30)
+
+
+def _is_date_format(code):
+    # Quoted text, escapes and [Red]/[$-409] sections don't count
+    code = _FORMAT_LITERALS.sub("", code).lower()
+    return any(char in code for char in "dmyhs")
+
+
+def read_date_styles(zf):
+    """Indices of the cell styles (s="..") whose number format is a date"""
+    if "xl/styles.xml" not in zf.namelist():
+        return frozenset()
+    styles = fromstring(zf.read("xl/styles.xml"))
+    custom = {int(fmt.get("numFmtId")): fmt.get("formatCode", "")
+              for fmt in styles.iter(f"{NS}numFmt")}
+    cell_xfs = styles.find(f"{NS}cellXfs")
+    dates = set()
+    for index, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+        fmt_id = int(xf.get("numFmtId", 0))
+        if fmt_id in DATE_FORMAT_IDS or (fmt_id in custom and _is_date_format(custom[fmt_id])):
+            dates.add(str(index))
+    return frozenset(dates)
+
+
+def read_epoch(zf):
+    """Day zero of the workbook's date system (1900 or 1904)"""
+    workbook = fromstring(zf.read("xl/workbook.xml"))
+    pr = workbook.find(f"{NS}workbookPr")
+    if pr is not None and pr.get("date1904") in ("1", "true"):
+        return datetime(1904, 1, 1)
+    return datetime(1899, 12, 30)
+
+
+def iter_shards(f, shard_bytes=SHARD_BYTES):
+    """Split a worksheet stream into standalone XML documents of whole rows.
+
+    Each shard is wrapped in a <sheetData> element that re-declares the
+    worksheet's namespaces, so prefixed attributes (x14ac:dyDescent) still parse.
+    """
+    buffer = b""
+    while True:
+        block = f.read(READ_BLOCK_BYTES)
+        if not block:
+            return
+        buffer += block
+        match = _SHEET_DATA.search(buffer)
+        if match:
+            break
+    prefix = (match.group(1) or b"")
+    namespaces = b" ".join(dict.fromkeys(_NAMESPACE_DECL.findall(buffer[:match.start()])))
+    opening = b"<" + prefix + b"sheetData " + namespaces + b">"
+    closing = b"</" + prefix + b"sheetData>"
+    row_end = b"</" + prefix + b"row>"
+    # Skip past the <sheetData ...> tag itself; an empty sheet writes <sheetData/>
+    start = buffer.index(b">", match.start()) + 1
+    if buffer[start - 2:start] == b"/>":
+        return
+    buffer = buffer[start:]
+
+    finished = False
+    while not finished:
+        if len(buffer) < shard_bytes:
+            block = f.read(READ_BLOCK_BYTES)
+            if block:
+                buffer += block
+                continue
+            finished = True
+        end = buffer.find(closing)
+        if end >= 0:
+            shard, buffer, finished = buffer[:end], b"", True
+        else:
+            cut = buffer.rfind(row_end)
+            if cut < 0:
+                if finished:
+                    raise ValueError("Worksheet XML ends inside a row")
+                block = f.read(READ_BLOCK_BYTES)
+                if not block:
+                    raise ValueError("Worksheet XML ends inside a row")
+                buffer += block
+                continue
+            cut += len(row_end)
+            shard, buffer = buffer[:cut], buffer[cut:]
+        if shard.strip():
+            yield opening + shard + closing
+
+
+def _init_worker(shared_strings, date_styles, epoch):
+    global _shared_strings, _date_styles, _epoch
+    _shared_strings = [None if text in NA_STRINGS else text for text in shared_strings]
+    _date_styles = date_styles
+    _epoch = epoch
+
+
+def _letters_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - 64)
+    return index - 1
+
+
+def parse_shard(data, columns, skip_rows=0):
+    """Worker entry point: {column index: [values]} for the wanted columns of one shard"""
+    wanted = set(columns)
+    values = {column: [] for column in columns}
+    row_tag, cell_tag, value_tag, text_tag = f"{NS}row", f"{NS}c", f"{NS}v", f"{NS}t"
+    letter_cache = {}
+    for event, elem in iterparse(BytesIO(data), events=("end",)):
+        if elem.tag != row_tag:
+            continue
+        if skip_rows:
+            skip_rows -= 1
+            elem.clear()
+            continue
+        row = {}
+        position = -1
+        for cell in elem.iter(cell_tag):
+            ref = cell.get("r")
+            if ref:
+                letters = ref.rstrip(_DIGITS)
+                position = letter_cache.get(letters)
+                if position is None:
+                    position = letter_cache[letters] = _letters_index(letters)
+            else:
+                position += 1
+            if position not in wanted:
+                continue
+            cell_type = cell.get("t")
+            if cell_type == "inlineStr":
+                text = "".join(t.text or "" for t in cell.iter(text_tag))
+                row[position] = None if text in NA_STRINGS else text
+                continue
+            value = cell.find(value_tag)
+            if value is None or value.text is None:
+                continue
+            text = value.text
+            if cell_type == "s":
+                row[position] = _shared_strings[int(text)]
+            elif cell_type in ("str", "e"):
+                row[position] = None if text in NA_STRINGS else text
+            elif cell_type == "b":
+                row[position] = text == "1"
+            elif cell.get("s") in _date_styles:
+                # Rounded to the millisecond like openpyxl, so 01:00 doesn't read as 00:59:59.999999
+                days, fraction = divmod(float(text), 1)
+                row[position] = _epoch + timedelta(days=days, milliseconds=round(fraction * 86400000))
+            else:
+                # Whole numbers as int, like openpyxl through pandas.read_excel (1.0 -> 1)
+                try:
+                    row[position] = int(text)
+                except ValueError:
+                    number = float(text)
+                    row[position] = int(number) if number.is_integer() else number
+        # Rows without any cells are dropped, as pandas does for blank lines
+        blank = not len(elem)
+        elem.clear()
+        if blank:
+            continue
+        for column in columns:
+            values[column].append(row.get(column))
+    return values
+
+
+def typed_column(values):
+    """A column of cell values typed as pandas.read_excel does.
+
+    Numbers first (booleans and numeric text count; a blank makes the column
+    float, so True/blank/False reads as 1.0/NaN/0.0), then booleans (text
+    like "TRUE" included; objects when there are blanks), else objects with
+    blanks as NaN. Datetime columns are left to the DataFrame.
+    """
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    if not len(array):
+        return array
+    try:
+        return pd.to_numeric(array)
+    except (ValueError, TypeError):
+        pass
+    blank = pd.isna(array)
+    array[blank] = np.nan
+    if all(isinstance(value, bool) or value in TRUE_STRINGS or value in FALSE_STRINGS
+           for value in pd.unique(array[~blank])):
+        flags = np.array([value is True or value in TRUE_STRINGS for value in array[~blank]], dtype=bool)
+        if not blank.any():
+            return flags
+        array[~blank] = flags
+    return array
+
+
+def _frame(header, wanted, values):
+    return pd.DataFrame({header[column]: typed_column(values[column]) for column in wanted})
+
+
+def _header_positions(path, sheet, columns):
+    """(header, positions of the wanted columns) for a usecols-style list of names, in sheet order like usecols"""
+    header = read_header_row(path, sheet)
+    names = {}
+    for index, name in enumerate(header):
+        if name is not None:
+            names.setdefault(name, index)
+    if columns is None:
+        return header, list(names.values())
+    unknown = [column for column in columns if column not in names]
+    if unknown:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {unknown}")
+    return header, sorted(names[column] for column in columns)
+
+
+def read_sheet_sharded(path, sheet=0, columns=None, max_workers=None, shard_bytes=SHARD_BYTES):
+    """Read one worksheet into a DataFrame, parsing row shards in parallel.
+
+    `columns` are header names to keep (all columns when None), matching the
+    usecols projection of read_report. Date-formatted cells come back as
+    datetimes, the same as pandas.read_excel.
+    """
+    header, wanted = _header_positions(path, sheet, columns)
+    with zipfile.ZipFile(path) as zf:
+        sheets = sheet_paths(zf)
+        sheet_path = sheets[sheet][1] if isinstance(sheet, int) else dict(sheets)[sheet]
+        # Step 1: Everything the workers share, read once
+        shared_strings = read_shared_strings(zf)
+        date_styles = read_date_styles(zf)
+        epoch = read_epoch(zf)
+
+        # Step 2: Parse the shards as they are cut, keeping only a few in flight
+        # so the decompressed XML never sits in memory all at once
+        workers = max_workers or os.cpu_count() or 1
+        merged = {column: [] for column in wanted}
+        pending = deque()
+
+        def collect():
+            # Step 3: Stitch the columns back together in shard order
+            for column, values in pending.popleft().result().items():
+                merged[column].extend(values)
+
+        with zf.open(sheet_path) as f, ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(shared_strings, date_styles, epoch)) as pool:
+            for i, shard in enumerate(iter_shards(f, shard_bytes)):
+                pending.append(pool.submit(parse_shard, shard, wanted, 1 if i == 0 else 0))
+                if len(pending) >= 2 * workers:
+                    collect()
+            while pending:
+                collect()
+
+    return _frame(header, wanted, merged)
+
+
+def iter_sheet_batches(path, sheet=0, columns=None, shard_bytes=SHARD_BYTES):
+    """Yield a worksheet as DataFrames of one shard each, parsed in this process.
+
+    Only one shard is decompressed and parsed at a time, so memory stays
+    bounded by the shard size however large the sheet is.
+    """
+    header, wanted = _header_positions(path, sheet, columns)
+    with zipfile.ZipFile(path) as zf:
+        sheets = sheet_paths(zf)
+        sheet_path = sheets[sheet][1] if isinstance(sheet, int) else dict(sheets)[sheet]
+        _init_worker(read_shared_strings(zf), read_date_styles(zf), read_epoch(zf))
+        with zf.open(sheet_path) as f:
+            for i, shard in enumerate(iter_shards(f, shard_bytes)):
+                yield _frame(header, wanted, parse_shard(shard, wanted, 1 if i == 0 else 0))
+
+
+def worksheet_size(path, sheet=0):
+    """Uncompressed size in bytes of a worksheet's XML"""
+    with zipfile.ZipFile(path) as zf:
+        sheets = sheet_paths(zf)
+        sheet_path = sheets[sheet][1] if isinstance(sheet, int) else dict(sheets)[sheet]
+        return zf.getinfo(sheet_path).file_size
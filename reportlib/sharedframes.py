@@ -0,0 +1,65 @@
+"""DataFrames handed from worker processes to the GUI through shared memory.
+
+A frame is written once as an Arrow IPC stream into a SharedMemory block and
+only its (name, size) travels over the job queue, instead of pickling the
+whole frame through a pipe. The receiver copies the stream out in one memcpy,
+frees the block and rebuilds the DataFrame. On Windows a block disappears as
+soon as no process has it open, so there the creator keeps it open until the
+receiver confirms the copy (release_shared).
+"""
+
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import pyarrow as pa
+
+from reportlib.formats import _parquet_safe
+
+# Longest wait for the receiver to confirm it has copied the blocks (Windows only)
+HOLD_SECONDS = 600
+
+# Blocks kept open for the receiver on Windows, by name
+_held = {}
+
+
+def frame_to_shared(df):
+    """Copy a DataFrame into a new shared-memory block; returns (block name, byte size)"""
+    table = pa.Table.from_pandas(_parquet_safe(df), preserve_index=False)
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    size = sink.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    # Both still reference block.buf, which must be released before the block can close
+    del writer, sink
+    if os.name == "nt":
+        _held[block.name] = block
+    else:
+        # The name outlives this handle until the receiver unlinks the block;
+        # don't let this process's tracker unlink it at exit
+        resource_tracker.unregister(block._name, "shared_memory")
+        block.close()
+    return block.name, size
+
+
+def release_shared(names):
+    """Close the blocks kept open for the receiver, once it has copied them"""
+    for name in names:
+        block = _held.pop(name, None)
+        if block is not None:
+            block.close()
+
+
+def frame_from_shared(name, size):
+    """Rebuild a DataFrame from a block made by frame_to_shared and free the block"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(block.buf[:size])
+    finally:
+        block.close()
+        block.unlink()
+    return pa.ipc.open_stream(data).read_all().to_pandas()
@@ -0,0 +1,68 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from reportlib.formats import detect_format
+from reportlib.schema import HeaderResolver, probe_columns, read_columns
+from reportlib.xlsx import read_header_row, sheet_paths
+
+# Added to the data when rows come from more than one sheet
+SOURCE_SHEET_COLUMN = "Source Sheet"
+
+
+def _is_zip_workbook(path):
+    return detect_format(path) == "xlsx" and not str(path).lower().endswith(".xls")
+
+
+def probe_sheets(path, required, resolver=None):
+    """[(sheet name, column mapping)] for every sheet whose header has all required columns.
+
+    CSV/Parquet inputs and .xls workbooks count as a single sheet. Raises
+    SchemaError (for the first sheet) when no sheet matches.
+    """
+    resolver = resolver or HeaderResolver()
+    if not _is_zip_workbook(path):
+        mapping, _, _ = probe_columns(path, required, resolver=resolver)
+        return [(0, mapping)]
+
+    with zipfile.ZipFile(path) as zf:
+        names = [name for name, _ in sheet_paths(zf)]
+    matches = []
+    for name in names:
+        header = [cell for cell in read_header_row(path, name) if cell is not None]
+        mapping, missing, _ = resolver.resolve(header, required)
+        if not missing:
+            matches.append((name, mapping))
+    if not matches:
+        # Re-probe the first sheet strictly so the error names the missing columns
+        probe_columns(path, required, resolver=resolver)
+    return matches
+
+
+def _read_sheet(path, sheet, mapping):
+    """Worker entry point: one sheet, projected and renamed"""
+    # Sheets are already read in parallel; don't start a second pool per sheet
+    return read_columns(path, mapping, sheet=sheet, engine="openpyxl")
+
+
+def read_sheets(path, sheets, max_workers=None):
+    """Read the probed sheets, in parallel when there are several, and stack them.
+
+    Columns are aligned by their canonical names; a SOURCE_SHEET_COLUMN is
+    added when more than one sheet contributes rows.
+    """
+    if len(sheets) == 1:
+        sheet, mapping = sheets[0]
+        return read_columns(path, mapping, sheet=sheet)
+
+    workers = min(len(sheets), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(_read_sheet, [path] * len(sheets),
+                               [sheet for sheet, _ in sheets], [mapping for _, mapping in sheets]))
+
+    columns = list(sheets[0][1])
+    for frame, (sheet, _) in zip(frames, sheets):
+        frame[SOURCE_SHEET_COLUMN] = sheet
+    return pd.concat(frames, ignore_index=True)[columns + [SOURCE_SHEET_COLUMN]]
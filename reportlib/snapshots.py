@@ -0,0 +1,282 @@
+"""Local SQLite store of dated report snapshots.
+
+Each report is parsed once by `ingest` and kept with its snapshot date (taken
+from the filename, e.g. "DVN DP Util 20250715.xlsx"). Cluster, barangay, tech
+and location type are stored as integer codes into small label tables, and the
+rows are indexed by DP and by (snapshot, cluster/barangay/tech), so pulling one
+date's filtered rows is an indexed query instead of an Excel parse:
+
+    python -m reportlib.snapshots ingest "Files/*.xlsx"
+    python -m reportlib.snapshots list
+    python -m reportlib.snapshots export --date 2025-07-15 --cluster "TAGUM 1" --output tagum1.xlsx
+"""
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from reportlib.config import columns_to_extract, data_dir
+from reportlib.formats import write_report
+from reportlib.hashing import file_digest
+from reportlib.schema import iter_columns
+from reportlib.sheets import probe_sheets
+
+STORE_FILENAME = "snapshots.sqlite"
+# Sources written as "snapshot:2025-07-15" (or "snapshot:latest") are read from the store
+SNAPSHOT_PREFIX = "snapshot:"
+
+# Report column -> (store column, SQLite type); label columns hold codes into their own table
+VALUE_COLUMNS = {
+    'DPdeniro': ('dp', 'TEXT'),
+    'S_SP': ('s_sp', 'INTEGER'),
+    'S_Total': ('s_total', 'INTEGER'),
+    'Com Date': ('com_date', 'TEXT'),
+    'DP/NAP LAT': ('lat', 'REAL'),
+    'DP/NAP LONG': ('long', 'REAL'),
+}
+LABEL_COLUMNS = {
+    'BRGY_NAME': ('brgy_id', 'barangays'),
+    'CFS Cluster': ('cluster_id', 'clusters'),
+    'Tech': ('tech_id', 'techs'),
+    'Location Type': ('location_type_id', 'location_types'),
+}
+# Label columns with a (snapshot, code) index; DPdeniro has its own (dp, snapshot) index
+INDEXED_LABELS = ['CFS Cluster', 'BRGY_NAME', 'Tech']
+
+_FILENAME_DATE = re.compile(r"(20\d{2})[-_.]?(\d{2})[-_.]?(\d{2})(?!\d)")
+
+
+def snapshot_date_from_filename(path):
+    """ISO date ("2025-07-15") from a name like "DVN DP Util 20250715.xlsx", or None"""
+    for match in _FILENAME_DATE.finditer(os.path.basename(str(path))):
+        try:
+            return datetime(*map(int, match.groups())).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def is_snapshot_source(source):
+    return isinstance(source, str) and source.startswith(SNAPSHOT_PREFIX)
+
+
+def _store_value(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if hasattr(value, "item"):
+        # numpy scalars -> Python numbers
+        return value.item()
+    return value
+
+
+class SnapshotStore:
+    """Dated report snapshots in one SQLite file (snapshots.sqlite in the data folder by default)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir, STORE_FILENAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.labels = {}
+        self.create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def create_schema(self):
+        value_columns = ", ".join(f"{name} {kind}" for name, kind in VALUE_COLUMNS.values())
+        label_columns = ", ".join(f"{name} INTEGER" for name, _ in LABEL_COLUMNS.values())
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY, snapshot_date TEXT UNIQUE NOT NULL, source TEXT,
+                digest TEXT, rows INTEGER, ingested_at TEXT)""")
+            for _, table in LABEL_COLUMNS.values():
+                self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                                  f"(id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS dp_rows "
+                              f"(snapshot_id INTEGER NOT NULL, {value_columns}, {label_columns})")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS dp_rows_dp ON dp_rows (dp, snapshot_id)")
+            for column in INDEXED_LABELS:
+                store_column = LABEL_COLUMNS[column][0]
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS dp_rows_{store_column} "
+                                  f"ON dp_rows (snapshot_id, {store_column})")
+
+    def label_ids(self, table):
+        """{name: id} for a label table, cached"""
+        if table not in self.labels:
+            self.labels[table] = dict(self.conn.execute(f"SELECT name, id FROM {table}").fetchall())
+        return self.labels[table]
+
+    def encode(self, table, values):
+        """Integer codes for a column of labels, adding names not seen before"""
+        ids = self.label_ids(table)
+        for name in values.dropna().astype(str).unique():
+            if name not in ids:
+                ids[name] = self.conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+        return values.map(lambda value: None if pd.isna(value) else ids[str(value)])
+
+    def snapshots(self):
+        """DataFrame of stored snapshots, oldest first"""
+        return pd.read_sql_query("SELECT snapshot_date, rows, source, digest, ingested_at "
+                                 "FROM snapshots ORDER BY snapshot_date", self.conn)
+
+    def dates(self):
+        return [row[0] for row in self.conn.execute("SELECT snapshot_date FROM snapshots ORDER BY snapshot_date")]
+
+    def snapshot_id(self, snapshot_date=None):
+        """Id of a snapshot by ISO date; the latest one when no date (or "latest") is given"""
+        if snapshot_date in (None, "latest"):
+            row = self.conn.execute("SELECT id FROM snapshots ORDER BY snapshot_date DESC LIMIT 1").fetchone()
+        else:
+            row = self.conn.execute("SELECT id FROM snapshots WHERE snapshot_date = ?", (snapshot_date,)).fetchone()
+        if row is None:
+            raise KeyError(f"No snapshot for {snapshot_date or 'any date'} in {self.path}")
+        return row[0]
+
+    def ingest(self, path, snapshot_date=None, replace=False, log=print):
+        """Load a report into the store once; returns the number of rows stored.
+
+        Re-ingesting the same file is a no-op. A different file for a date that
+        is already stored raises ValueError unless replace=True.
+        """
+        snapshot_date = snapshot_date or snapshot_date_from_filename(path)
+        if not snapshot_date:
+            raise ValueError(f"Can't tell the snapshot date of '{path}'; pass it explicitly")
+        digest = file_digest(path)
+        existing = self.conn.execute("SELECT id, digest, rows FROM snapshots WHERE snapshot_date = ?",
+                                     (snapshot_date,)).fetchone()
+        if existing and existing[1] == digest:
+            log(f"⏭️ {snapshot_date} already stored from this file ({existing[2]} rows)")
+            return existing[2]
+        if existing and not replace:
+            raise ValueError(f"A different report is already stored for {snapshot_date}; use replace=True")
+
+        start = time.perf_counter()
+        try:
+            rows = self._insert_snapshot(path, snapshot_date, digest, existing)
+        except Exception:
+            # Label ids added inside the rolled-back transaction are gone too
+            self.labels = {}
+            raise
+        log(f"✅ {snapshot_date}: {rows} rows from {os.path.basename(path)} in {time.perf_counter() - start:.1f}s")
+        return rows
+
+    def _insert_snapshot(self, path, snapshot_date, digest, existing):
+        store_columns = [name for name, _ in VALUE_COLUMNS.values()] + [name for name, _ in LABEL_COLUMNS.values()]
+        insert = (f"INSERT INTO dp_rows (snapshot_id, {', '.join(store_columns)}) "
+                  f"VALUES ({', '.join('?' * (len(store_columns) + 1))})")
+        rows = 0
+        with self.conn:
+            if existing:
+                self.conn.execute("DELETE FROM dp_rows WHERE snapshot_id = ?", (existing[0],))
+                self.conn.execute("DELETE FROM snapshots WHERE id = ?", (existing[0],))
+            snapshot_id = self.conn.execute(
+                "INSERT INTO snapshots (snapshot_date, source, digest, rows, ingested_at) VALUES (?, ?, ?, 0, ?)",
+                (snapshot_date, os.path.basename(path), digest, time.strftime("%Y-%m-%d %H:%M:%S"))).lastrowid
+            # Stream the report so large files never load whole
+            for sheet, mapping in probe_sheets(path, columns_to_extract):
+                for batch in iter_columns(path, mapping, sheet=sheet):
+                    columns = [batch[column].map(_store_value) for column in VALUE_COLUMNS]
+                    columns += [self.encode(table, batch[column]) for column, (_, table) in LABEL_COLUMNS.items()]
+                    self.conn.executemany(insert, ((snapshot_id, *values) for values in zip(*columns)))
+                    rows += len(batch)
+            self.conn.execute("UPDATE snapshots SET rows = ? WHERE id = ?", (rows, snapshot_id))
+        return rows
+
+    def query(self, snapshot_date=None, clusters=None, barangays=None, techs=None, location_types=None):
+        """One snapshot's rows under the report's column names, filtered through the indexes.
+
+        Each filter is a list of names (None means no filter).
+        """
+        where = ["r.snapshot_id = ?"]
+        params = [self.snapshot_id(snapshot_date)]
+        filters = {'CFS Cluster': clusters, 'BRGY_NAME': barangays, 'Tech': techs, 'Location Type': location_types}
+        for column, names in filters.items():
+            if names is None:
+                continue
+            store_column, table = LABEL_COLUMNS[column]
+            ids = [self.label_ids(table)[name] for name in names if name in self.label_ids(table)]
+            where.append(f"r.{store_column} IN ({', '.join('?' * len(ids))})" if ids else "0")
+            params += ids
+        return self._select(" AND ".join(where), params)
+
+    def dp_history(self, dp):
+        """Every stored row of one DP, with its snapshot date, oldest first"""
+        return self._select("r.dp = ?", [str(dp)], with_date=True)
+
+    def _select(self, where, params, with_date=False):
+        fields = [f'r.{name} AS "{column}"' for column, (name, _) in VALUE_COLUMNS.items()]
+        joins = []
+        for i, (column, (name, table)) in enumerate(LABEL_COLUMNS.items()):
+            fields.append(f'l{i}.name AS "{column}"')
+            joins.append(f"LEFT JOIN {table} l{i} ON l{i}.id = r.{name}")
+        if with_date:
+            fields.insert(0, 's.snapshot_date AS "Snapshot Date"')
+            joins.append("JOIN snapshots s ON s.id = r.snapshot_id")
+        sql = f"SELECT {', '.join(fields)} FROM dp_rows r {' '.join(joins)} WHERE {where}"
+        if with_date:
+            sql += " ORDER BY s.snapshot_date"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        df['Com Date'] = pd.to_datetime(df['Com Date'], errors="coerce")
+        return df[(['Snapshot Date'] if with_date else []) + columns_to_extract]
+
+
+def read_snapshot_source(source, clusters=None, store=None):
+    """DataFrame for a "snapshot:<date>" source, optionally limited to some clusters"""
+    snapshot_date = source[len(SNAPSHOT_PREFIX):] or None
+    if store is not None:
+        return store.query(snapshot_date, clusters=clusters)
+    with SnapshotStore() as store:
+        return store.query(snapshot_date, clusters=clusters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store dated utilization reports in a local SQLite file.")
+    parser.add_argument("--store", help=f"SQLite file (default: {os.path.join(data_dir, STORE_FILENAME)})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="load report files into the store")
+    ingest.add_argument("files", nargs="+", help="report files or glob patterns")
+    ingest.add_argument("--date", help="snapshot date (YYYY-MM-DD) when the filename has none")
+    ingest.add_argument("--replace", action="store_true", help="replace a different report stored for the same date")
+
+    commands.add_parser("list", help="show the stored snapshots")
+
+    export = commands.add_parser("export", help="write one snapshot's filtered rows to a file")
+    export.add_argument("--date", default="latest", help="snapshot date (default: latest)")
+    export.add_argument("--cluster", action="append", help="CFS Cluster to keep (repeatable)")
+    export.add_argument("--brgy", action="append", help="BRGY_NAME to keep (repeatable)")
+    export.add_argument("--tech", action="append", help="Tech to keep (repeatable)")
+    export.add_argument("--output", required=True, help="output file (.xlsx, .csv or .parquet)")
+    args = parser.parse_args()
+
+    with SnapshotStore(args.store) as store:
+        if args.command == "ingest":
+            paths = [path for pattern in args.files for path in (sorted(glob.glob(pattern)) or [pattern])]
+            for path in paths:
+                store.ingest(path, args.date, args.replace)
+        elif args.command == "list":
+            print(store.snapshots().to_string(index=False))
+        else:
+            df = store.query(args.date, clusters=args.cluster, barangays=args.brgy, techs=args.tech)
+            write_report(df, args.output)
+            print(f"✅ {len(df)} rows saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Memory-budgeted partitioning for reports too large to load at once.
+
+Filtered batches are buffered per output partition; when the buffers pass the
+memory limit the largest ones are written to temporary Parquet files. The
+outputs are then written from the spill files plus whatever is still buffered,
+one batch at a time.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from reportlib.formats import _parquet_safe, write_batches
+
+# Default budget for buffered rows in low-memory mode
+DEFAULT_MEMORY_LIMIT_MB = 512
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class SpillPartitioner:
+    """Buffers rows per partition key and spills to disk above memory_limit_mb"""
+
+    def __init__(self, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, spill_root=None):
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.spill_dir = tempfile.mkdtemp(prefix="report_spill_", dir=spill_root)
+        self.keys = []
+        self.buffers = {}
+        self.buffered = {}
+        self.spills = {}
+        self.rows = {}
+        self.columns = {}
+        self.spill_count = 0
+        self.spilled_bytes = 0
+        self.peak_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    @property
+    def buffered_bytes(self):
+        return sum(self.buffered.values())
+
+    def add(self, key, df):
+        """Append a batch to a partition (empty batches still register the key and columns)"""
+        if key not in self.buffers:
+            self.keys.append(key)
+            self.buffers[key], self.buffered[key], self.spills[key], self.rows[key] = [], 0, [], 0
+            self.columns[key] = list(df.columns)
+        if df.empty:
+            return
+        self.buffers[key].append(df)
+        self.buffered[key] += frame_bytes(df)
+        self.rows[key] += len(df)
+        self.peak_bytes = max(self.peak_bytes, self.buffered_bytes)
+        if self.buffered_bytes > self.memory_limit:
+            # Spill the biggest buffers until half the budget is free again
+            for key in sorted(self.buffered, key=self.buffered.get, reverse=True):
+                if self.buffered_bytes <= self.memory_limit // 2:
+                    break
+                self.spill(key)
+
+    def spill(self, key):
+        """Write a partition's buffered rows to a temporary Parquet file"""
+        if not self.buffers[key]:
+            return
+        path = os.path.join(self.spill_dir, f"{self.keys.index(key):04d}-{len(self.spills[key]):05d}.parquet")
+        _parquet_safe(pd.concat(self.buffers[key], ignore_index=True)).to_parquet(
+            path, index=False, engine="pyarrow")
+        self.spills[key].append(path)
+        self.spill_count += 1
+        self.spilled_bytes += os.path.getsize(path)
+        self.buffers[key] = []
+        self.buffered[key] = 0
+
+    def iter_batches(self, key):
+        """A partition's rows in arrival order: spilled files first, then the buffer"""
+        yielded = False
+        for path in self.spills[key]:
+            yielded = True
+            yield pd.read_parquet(path)
+        for df in self.buffers[key]:
+            yielded = True
+            yield df
+        if not yielded:
+            yield pd.DataFrame(columns=self.columns[key])
+
+    def write(self, key, path, fmt=None):
+        """Write one partition to an output file; returns its row count"""
+        return write_batches(self.iter_batches(key), path, fmt)
+
+    def cleanup(self):
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+def iter_row_chunks(batches, rows):
+    """Re-cut a stream of batches into DataFrames of exactly `rows` rows (the last may be shorter)"""
+    pending = []
+    count = 0
+    for batch in batches:
+        while len(batch):
+            take = batch.iloc[:rows - count]
+            pending.append(take)
+            count += len(take)
+            batch = batch.iloc[len(take):]
+            if count == rows:
+                yield pd.concat(pending, ignore_index=True)
+                pending, count = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
@@ -0,0 +1,86 @@
+"""Most and least utilized DPs per group, in one pass with bounded heaps.
+
+Utilization is ranked on the spare ratio S_SP / S_Total: the lowest ratios are
+the most saturated DPs, the highest the emptiest. Every group keeps two heaps
+of at most k entries, so memory stays O(k) per group however many rows stream
+through; each batch is first cut down to its own top k per group with one
+vectorized sort, so the heaps only ever see a handful of candidates.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 20
+# Kept for each ranked DP (when present in the report)
+RECORD_COLUMNS = ['DPdeniro', 'S_SP', 'S_Total', 'BRGY_NAME', 'CFS Cluster', 'Tech', 'Location Type',
+                  'DP/NAP LAT', 'DP/NAP LONG']
+MOST_UTILIZED = "Most utilized"
+LEAST_UTILIZED = "Least utilized"
+
+
+class GroupTopK:
+    """k most saturated and k emptiest DPs for every group of every level"""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.columns = None
+        # (level, group) -> heap; "saturated" holds (-ratio, -seq, record), "emptiest" (ratio, -seq, record)
+        self.saturated = {}
+        self.emptiest = {}
+        self.seen = 0
+
+    def add(self, df, levels):
+        """Feed one batch; levels maps a level name to a per-row group label array (None: skip the row)"""
+        if self.columns is None:
+            self.columns = [column for column in RECORD_COLUMNS if column in df.columns]
+        spare = pd.to_numeric(df['S_SP'], errors="coerce").to_numpy(dtype=float)
+        total = pd.to_numeric(df['S_Total'], errors="coerce").to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(total > 0, spare / total, np.nan)
+        rankable = ~np.isnan(ratio)
+        for level, labels in levels.items():
+            labels = pd.Series(labels, copy=False)
+            rows = np.flatnonzero(rankable & labels.notna().to_numpy())
+            if len(rows):
+                self._add_level(df, level, labels.to_numpy()[rows], ratio[rows], rows)
+        self.seen += len(df)
+
+    def _add_level(self, df, level, groups, ratios, rows):
+        candidates = pd.DataFrame({"group": groups, "ratio": ratios, "row": rows})
+        # Each batch's own top k per group (ties go to the earlier row)
+        lowest = candidates.sort_values(["group", "ratio", "row"], kind="stable").groupby("group").head(self.k)
+        highest = candidates.sort_values(["group", "ratio", "row"], ascending=[True, False, True],
+                                         kind="stable").groupby("group").head(self.k)
+        wanted = np.union1d(lowest["row"].to_numpy(), highest["row"].to_numpy())
+        records = dict(zip(wanted, df[self.columns].iloc[wanted].itertuples(index=False, name=None)))
+
+        for group, ratio, row in lowest.itertuples(index=False, name=None):
+            heap = self.saturated.setdefault((level, group), [])
+            entry = (-ratio, -(self.seen + row), records[row])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            else:
+                # Drops the worst of the k + 1 (highest ratio, then latest row)
+                heapq.heappushpop(heap, entry)
+        for group, ratio, row in highest.itertuples(index=False, name=None):
+            heap = self.emptiest.setdefault((level, group), [])
+            entry = (ratio, -(self.seen + row), records[row])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+
+    def result(self):
+        """One row per ranked DP: level, group, ranking, rank, ratio, utilization %, DP columns"""
+        rows = []
+        for (level, group) in sorted(set(self.saturated) | set(self.emptiest), key=lambda key: (key[0], str(key[1]))):
+            saturated = sorted(self.saturated.get((level, group), []), reverse=True)
+            emptiest = sorted(self.emptiest.get((level, group), []), key=lambda entry: (-entry[0], -entry[1]))
+            for ranking, entries, sign in ((MOST_UTILIZED, saturated, -1), (LEAST_UTILIZED, emptiest, 1)):
+                for rank, (ratio, _, record) in enumerate(entries, start=1):
+                    ratio *= sign
+                    rows.append((level, group, ranking, rank, ratio, round((1 - ratio) * 100, 1)) + record)
+        columns = ['Level', 'Group', 'Ranking', 'Rank', 'Spare Ratio', 'Utilization %'] + (self.columns or [])
+        return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,224 @@
+"""Data-quality checks over a utilization report, vectorized column by column.
+
+Each rule is a column expression that flags the rows breaking it. All enabled
+rules run in one pass over the extracted frame: the numeric columns are parsed
+once and shared, and text checks are decided once per distinct value
+(factorized) rather than once per row. The result is a count per rule and the
+rejected rows, each tagged with the rules it broke. Batches can be fed one
+after another (duplicates are tracked across them).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from reportlib.config import coordinate_bounds, known_clusters, validation_rules
+from reportlib.formats import write_report
+
+VIOLATIONS_COLUMN = "Violations"
+# DPdeniro values kept per rule as examples in the summary
+EXAMPLES = 5
+
+
+class _Columns:
+    """One batch's columns, each parsed at most once for all rules"""
+
+    def __init__(self, df, validator):
+        self.df = df
+        self.validator = validator
+        self.parsed = {}
+
+    def number(self, column):
+        """Float array (NaN for blank or non-numeric cells)"""
+        key = ("number", column)
+        if key not in self.parsed:
+            self.parsed[key] = pd.to_numeric(self.df[column], errors="coerce").to_numpy(dtype=float)
+        return self.parsed[key]
+
+    def labels(self, column):
+        """(codes, stripped upper-case distinct values); code -1 is a blank cell"""
+        key = ("labels", column)
+        if key not in self.parsed:
+            codes, uniques = pd.factorize(self.df[column])
+            self.parsed[key] = (codes, np.array([str(value).strip().upper() for value in uniques], dtype=object))
+        return self.parsed[key]
+
+    def blank(self, column):
+        codes, uniques = self.labels(column)
+        return (codes < 0) | (uniques == "")[codes] if len(uniques) else codes < 0
+
+    def within(self, values, bounds):
+        low, high = bounds
+        return (values >= low) & (values <= high)
+
+
+def _missing_coordinates(columns):
+    return np.isnan(columns.number('DP/NAP LAT')) | np.isnan(columns.number('DP/NAP LONG'))
+
+
+def _zero_coordinates(columns):
+    return (columns.number('DP/NAP LAT') == 0) | (columns.number('DP/NAP LONG') == 0)
+
+
+def _swapped_coordinates(columns):
+    lat, long = columns.number('DP/NAP LAT'), columns.number('DP/NAP LONG')
+    bounds = columns.validator.bounds
+    return columns.within(lat, bounds["long"]) & columns.within(long, bounds["lat"])
+
+
+def _coordinates_out_of_range(columns):
+    lat, long = columns.number('DP/NAP LAT'), columns.number('DP/NAP LONG')
+    bounds = columns.validator.bounds
+    inside = columns.within(lat, bounds["lat"]) & columns.within(long, bounds["long"])
+    # Missing, zero and swapped pairs have their own rules
+    explained = _missing_coordinates(columns) | _zero_coordinates(columns) | _swapped_coordinates(columns)
+    return ~inside & ~explained
+
+
+def _invalid_ports(columns):
+    spare, total = columns.number('S_SP'), columns.number('S_Total')
+    return np.isnan(spare) | np.isnan(total) | (spare < 0) | (total < 0)
+
+
+def _spare_exceeds_total(columns):
+    return columns.number('S_SP') > columns.number('S_Total')
+
+
+def _duplicate_dp(columns):
+    """DPdeniro already seen on an earlier row (of this or an earlier batch); blanks aren't compared"""
+    validator = columns.validator
+    codes, uniques = columns.labels('DPdeniro')
+    rows = np.flatnonzero(~columns.blank('DPdeniro'))
+    # Values differing only in case or padding are the same DP
+    keys, distinct = pd.factorize(uniques)
+    row_keys = keys[codes[rows]]
+    repeated = np.zeros(len(codes), dtype=bool)
+    repeated[rows] = pd.Series(row_keys).duplicated().to_numpy()
+    hashes = pd.util.hash_array(distinct.astype(object))
+    if len(validator.seen_dps):
+        seen = np.isin(hashes, validator.seen_dps)
+        repeated[rows] |= seen[row_keys]
+        hashes = hashes[~seen]
+    validator.seen_dps = np.sort(np.concatenate([validator.seen_dps, hashes]))
+    return repeated
+
+
+def _blank_tech(columns):
+    return columns.blank('Tech')
+
+
+def _unknown_cluster(columns):
+    codes, uniques = columns.labels('CFS Cluster')
+    known = np.isin(uniques, columns.validator.known_clusters)
+    return (codes < 0) | ~known[codes] if len(uniques) else codes < 0
+
+
+# name -> (description, check returning a bool array of offending rows)
+RULES = {
+    "missing_coordinates": ("Blank or non-numeric DP/NAP LAT or LONG", _missing_coordinates),
+    "zero_coordinates": ("DP/NAP LAT or LONG is 0", _zero_coordinates),
+    "swapped_coordinates": ("DP/NAP LAT and LONG look swapped", _swapped_coordinates),
+    "coordinates_out_of_range": ("Coordinates outside the service area", _coordinates_out_of_range),
+    "invalid_ports": ("Blank, non-numeric or negative S_SP or S_Total", _invalid_ports),
+    "spare_exceeds_total": ("S_SP greater than S_Total", _spare_exceeds_total),
+    "duplicate_dp": ("DPdeniro repeats an earlier row", _duplicate_dp),
+    "blank_tech": ("Blank Tech", _blank_tech),
+    "unknown_cluster": ("Blank or unknown CFS Cluster", _unknown_cluster),
+}
+
+
+class ReportValidator:
+    """Runs the enabled rules over a report (or its batches) and keeps per-rule counts"""
+
+    def __init__(self, rules=None, bounds=None, clusters=None):
+        self.rules = list(validation_rules if rules is None else rules)
+        unknown = [rule for rule in self.rules if rule not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown validation rules: {unknown} (known: {list(RULES)})")
+        self.bounds = bounds or coordinate_bounds
+        self.known_clusters = np.array([name.strip().upper() for name in (clusters or known_clusters)],
+                                       dtype=object)
+        self.counts = dict.fromkeys(self.rules, 0)
+        self.examples = {rule: [] for rule in self.rules}
+        self.seen_dps = np.empty(0, dtype=np.uint64)
+        self.rows = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def check(self, df):
+        """Rows x rules matrix of violations for the next batch"""
+        start = time.perf_counter()
+        columns = _Columns(df, self)
+        flags = np.zeros((len(df), len(self.rules)), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            flags[:, i] = RULES[rule][1](columns)
+        dps = df['DPdeniro'].to_numpy()
+        for i, rule in enumerate(self.rules):
+            offending = np.flatnonzero(flags[:, i])
+            self.counts[rule] += len(offending)
+            wanted = EXAMPLES - len(self.examples[rule])
+            if wanted > 0:
+                self.examples[rule].extend(str(dp) for dp in dps[offending[:wanted]])
+        self.rows += len(df)
+        self.seconds += time.perf_counter() - start
+        return flags
+
+    def rejects(self, df, flags=None):
+        """The rows breaking any rule, with a Violations column naming the rules they broke"""
+        if flags is None:
+            flags = self.check(df)
+        start = time.perf_counter()
+        bad = np.flatnonzero(flags.any(axis=1))
+        # Name each distinct combination of rules once
+        patterns = flags[bad] @ (1 << np.arange(len(self.rules), dtype=np.int64))
+        combos, inverse = np.unique(patterns, return_inverse=True)
+        names = np.array([", ".join(rule for i, rule in enumerate(self.rules) if combo >> i & 1)
+                          for combo in combos], dtype=object)
+        result = df.take(bad)
+        result.index = pd.RangeIndex(len(result))
+        result[VIOLATIONS_COLUMN] = names[inverse.reshape(-1)]
+        self.rejected += len(bad)
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def summary(self):
+        """One row per rule: description, violations, share of rows and example DPs"""
+        rows = [(rule, RULES[rule][0], self.counts[rule],
+                 round(self.counts[rule] / self.rows * 100, 2) if self.rows else 0.0,
+                 ", ".join(self.examples[rule]))
+                for rule in self.rules]
+        return pd.DataFrame(rows, columns=['Rule', 'Description', 'Violations', '% of Rows', 'Example DPs'])
+
+    def report(self):
+        """Log lines: one per rule with violations, then the totals"""
+        lines = [f"Validation {rule}: {self.counts[rule]:,} rows ({RULES[rule][0]}), "
+                 f"e.g. {', '.join(self.examples[rule])}"
+                 for rule in self.rules if self.counts[rule]]
+        lines.append(f"Validated {self.rows:,} rows against {len(self.rules)} rules in {self.seconds:.2f}s: "
+                     f"{self.rejected:,} rejected")
+        return lines
+
+
+def main():
+    from reportlib.query import load_report
+
+    parser = argparse.ArgumentParser(description="Check a report against the data-quality rules")
+    parser.add_argument("report", help="report file (.xlsx, .csv, .parquet) or snapshot:<date>")
+    parser.add_argument("--rejects", help="write the rejected rows (with their violations) to this file")
+    parser.add_argument("--rules", nargs="+", choices=list(RULES), help="rules to run (default: all enabled)")
+    args = parser.parse_args()
+
+    df = load_report(args.report)
+    validator = ReportValidator(args.rules)
+    rejects = validator.rejects(df)
+    print(validator.summary().to_string(index=False))
+    print(f"🔎 {len(rejects):,} of {len(df):,} rows break at least one rule ({validator.seconds:.2f}s)")
+    if args.rejects:
+        write_report(rejects, args.rejects)
+        print(f"✅ Rejects saved to {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Work-order columns from call-validation dumps, indexed by appointment date.
+
+Each dump is streamed once with only the work-order columns projected, sorted
+on its parsed appointmentdate and kept as Parquet under
+~/ExcelProcessorData/workorder_index, keyed by the dump's content. The cells
+themselves are kept as written (columns mixing dates, numbers and text are
+stored pickled, cell by cell); dates that can't be read are reported, sort
+last and only match when no date window is given. Date-window and team
+filters then read only those files: row groups outside the window are
+skipped by their min/max statistics (tight, since the rows are sorted), so a
+dump is never parsed twice. Dumps not indexed yet are indexed in parallel,
+one per worker.
+
+    python -m reportlib.workorders "Files/workorders_*.xlsx" --from 2025-07-01 --to 2025-07-15 --team "TEAM A"
+"""
+
+import argparse
+import functools
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from reportlib.batch import expand_inputs, iter_batch, report_timing
+from reportlib.config import data_dir
+from reportlib.formats import iter_report, write_report
+from reportlib.hashing import bytes_digest, file_digest
+from reportlib.schema import probe_header
+
+INDEX_DIRNAME = "workorder_index"
+WORKORDER_COLUMNS = [
+    'workordernumber', 'customername', 'customercontact', 'customeraddress',
+    'appointmentdate', 'team', 'delayreason', 'facilityname'
+]
+DATE_COLUMN = 'appointmentdate'
+TEAM_COLUMN = 'team'
+# appointmentdate as a timestamp, stored next to the original cells for sorting and date windows
+PARSED_DATE_COLUMN = '_appointment_at'
+# Row number in the dump, to give rows back in report order
+ROW_COLUMN = '_row'
+# Unreadable appointmentdate values kept per dump for the warning
+EXAMPLES = 5
+# Small row groups so a date window skips most of a big dump
+INDEX_ROW_GROUP_ROWS = 10_000
+
+
+def index_root(root=None):
+    return root or os.path.join(data_dir, INDEX_DIRNAME)
+
+
+def workorder_columns(path):
+    """({column: header as written in the dump}, missing columns); headers match after stripping"""
+    header = {}
+    for name in probe_header(path):
+        header.setdefault(str(name).strip(), name)
+    mapping = {column: header[column] for column in WORKORDER_COLUMNS if column in header}
+    return mapping, [column for column in WORKORDER_COLUMNS if column not in mapping]
+
+
+def parse_dates(values):
+    """(timestamps, unreadable) for a column of dates as written: datetimes or text in any common layout.
+
+    Each distinct value is parsed once. Numbers and unreadable text give NaT
+    and are flagged in unreadable; blank cells give NaT without a flag.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques.mask(uniques.map(pd.api.types.is_number)), format="mixed", errors="coerce")
+    # Code -1 (a blank cell) picks the NaT appended at the end
+    timestamps = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))[codes]
+    blank = np.append((uniques.astype(str).str.strip() == "").to_numpy(), True)[codes]
+    return timestamps, np.isnat(timestamps) & ~blank
+
+
+def iter_workorders(path, mapping):
+    """The dump's work-order columns in batches, missing ones blank, with the parsed appointmentdate
+    and the row number added"""
+    rename = {actual: column for column, actual in mapping.items()}
+    seen = 0
+    for batch in iter_report(path, columns=list(mapping.values())):
+        batch = batch.rename(columns=rename)
+        batch = batch.reindex(columns=WORKORDER_COLUMNS)
+        batch[PARSED_DATE_COLUMN], unreadable = parse_dates(batch[DATE_COLUMN])
+        batch[ROW_COLUMN] = np.arange(seen, seen + len(batch), dtype=np.int64)
+        seen += len(batch)
+        yield batch, batch[DATE_COLUMN][unreadable]
+
+
+def _mixed_columns(df):
+    """Object columns holding more than one type of value (e.g. Excel dates next to text)"""
+    return [column for column in WORKORDER_COLUMNS
+            if df[column].dtype == "object" and df[column].dropna().map(type).nunique() > 1]
+
+
+def _pickle_cell(value):
+    return None if value is None else pickle.dumps(value)
+
+
+def _unpickle_cell(value):
+    return None if value is None else pickle.loads(value)
+
+
+def _index_key(path):
+    # A dump is re-indexed when its content or the column list changes
+    return bytes_digest(json.dumps([file_digest(path), WORKORDER_COLUMNS, PARSED_DATE_COLUMN, ROW_COLUMN]).encode())
+
+
+def index_dump(path, root=None):
+    """Index one dump (unless already indexed).
+
+    Returns its info: source, rows, missing columns, pickled (mixed) columns,
+    unreadable dates (count and examples) and the index path.
+    """
+    root = index_root(root)
+    key = _index_key(path)
+    index_path = os.path.join(root, f"{key}.parquet")
+    info_path = os.path.join(root, f"{key}.json")
+    if os.path.exists(index_path) and os.path.exists(info_path):
+        with open(info_path, "r", encoding="utf-8") as f:
+            return dict(json.load(f), path=index_path, cached=True)
+
+    mapping, missing = workorder_columns(path)
+    batches = []
+    unreadable = 0
+    examples = []
+    for batch, bad in iter_workorders(path, mapping):
+        batches.append(batch)
+        unreadable += len(bad)
+        examples += [str(value) for value in bad.unique()[:EXAMPLES - len(examples)]]
+    if not batches:
+        empty = pd.DataFrame(columns=WORKORDER_COLUMNS)
+        batches.append(empty.assign(**{PARSED_DATE_COLUMN: parse_dates(empty[DATE_COLUMN])[0],
+                                       ROW_COLUMN: np.arange(0, dtype=np.int64)}))
+    df = pd.concat(batches, ignore_index=True)
+    # Rows without a readable date sort last and never match a date window
+    df = df.sort_values(PARSED_DATE_COLUMN, kind="stable", na_position="last", ignore_index=True)
+    # Parquet needs one type per column; pickling keeps mixed cells exactly as read
+    pickled = _mixed_columns(df)
+    df = df.assign(**{column: df[column].map(_pickle_cell) for column in pickled})
+
+    os.makedirs(root, exist_ok=True)
+    tmp_path = index_path + f".{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False, engine="pyarrow", write_statistics=True,
+                  row_group_size=INDEX_ROW_GROUP_ROWS)
+    os.replace(tmp_path, index_path)
+    info = {"source": os.path.basename(path), "rows": len(df), "missing": missing, "pickled": pickled,
+            "unreadable_dates": unreadable, "unreadable_examples": examples,
+            "indexed_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+    with open(info_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=1)
+    return dict(info, path=index_path, cached=False)
+
+
+def index_dumps(paths, root=None, max_workers=None, log=print):
+    """Index every dump not indexed yet, in parallel; returns their infos in input order"""
+    infos = []
+    for result in iter_batch(paths, functools.partial(index_dump, root=root), max_workers):
+        info = result.value
+        if info["missing"]:
+            log(f"⚠️ {info['source']}: these columns are missing: {info['missing']}")
+        if info["unreadable_dates"]:
+            log(f"⚠️ {info['source']}: {info['unreadable_dates']} {DATE_COLUMN} values can't be read as dates "
+                f"(kept as written, left out of date filters), e.g. {info['unreadable_examples']}")
+        report_timing(result, f" ({info['rows']} rows, {'already indexed' if info['cached'] else 'indexed'})")
+        infos.append(info)
+    return infos
+
+
+def _date_bounds(start, end):
+    """Filters for a date window; an end without a time of day includes that whole day"""
+    filters = []
+    if start is not None:
+        filters.append((PARSED_DATE_COLUMN, ">=", pd.Timestamp(start)))
+    if end is not None:
+        end = pd.Timestamp(end)
+        if end == end.normalize():
+            filters.append((PARSED_DATE_COLUMN, "<", end + pd.Timedelta(days=1)))
+        else:
+            filters.append((PARSED_DATE_COLUMN, "<=", end))
+    return filters
+
+
+def query_workorders(paths, start=None, end=None, teams=None, root=None, max_workers=None, log=print):
+    """Work orders of the dumps with an appointmentdate in [start, end] and one of the teams.
+
+    Dumps are indexed first when needed. Teams match ignoring case and
+    padding. With a date window rows come back ordered by appointmentdate
+    (dump order, then report order, for equal dates); without one, in dump
+    then report order. Every cell is as written in the dump; columns missing
+    from every dump are left out.
+    """
+    infos = index_dumps(paths, root, max_workers, log)
+    filters = _date_bounds(start, end) or None
+    wanted = {str(team).strip().upper() for team in teams} if teams else None
+    frames = []
+    for info in infos:
+        df = pd.read_parquet(info["path"], filters=filters)
+        for column in info["pickled"]:
+            df[column] = df[column].map(_unpickle_cell)
+        if wanted is not None:
+            df = df[df[TEAM_COLUMN].astype(str).str.strip().str.upper().isin(wanted).to_numpy()]
+        if filters is None:
+            df = df.sort_values(ROW_COLUMN, ignore_index=True)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=WORKORDER_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    if filters is not None and len(frames) > 1:
+        df = df.sort_values(PARSED_DATE_COLUMN, kind="stable", na_position="last", ignore_index=True)
+    return df[[column for column in WORKORDER_COLUMNS if any(column not in info["missing"] for info in infos)]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the work-order columns of call-validation dumps, "
+                                                 "filtered by appointment date and team.")
+    parser.add_argument("files", nargs="+", help="dump files or glob patterns (.xlsx, .csv, .parquet)")
+    parser.add_argument("--from", dest="start", help="first appointment date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last appointment date, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--team", action="append", help="team to keep (repeatable; default: all)")
+    parser.add_argument("--output", default="CallValidation.xlsx", help="output file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="dumps indexed at the same time (default: one per CPU)")
+    parser.add_argument("--root", help=f"index folder (default: {index_root()})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = query_workorders(expand_inputs(args.files), args.start, args.end, args.team, args.root, args.workers)
+    write_report(df, args.output)
+    print(f"✅ {len(df)} work orders saved to '{args.output}' ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
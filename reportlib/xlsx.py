@@ -0,0 +1,119 @@
+"""Direct reads of .xlsx internals (zip + XML) for cases where openpyxl is too slow.
+
+openpyxl parses the whole shared-strings table and workbook before giving back
+a single cell; these helpers stream only the parts that are needed.
+"""
+
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse, fromstring
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_CELL_REF = re.compile(r"([A-Z]+)")
+
+
+def column_index(ref):
+    """Zero-based column number of a cell reference like "C12\""""
+    letters = _CELL_REF.match(ref).group(1)
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - 64)
+    return index - 1
+
+
+def sheet_paths(zf):
+    """(sheet name, path inside the zip) for every worksheet, in workbook order"""
+    workbook = fromstring(zf.read("xl/workbook.xml"))
+    rels = fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{PKG_REL_NS}Relationship")}
+    paths = []
+    for sheet in workbook.iter(f"{NS}sheet"):
+        target = targets[sheet.get(f"{REL_NS}id")]
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        paths.append((sheet.get("name"), path))
+    return paths
+
+
+def _string_item_text(si):
+    # Plain <t> or rich text runs <r><t>..</t></r>; phonetic <rPh> runs are not part of the value
+    parts = []
+    for child in si:
+        if child.tag == f"{NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{NS}r":
+            parts.extend(t.text or "" for t in child.iter(f"{NS}t"))
+    return "".join(parts)
+
+
+def read_shared_strings(zf, limit=None):
+    """Shared-strings table, optionally stopping after the first `limit` entries"""
+    strings = []
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return strings
+    with zf.open("xl/sharedStrings.xml") as f:
+        for event, elem in iterparse(f, events=("end",)):
+            if elem.tag == f"{NS}si":
+                strings.append(_string_item_text(elem))
+                elem.clear()
+                if limit is not None and len(strings) >= limit:
+                    break
+    return strings
+
+
+def cell_value(cell, shared_strings):
+    """Python value of a <c> element; shared strings are looked up, numbers parsed"""
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{NS}t"))
+    value = cell.find(f"{NS}v")
+    if value is None or value.text is None:
+        return None
+    text = value.text
+    if cell_type == "s":
+        return shared_strings[int(text)]
+    if cell_type in ("str", "e"):
+        return text
+    if cell_type == "b":
+        return text == "1"
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def iter_raw_rows(f, max_rows=None):
+    """Yield each <row> of a worksheet stream as [(column index, <c> element), ...]"""
+    count = 0
+    for event, elem in iterparse(f, events=("end",)):
+        if elem.tag == f"{NS}row":
+            cells = []
+            for cell in elem.iter(f"{NS}c"):
+                # The "r" reference is optional; without it cells are consecutive
+                ref = cell.get("r")
+                cells.append((column_index(ref) if ref else (cells[-1][0] + 1 if cells else 0), cell))
+            yield cells
+            elem.clear()
+            count += 1
+            if max_rows is not None and count >= max_rows:
+                return
+
+
+def read_header_row(path, sheet=0):
+    """Header names of a worksheet without parsing the rest of the workbook"""
+    with zipfile.ZipFile(path) as zf:
+        sheets = sheet_paths(zf)
+        sheet_path = sheets[sheet][1] if isinstance(sheet, int) else dict(sheets)[sheet]
+        with zf.open(sheet_path) as f:
+            cells = next(iter_raw_rows(f, max_rows=1), [])
+        # Only read the shared strings the header actually refers to
+        indices = [int(cell.find(f"{NS}v").text) for _, cell in cells
+                   if cell.get("t") == "s" and cell.find(f"{NS}v") is not None]
+        shared_strings = read_shared_strings(zf, limit=max(indices) + 1) if indices else []
+        header = [None] * (max((index for index, _ in cells), default=-1) + 1)
+        for index, cell in cells:
+            header[index] = cell_value(cell, shared_strings)
+        return header
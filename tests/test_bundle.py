@@ -0,0 +1,29 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+from reportlib import bundle
+
+
+@pytest.mark.parametrize("zip64_limit", [bundle.ZIP64_LIMIT, 64])
+def test_bundle_reads_back_with_zipfile(tmp_path, monkeypatch, zip64_limit):
+    # A small limit puts every offset past it, so the Zip64 records get written too
+    monkeypatch.setattr(bundle, "ZIP64_LIMIT", zip64_limit)
+    big = tmp_path / "South.csv"
+    pd.DataFrame({"DPdeniro": [f"DP{i:06d}" for i in range(5000)], "S_SP": range(5000)}).to_csv(big, index=False)
+    tiny = tmp_path / "Niño.csv"
+    tiny.write_text("a\n")
+    bundle_path = str(tmp_path / "outputs.zip")
+
+    manifest = bundle.write_bundle([str(big), str(tiny)], bundle_path, rows={"Niño.csv": 0})
+
+    with zipfile.ZipFile(bundle_path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["South.csv", "Niño.csv", bundle.MANIFEST_NAME]
+        assert zf.getinfo("South.csv").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("Niño.csv").compress_type == zipfile.ZIP_STORED
+        assert zf.read("South.csv") == big.read_bytes()
+        assert zf.read("Niño.csv") == b"a\n"
+    assert [entry["rows"] for entry in manifest["files"]] == [5000, 0]
+    assert bundle.verify_bundle(bundle_path) == []
@@ -0,0 +1,33 @@
+import numpy as np
+
+from reportlib.colocation import METERS_PER_DEGREE, close_pairs, haversine_m
+
+
+def all_pairs(lat, long, radius_m):
+    i, j = np.triu_indices(len(lat), k=1)
+    meters = haversine_m(lat[i], long[i], lat[j], long[j])
+    close = meters <= radius_m
+    return set(zip(i[close].tolist(), j[close].tolist()))
+
+
+def test_close_pairs_matches_all_pairs_across_latitudes():
+    rng = np.random.default_rng(47)
+    # Scattered pins from 5°N to 19°N, a few dense spots among them
+    lat = rng.uniform(5, 19, 1500)
+    long = rng.uniform(120, 126, 1500)
+    spots = rng.integers(0, 1500, 100)
+    lat = np.concatenate([lat, lat[spots] + rng.normal(0, 5e-5, 100)])
+    long = np.concatenate([long, long[spots] + rng.normal(0, 5e-5, 100)])
+    # Pairs 9.9 m apart east-west at 19°N, where a degree of longitude is shortest
+    start = rng.uniform(120, 126, 200)
+    step = 9.9 / (METERS_PER_DEGREE * np.cos(np.radians(19)))
+    lat = np.concatenate([lat, np.full(400, 19.0)])
+    long = np.concatenate([long, start, start + step])
+
+    left, right, meters = close_pairs(lat, long, 10)
+    found = set(zip(left.tolist(), right.tolist()))
+    assert len(found) == len(left)
+    assert found == all_pairs(lat, long, 10)
+    assert np.all(meters <= 10)
+    first = len(lat) - 400
+    assert all((first + k, first + 200 + k) in found for k in range(200))
@@ -0,0 +1,74 @@
+import importlib
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "excel-processor")
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # Imported by name so the worker processes can unpickle process_upload
+    monkeypatch.syspath_prepend(SERVER_DIR)
+    module = importlib.import_module("server")
+    monkeypatch.setattr(module, "upload_dir", str(tmp_path / "uploads"))
+    monkeypatch.setattr(module, "results_dir", str(tmp_path / "results"))
+    monkeypatch.setattr(module, "jobs", {})
+    monkeypatch.setattr(module, "running_digests", {})
+    return module
+
+
+def report_csv():
+    rows = [
+        ["DP000001", 3, 8, "2024-01-21", 7.2589, 125.5112, "Zone 1", "TAGUM 1", "GPON", "Rural"],
+        ["DP000002", 0, 8, "2024-03-12", 7.0712, 125.6011, "Panacan", "DAVAO NORTH", "GPON", "Urban"],
+        ["DP000003", 6, 16, "2024-05-02", 7.0489, 125.5873, "Bago Aplaya", "DAVAO SOUTH", "VDSL", "Urban"],
+    ]
+    columns = ["DPdeniro", "S_SP", "S_Total", "Com Date", "DP/NAP LAT", "DP/NAP LONG", "BRGY_NAME",
+               "CFS Cluster", "Tech", "Location Type"]
+    return pd.DataFrame(rows, columns=columns).to_csv(index=False).encode()
+
+
+def wait_until_finished(client, job_id, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"Job {job_id} still {job['status']}")
+
+
+def test_upload_status_download(server):
+    data = report_csv()
+    with TestClient(server.app) as client:
+        response = client.post("/jobs?output_format=csv", files={"file": ("report.csv", data, "text/csv")})
+        assert response.status_code == 200
+        job = wait_until_finished(client, response.json()["job_id"])
+        assert job["status"] == "done", job["error"]
+        assert job["files"]
+
+        filename = job["files"][0]
+        download = client.get(f"/jobs/{job['job_id']}/files/{filename}")
+        assert download.status_code == 200
+        with open(os.path.join(server.results_dir, job["digest"], filename), "rb") as f:
+            assert download.content == f.read()
+        assert client.get(f"/jobs/{job['job_id']}/files/missing.csv").status_code == 404
+
+        # The upload was streamed to disk under its content hash; the same bytes again come from the cache
+        assert len(os.listdir(server.upload_dir)) == 1
+        again = client.post("/jobs?output_format=csv", files={"file": ("copy.csv", io.BytesIO(data), "text/csv")})
+        assert again.json()["cached"] is True
+        assert client.get(f"/jobs/{again.json()['job_id']}").json()["files"] == job["files"]
+
+
+def test_finished_jobs_are_forgotten_beyond_max_jobs(server, monkeypatch):
+    monkeypatch.setattr(server, "max_jobs", 2)
+    for number in range(4):
+        server.add_job({"job_id": str(number), "status": "done" if number != 1 else "running"})
+    # Running jobs are kept whatever their age
+    assert list(server.jobs) == ["1", "3"]
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from reportlib.formats import read_report
+from reportlib.sharded import iter_sheet_batches
+
+
+def write_workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Flag", "Flag Blank", "Count", "Count Blank", "DPdeniro", "Name", "Installed", "Note",
+               "Number Text", "Flag Text", "Blank"])
+    ws.append([True, True, 1, 1, 101, "A", datetime(2025, 7, 1, 10, 30), datetime(2025, 7, 1), "1", "TRUE", None])
+    ws.append([False, None, 2, None, "DP-9", None, None, "n/a", 2, None, None])
+    ws.append([True, False, 3, 3.5, 2.5, "C", datetime(2025, 7, 2), "see notes", "3.5", "false", "NA"])
+    wb.save(path)
+
+
+def test_sharded_reader_matches_read_excel(tmp_path):
+    path = str(tmp_path / "report.xlsx")
+    write_workbook(path)
+    expected = pd.read_excel(path)
+    assert expected["Flag Blank"].tolist()[::2] == [1.0, 0.0]
+
+    pd.testing.assert_frame_equal(read_report(path, engine="sharded"), expected)
+    pd.testing.assert_frame_equal(pd.concat(iter_sheet_batches(path), ignore_index=True), expected)
+    columns = ["DPdeniro", "Flag Blank"]
+    pd.testing.assert_frame_equal(read_report(path, columns=columns, engine="sharded"),
+                                  pd.read_excel(path, usecols=columns))
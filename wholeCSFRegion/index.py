@@ -1,15 +1,26 @@
+import multiprocessing
 import sys
 import os
-import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QFileDialog, QProgressBar, QMessageBox, QListWidget, QSplitter, QGroupBox, QComboBox
+    QFileDialog, QProgressBar, QMessageBox, QListWidget, QSplitter, QGroupBox, QComboBox,
+    QCheckBox, QSpinBox, QInputDialog
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 import math
 import subprocess
 
+# Shared helpers live in reportlib/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reportlib.bundle import write_bundle
+from reportlib.formats import FORMAT_EXTENSIONS, OPEN_FILTER, OUTPUT_FORMAT_LABELS, write_report
+from reportlib.outputcache import OutputCache, cache_key
+from reportlib.partitions import DATASET_PREFIX, is_dataset_source, partition_dates, read_dataset_source
+from reportlib.schema import iter_columns, probe_columns, read_columns
+from reportlib.spill import DEFAULT_MEMORY_LIMIT_MB, SpillPartitioner, iter_row_chunks
+from reportlib.topk import GroupTopK
+
 # Columns to extract
 columns_to_extract = [
     'DPdeniro', 'S_SP', 'S_Total', 'Com Date',
@@ -26,62 +37,194 @@ valid_clusters = [
     "ZAMBOANGA DEL SUR", "ZAMBOANGA SIBUGAY"
 ]
 
+# Rows per _part file
+part_rows = 2000
+
+# DPs listed per cluster and barangay in the _top_dps file (most and least utilized)
+top_k = 20
+
+# Reuse earlier outputs when the input, settings above and code are unchanged
+use_output_cache = True
+
 
 class ExcelProcessor(QThread):
     """Thread for processing Excel files"""
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
-    processing_finished = pyqtSignal(list)
+    processing_finished = pyqtSignal(list, bool)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, input_filepath, output_dir, selected_cluster):
+    def __init__(self, input_filepath, output_dir, selected_cluster, output_format="xlsx",
+                 memory_limit_mb=None, bundle=False):
         super().__init__()
         self.input_filepath = input_filepath
         self.output_dir = output_dir
         self.selected_cluster = selected_cluster
+        self.output_format = output_format
+        # Set for low-memory mode: stream the report and spill the cluster's rows to disk
+        self.memory_limit_mb = memory_limit_mb
+        # Set to also zip the compiled and part files into one bundle
+        self.bundle = bundle
+        self.cache = OutputCache()
+        self.cache_key = None
 
     def run(self):
         try:
-            self.status_updated.emit("Loading Excel file...")
-            df = pd.read_excel(self.input_filepath)
+            if self.restore_from_cache():
+                return
 
-            if self.selected_cluster not in df['CFS Cluster'].unique():
+            if is_dataset_source(self.input_filepath):
+                # Already split by cluster: only this cluster's partition is read
+                self.status_updated.emit(f"Loading the {self.selected_cluster} partition...")
+                df = read_dataset_source(self.input_filepath, [self.selected_cluster])
+            else:
+                # Reject files with missing columns before the full parse
+                self.status_updated.emit("Checking columns...")
+                mapping, _, _ = probe_columns(self.input_filepath, columns_to_extract)
+                if self.memory_limit_mb:
+                    self.run_low_memory(mapping)
+                    return
+
+                self.status_updated.emit("Loading input file...")
+                df = read_columns(self.input_filepath, mapping)
+            extension = FORMAT_EXTENSIONS[self.output_format]
+
+            in_cluster = (df['CFS Cluster'] == self.selected_cluster).to_numpy()
+            if not in_cluster.any():
                 self.error_occurred.emit(f"Cluster '{self.selected_cluster}' not found in file.")
                 return
 
+            # One copy: the cluster's rows, projected, as the frame the coordinates are added to
             self.status_updated.emit(f"Filtering for {self.selected_cluster}...")
-            df = df[df['CFS Cluster'] == self.selected_cluster]
-
-            df = df[columns_to_extract].copy()
+            df = df.loc[in_cluster, columns_to_extract]
 
             # Add coordinates
             self.status_updated.emit("Adding coordinates...")
             df['coordinates'] = df['DP/NAP LAT'].astype(str) + ", " + df['DP/NAP LONG'].astype(str)
 
             output_files = []
+            rows = {}
 
             # Save compiled file (full filtered dataset)
-            compiled_filename = f"{self.selected_cluster}_compiled.xlsx"
+            compiled_filename = f"{self.selected_cluster}_compiled{extension}"
             compiled_filepath = os.path.join(self.output_dir, compiled_filename)
-            df.to_excel(compiled_filepath, index=False)
+            write_report(df, compiled_filepath, self.output_format)
             output_files.append(compiled_filepath)
+            rows[compiled_filename] = len(df)
 
             # Split into chunks of 2000
-            num_chunks = math.ceil(len(df) / 2000)
+            num_chunks = math.ceil(len(df) / part_rows)
             for i in range(num_chunks):
-                chunk = df.iloc[i*2000:(i+1)*2000]
-                filename = f"{self.selected_cluster}_part{i+1}.xlsx"
+                chunk = df.iloc[i*part_rows:(i+1)*part_rows]
+                filename = f"{self.selected_cluster}_part{i+1}{extension}"
                 filepath = os.path.join(self.output_dir, filename)
-                chunk.to_excel(filepath, index=False)
+                write_report(chunk, filepath, self.output_format)
                 output_files.append(filepath)
+                rows[filename] = len(chunk)
+
+            top = GroupTopK(top_k)
+            top.add(df, self.ranking_levels(df))
+            self.write_ranking(top, output_files, rows)
 
+            self.store_in_cache(output_files, rows)
+            self.write_bundle(output_files, rows)
             self.progress_updated.emit(100)
             self.status_updated.emit("Processing complete!")
-            self.processing_finished.emit(output_files)
+            self.processing_finished.emit(output_files, False)
 
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+    def run_low_memory(self, mapping):
+        """Same outputs as run(), reading the report in batches under the memory limit"""
+        extension = FORMAT_EXTENSIONS[self.output_format]
+        top = GroupTopK(top_k)
+        with SpillPartitioner(self.memory_limit_mb) as partitioner:
+            self.status_updated.emit(f"Streaming and filtering for {self.selected_cluster}...")
+            for batch in iter_columns(self.input_filepath, mapping):
+                batch = batch[batch['CFS Cluster'] == self.selected_cluster][columns_to_extract]
+                batch = batch.assign(coordinates=batch['DP/NAP LAT'].astype(str) + ", " +
+                                     batch['DP/NAP LONG'].astype(str))
+                partitioner.add(self.selected_cluster, batch)
+                top.add(batch, self.ranking_levels(batch))
+
+            if not partitioner.rows.get(self.selected_cluster):
+                self.error_occurred.emit(f"Cluster '{self.selected_cluster}' not found in file.")
+                return
+            self.status_updated.emit(f"Writing files ({partitioner.spill_count} spill(s) to disk)...")
+
+            output_files = []
+            rows = {}
+            compiled_filepath = os.path.join(self.output_dir, f"{self.selected_cluster}_compiled{extension}")
+            rows[os.path.basename(compiled_filepath)] = partitioner.write(
+                self.selected_cluster, compiled_filepath, self.output_format)
+            output_files.append(compiled_filepath)
+
+            chunks = iter_row_chunks(partitioner.iter_batches(self.selected_cluster), part_rows)
+            for i, chunk in enumerate(chunks):
+                filepath = os.path.join(self.output_dir, f"{self.selected_cluster}_part{i+1}{extension}")
+                write_report(chunk, filepath, self.output_format)
+                output_files.append(filepath)
+                rows[os.path.basename(filepath)] = len(chunk)
+
+        self.write_ranking(top, output_files, rows)
+        self.store_in_cache(output_files, rows)
+        self.write_bundle(output_files, rows)
+        self.progress_updated.emit(100)
+        self.status_updated.emit("Processing complete!")
+        self.processing_finished.emit(output_files, False)
+
+    def ranking_levels(self, df):
+        return {"Cluster": df['CFS Cluster'].to_numpy(), "Barangay": df['BRGY_NAME'].to_numpy()}
+
+    def write_ranking(self, top, output_files, rows):
+        """Most and least utilized DPs of the cluster and of each of its barangays"""
+        self.status_updated.emit("Ranking DPs...")
+        ranking = top.result()
+        filename = f"{self.selected_cluster}_top_dps{FORMAT_EXTENSIONS[self.output_format]}"
+        filepath = os.path.join(self.output_dir, filename)
+        write_report(ranking, filepath, self.output_format)
+        output_files.append(filepath)
+        rows[filename] = len(ranking)
+
+    def restore_from_cache(self):
+        """Link the outputs of an identical earlier run into the output folder; True on a hit"""
+        if not use_output_cache or is_dataset_source(self.input_filepath):
+            return False
+        self.status_updated.emit("Checking the output cache...")
+        rules = {
+            "columns_to_extract": columns_to_extract,
+            "valid_clusters": valid_clusters,
+            "cluster": self.selected_cluster,
+            "part_rows": part_rows,
+            "top_k": top_k,
+            "output_format": self.output_format,
+        }
+        self.cache_key = cache_key(self.input_filepath, rules, extra_files=[os.path.abspath(__file__)])
+        output_files = self.cache.restore(self.cache_key, self.output_dir)
+        if output_files is None:
+            return False
+        output_files = list(output_files.values())
+        self.write_bundle(output_files, self.cache.rows(self.cache_key))
+        self.progress_updated.emit(100)
+        self.status_updated.emit("Restored from cache!")
+        self.processing_finished.emit(output_files, True)
+        return True
+
+    def store_in_cache(self, output_files, rows):
+        if self.cache_key:
+            self.cache.store(self.cache_key, output_files, rows)
+
+
+    def write_bundle(self, output_files, rows):
+        """Zip the outputs into <cluster>_bundle.zip when bundling is on (added to output_files)"""
+        if not self.bundle:
+            return
+        self.status_updated.emit("Bundling outputs...")
+        bundle_path = os.path.join(self.output_dir, f"{self.selected_cluster}_bundle.zip")
+        write_bundle(output_files, bundle_path, rows=rows, status=self.status_updated.emit)
+        output_files.append(bundle_path)
+
 
 class ExcelProcessorApp(QMainWindow):
     def __init__(self):
@@ -119,6 +262,9 @@ class ExcelProcessorApp(QMainWindow):
         self.select_file_btn = QPushButton("Select Excel File")
         self.select_file_btn.clicked.connect(self.select_file)
         btn_layout.addWidget(self.select_file_btn)
+        self.dataset_btn = QPushButton("Use Partitioned Dataset")
+        self.dataset_btn.clicked.connect(self.select_dataset)
+        btn_layout.addWidget(self.dataset_btn)
 
         self.file_label = QLabel("No file selected")
         btn_layout.addWidget(self.file_label)
@@ -140,6 +286,28 @@ class ExcelProcessorApp(QMainWindow):
         file_layout.addWidget(QLabel("Select CFS Cluster:"))
         file_layout.addWidget(self.cluster_dropdown)
 
+        # Output format dropdown
+        self.format_dropdown = QComboBox()
+        for fmt, label in OUTPUT_FORMAT_LABELS.items():
+            self.format_dropdown.addItem(label, fmt)
+        file_layout.addWidget(QLabel("Output format:"))
+        file_layout.addWidget(self.format_dropdown)
+
+        # Low-memory mode for whole-PH exports that don't fit in memory
+        memory_layout = QHBoxLayout()
+        self.low_memory_check = QCheckBox("Low-memory mode (stream the file, spill to disk above)")
+        memory_layout.addWidget(self.low_memory_check)
+        self.memory_limit_spin = QSpinBox()
+        self.memory_limit_spin.setRange(64, 16384)
+        self.memory_limit_spin.setSingleStep(128)
+        self.memory_limit_spin.setSuffix(" MB")
+        self.memory_limit_spin.setValue(DEFAULT_MEMORY_LIMIT_MB)
+        memory_layout.addWidget(self.memory_limit_spin)
+        file_layout.addLayout(memory_layout)
+
+        self.bundle_check = QCheckBox("Also zip the outputs (with manifest)")
+        file_layout.addWidget(self.bundle_check)
+
         splitter.addWidget(file_group)
 
         # Processing group
@@ -174,12 +342,27 @@ class ExcelProcessorApp(QMainWindow):
         splitter.addWidget(output_group)
 
     def select_file(self):
-        filepath, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "", "Excel Files (*.xlsx *.xls)")
+        filepath, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "", OPEN_FILTER)
         if filepath:
             self.input_filepath = filepath
             self.file_label.setText(filepath)
             self.process_btn.setEnabled(True)
 
+    def select_dataset(self):
+        """Pick a report date already split into cluster partitions"""
+        dates = partition_dates()
+        if not dates:
+            QMessageBox.information(self, "No Partitions",
+                                    "No reports have been partitioned yet.\n"
+                                    "Run: python -m reportlib.partitions partition <report files>")
+            return
+        date, ok = QInputDialog.getItem(self, "Partitioned Dataset", "Report date:",
+                                        list(reversed(dates)), 0, False)
+        if ok:
+            self.input_filepath = DATASET_PREFIX + date
+            self.file_label.setText(f"Partitions of {date} (only the selected cluster is read)")
+            self.process_btn.setEnabled(True)
+
     def process_file(self):
         if not self.input_filepath:
             QMessageBox.warning(self, "Warning", "Please select an Excel file first.")
@@ -193,17 +376,20 @@ class ExcelProcessorApp(QMainWindow):
         # 🔒 Disable process button while running
         self.process_btn.setEnabled(False)
 
-        self.processor = ExcelProcessor(self.input_filepath, self.output_dir, self.selected_cluster)
+        memory_limit_mb = self.memory_limit_spin.value() if self.low_memory_check.isChecked() else None
+        self.processor = ExcelProcessor(self.input_filepath, self.output_dir, self.selected_cluster,
+                                        self.format_dropdown.currentData(), memory_limit_mb,
+                                        self.bundle_check.isChecked())
         self.processor.progress_updated.connect(self.progress_bar.setValue)
         self.processor.status_updated.connect(self.status_label.setText)
         self.processor.processing_finished.connect(self.show_results)
         self.processor.error_occurred.connect(self.show_error)
         self.processor.start()
 
-    def show_results(self, files):
-        self.status_label.setText("Done")
+    def show_results(self, files, from_cache):
+        self.status_label.setText("Done (from cache)" if from_cache else "Done")
         for f in files:
-            self.output_list.addItem(os.path.basename(f))
+            self.output_list.addItem(os.path.basename(f) + (" (from cache)" if from_cache else ""))
         self.open_folder_btn.setEnabled(True)
 
         # ✅ Re-enable process button
@@ -231,6 +417,8 @@ class ExcelProcessorApp(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Needed by the frozen (PyInstaller) build, which parses very large sheets in worker processes
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = ExcelProcessorApp()
     window.show()
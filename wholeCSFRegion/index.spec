@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['index.py'],
-    pathex=[],
+    pathex=['..'],
     binaries=[],
     datas=[],
     hiddenimports=[],